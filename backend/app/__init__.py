@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+
+# Before any app module reads its os.getenv config
+load_dotenv()
@@ -1,53 +1,144 @@
-import os
+import re
 import base64
 from pathlib import Path
-from typing import Optional, Tuple
-from dotenv import load_dotenv
-from openai import OpenAI
+from typing import List, Optional, Tuple
+from . import metrics
+from .image_prep import InvalidImage, prepare_image
+from .openai_client import ModelUnavailable, get_client, has_api_key
+from .uploads import file_sha256
+from .verdict_cache import verdict_cache, verdict_key
 
-# Load .env and initialize
-load_dotenv()
+TEXT_MODEL = "gpt-4o-mini"
+IMAGE_MODEL = "gpt-4o"
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+TEXT_SYSTEM_PROMPT = (
+    "You verify if text proves task completion. "
+    "Respond EXACTLY like this:\n"
+    "DECISION||REASON\n"
+    "DECISION = APPROVE or REJECT\n"
+    "REASON = max 1–2 short sentences."
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You verify if text proves task completion. "
+    "You get several numbered proofs, each judged on its own. "
+    "Respond with one line per proof, EXACTLY like this:\n"
+    "N||DECISION||REASON\n"
+    "N = the proof number\n"
+    "DECISION = APPROVE or REJECT\n"
+    "REASON = max 1–2 short sentences."
+)
+
+# "3||APPROVE||Looks done."
+_BATCH_LINE = re.compile(r"^\s*#?(\d+)\s*\|\|\s*(APPROVE|REJECT)\s*\|\|(.*)$", re.IGNORECASE)
+
+TextProof = Tuple[Optional[str], Optional[str], Optional[str]]   # (text, title, description)
+
+
+def _one_line(value: Optional[str]) -> str:
+    # Newlines in user text must not be able to fake another proof's line
+    return " ".join((value or "").split())
+
+
+def _parse_verdict(text: str) -> Tuple[bool, str]:
+    decision, _, reason = text.strip().partition("||")
+    return decision.strip().lower() == "approve", reason.strip() or "No reason provided."
+
+
+def parse_batch_verdicts(text: str, count: int) -> List[Optional[Tuple[bool, str]]]:
+    """
+    Parse "N||DECISION||REASON" lines into one verdict per proof.
+    Missing, out-of-range or repeated numbers leave that slot as None.
+    """
+    verdicts: List[Optional[Tuple[bool, str]]] = [None] * count
+    seen = set()
+    for line in text.splitlines():
+        match = _BATCH_LINE.match(line)
+        if not match:
+            continue
+        index = int(match.group(1)) - 1
+        if not 0 <= index < count:
+            continue
+        if index in seen:
+            verdicts[index] = None      # ambiguous → verify individually
+            continue
+        seen.add(index)
+        reason = match.group(3).strip() or "No reason provided."
+        verdicts[index] = (match.group(2).lower() == "approve", reason)
+    return verdicts
+
+
+def verify_text_batch(proofs: List[TextProof]) -> List[Optional[Tuple[bool, str]]]:
+    """
+    Verify several text-only proofs with one model call.
+    Raises on API errors; unparseable entries come back as None.
+    """
+    if not has_api_key():
+        return [None] * len(proofs)     # single-proof path reports the missing key
+    client = get_client()
+
+    blocks = [
+        f"#{i}\n"
+        f"Task title: {_one_line(title) or 'N/A'}\n"
+        f"Task description: {_one_line(description) or 'N/A'}\n"
+        f"User text proof: {_one_line(text) or 'None'}"
+        for i, (text, title, description) in enumerate(proofs, start=1)
+    ]
+
+    response = client.chat.completions.create(
+        model=TEXT_MODEL,
+        messages=[
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": "\n\n".join(blocks)
+                + "\n\nDoes each text prove its task was done?",
+            },
+        ],
+        max_tokens=60 * len(proofs),
+    )
+
+    return parse_batch_verdicts(response.choices[0].message.content or "", len(proofs))
 
 
 def ai_verify_proof(
     proof_text: Optional[str],
     proof_path: Optional[str],
     task_title: Optional[str] = None,
-    task_description: Optional[str] = None
+    task_description: Optional[str] = None,
+    image_digest: Optional[str] = None,
 ) -> Tuple[bool, str]:
     """
     Uses OpenAI to verify proof text + optional image.
+    image_digest: sha256 of the image if the caller already hashed it on upload.
     Returns: (approved: bool, feedback: str)
+    Raises ModelUnavailable when the model endpoint is degraded.
     """
-
     # -------------------------------------------------------------
     #  CASE: No OpenAI Key
     # -------------------------------------------------------------
-    if not client.api_key:
+    # Checked before get_client(): building the client without a key raises
+    if not has_api_key():
         print("⚠ WARNING: No OPENAI_API_KEY found → auto-rejecting.")
         return False, "AI key missing. Proof rejected."
 
+    client = get_client()
+
 
     # -------------------------------------------------------------
     #  CASE: TEXT-ONLY PROOF
     # -------------------------------------------------------------
     if not proof_path or not Path(proof_path).exists():
+        key = verdict_key(TEXT_MODEL, None, proof_text, task_title, task_description)
+        cached = verdict_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
             response = client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=TEXT_MODEL,
                 messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You verify if text proves task completion. "
-                            "Respond EXACTLY like this:\n"
-                            "DECISION||REASON\n"
-                            "DECISION = APPROVE or REJECT\n"
-                            "REASON = max 1–2 short sentences."
-                        )
-                    },
+                    {"role": "system", "content": TEXT_SYSTEM_PROMPT},
                     {
                         "role": "user",
                         "content": (
@@ -61,16 +152,16 @@ def ai_verify_proof(
                 max_tokens=100
             )
 
-            text = response.choices[0].message.content.strip()
-            decision, _, reason = text.partition("||")
-
-            approved = decision.strip().lower() == "approve"
-            reason = reason.strip() or "No reason provided."
+            approved, reason = _parse_verdict(response.choices[0].message.content)
 
+            verdict_cache.put(key, TEXT_MODEL, approved, reason)
             return approved, reason
 
+        except ModelUnavailable:
+            raise
         except Exception as e:
             print("AI text error →", e)
+            metrics.ai_verify_errors.inc(model=TEXT_MODEL)
             return False, "AI verification failed."
 
 
@@ -78,15 +169,27 @@ def ai_verify_proof(
     #  CASE: TEXT + IMAGE PROOF
     # -------------------------------------------------------------
     try:
-        # Convert binary → base64 image
-        with open(proof_path, "rb") as f:
-            raw_bytes = f.read()
+        # Same image + same text → reuse the earlier verdict
+        if not image_digest:
+            image_digest = file_sha256(proof_path)
+        key = verdict_key(
+            IMAGE_MODEL, image_digest, proof_text, task_title, task_description
+        )
+        cached = verdict_cache.get(key)
+        if cached is not None:
+            return cached
 
-        img_base64 = base64.b64encode(raw_bytes).decode("utf-8")
+        # Downscale + re-encode before paying for vision tokens
+        try:
+            payload, mime = prepare_image(proof_path)
+        except InvalidImage as e:
+            return False, str(e)
+
+        img_base64 = base64.b64encode(payload).decode("ascii")
 
         # AI call
         response = client.chat.completions.create(
-            model="gpt-4o",
+            model=IMAGE_MODEL,
             messages=[
                 {
                     "role": "system",
@@ -111,8 +214,8 @@ def ai_verify_proof(
                             ),
                         },
                         {
-                            "type": "input_image",
-                            "image_url": {"url": f"data:image/jpeg;base64,{img_base64}"}
+                            "type": "image_url",
+                            "image_url": {"url": f"data:{mime};base64,{img_base64}"}
                         }
                     ]
                 },
@@ -120,14 +223,14 @@ def ai_verify_proof(
             max_tokens=200
         )
 
-        text = response.choices[0].message.content.strip()
-        decision, _, reason = text.partition("||")
-
-        approved = decision.strip().lower() == "approve"
-        reason = reason.strip() or "No reason provided."
+        approved, reason = _parse_verdict(response.choices[0].message.content)
 
+        verdict_cache.put(key, IMAGE_MODEL, approved, reason)
         return approved, reason
 
+    except ModelUnavailable:
+        raise
     except Exception as e:
         print("AI image error →", e)
+        metrics.ai_verify_errors.inc(model=IMAGE_MODEL)
         return False, "AI image verification failed."
@@ -1,14 +1,18 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
+import hmac
 import base64
+import threading
 from io import BytesIO
 import os
 
+import bcrypt
+
 from jose import JWTError, jwt
-from PIL import Image
 
-from openai import OpenAI
+from .openai_client import get_client
 
 
 # ================= JWT CONFIG ==================
@@ -18,12 +22,159 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
 
 # ================= PASSWORD HASHING ==================
+PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "bcrypt")          # bcrypt | argon2
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", str(64 * 1024)))  # KiB
+
+# KDF work runs in its own small pool; at most HASH_MAX_PENDING requests may
+# wait on it, so a login storm can't tie up every request thread.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "16"))
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class BcryptHasher:
+    scheme = "bcrypt"
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS):
+        self.rounds = rounds
+
+    @staticmethod
+    def _prehash(password: str) -> bytes:
+        # bcrypt only reads 72 bytes; pre-hashing keeps long passwords meaningful
+        return base64.b64encode(hashlib.sha256(password.encode("utf-8")).digest())
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(self._prehash(password), salt).decode("ascii")
+
+    def identify(self, hashed: str) -> bool:
+        return hashed.startswith(("$2b$", "$2a$", "$2y$"))
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return bcrypt.checkpw(self._prehash(password), hashed.encode("ascii"))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return int(hashed.split("$")[2]) != self.rounds
+
+
+class Argon2Hasher:
+    scheme = "argon2"
+
+    def __init__(
+        self,
+        time_cost: int = ARGON2_TIME_COST,
+        memory_cost: int = ARGON2_MEMORY_COST,
+    ):
+        try:
+            from argon2 import PasswordHasher
+        except ImportError as e:
+            raise RuntimeError("PASSWORD_SCHEME=argon2 requires argon2-cffi") from e
+        self._ph = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost)
+
+    def hash(self, password: str) -> str:
+        return self._ph.hash(password)
+
+    def identify(self, hashed: str) -> bool:
+        return hashed.startswith("$argon2")
+
+    def verify(self, password: str, hashed: str) -> bool:
+        from argon2.exceptions import VerificationError, InvalidHashError
+        try:
+            return self._ph.verify(hashed, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return self._ph.check_needs_rehash(hashed)
+
+
+class LegacySha256Hasher:
+    """Unsalted SHA-256 hex digests from before the KDF switch. Verify only."""
+    scheme = "sha256"
+
+    def identify(self, hashed: str) -> bool:
+        return len(hashed) == 64 and all(c in "0123456789abcdef" for c in hashed)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        digest = hashlib.sha256(password.encode("utf-8")).hexdigest()
+        return hmac.compare_digest(digest, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return True
+
+
+def make_hasher(scheme: str = PASSWORD_SCHEME):
+    if scheme == "bcrypt":
+        return BcryptHasher()
+    if scheme == "argon2":
+        return Argon2Hasher()
+    raise ValueError(f"Unknown PASSWORD_SCHEME: {scheme}")
+
+
+class PasswordContext:
+    """Hashes with the configured scheme and verifies any scheme we've used."""
+
+    def __init__(self, primary, workers: int = HASH_WORKERS, max_pending: int = HASH_MAX_PENDING):
+        self.primary = primary
+        self.fallbacks = [LegacySha256Hasher()]
+        for scheme in ("bcrypt", "argon2"):
+            if scheme != primary.scheme:
+                try:
+                    self.fallbacks.append(make_hasher(scheme))
+                except RuntimeError:
+                    pass    # optional backend not installed
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            return self._pool.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def _hasher_for(self, hashed: str):
+        for hasher in [self.primary, *self.fallbacks]:
+            if hasher.identify(hashed):
+                return hasher
+        return None
+
+    def hash(self, password: str) -> str:
+        return self._run(self.primary.hash, password)
+
+    def _verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        hasher = self._hasher_for(hashed)
+        if hasher is None or not hasher.verify(password, hashed):
+            return False, None
+
+        if hasher is not self.primary or hasher.needs_rehash(hashed):
+            return True, self.primary.hash(password)
+        return True, None
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Returns (ok, new_hash). new_hash is set when the stored hash uses a
+        legacy scheme or outdated cost and should be replaced.
+        """
+        return self._run(self._verify_and_update, password, hashed)
+
+
+password_hasher = PasswordContext(make_hasher())
+
+
 def get_password_hash(password: str) -> str:
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+    return password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return get_password_hash(plain_password) == hashed_password
+    ok, _ = password_hasher.verify_and_update(plain_password, hashed_password)
+    return ok
 
 
 # ================= JWT HELPERS ==================
@@ -45,12 +196,9 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
-# ================= OPENAI CLIENT ==================
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-
 # ================= AI IMAGE VERIFICATION ==================
 def verify_proof_image(file_bytes):
+    from PIL import Image
 
     # ---- 1️⃣ BASIC VALIDATION ----
     try:
@@ -64,7 +212,7 @@ def verify_proof_image(file_bytes):
 
     # ---- 3️⃣ REAL AI ANALYSIS ----
     try:
-        result = client.chat.completions.create(
+        result = get_client().chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -0,0 +1,101 @@
+"""
+GET /dashboard: every dashboard widget from one authenticated request and
+one session, instead of a call per widget.
+
+Task counts come from a single GROUP BY status over the owner's tasks; the
+calendar reads the same streak_logs rollup as /streak/calendar, limited to
+the last `days` days; the recent task page is one keyset query and the
+leaderboard is read from the in-memory board. Widgets the client didn't ask
+for in ?fields= are not computed at all.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models, schemas
+from .leaderboard import leaderboard
+from .principal_cache import UserSnapshot
+from .task_queries import encode_task_cursor, task_list_query
+
+DASHBOARD_WIDGETS = ("user", "stats", "tasks", "calendar", "leaderboard")
+
+# Widgets read from the shared leaderboard rather than the user's own rows
+LEADERBOARD_WIDGETS = {"leaderboard"}
+
+
+def parse_widgets(fields: Optional[str]) -> List[str]:
+    """'stats,tasks' → ['stats', 'tasks']; None means every widget. Raises ValueError."""
+    if not fields:
+        return list(DASHBOARD_WIDGETS)
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in names if f not in DASHBOARD_WIDGETS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+async def _task_counts(db: AsyncSession, user_id: int) -> Dict[str, int]:
+    """Owner's task count per status, in one GROUP BY."""
+    Task = models.Task
+    rows = await db.execute(
+        select(Task.status, func.count()).where(Task.owner_id == user_id).group_by(Task.status)
+    )
+    return {status: count for status, count in rows}
+
+
+async def _calendar(db: AsyncSession, user_id: int, days: int) -> Dict[str, int]:
+    """Completions per day from streak_logs, as /streak/calendar reports them."""
+    start = datetime.utcnow().date() - timedelta(days=days - 1)
+    rows = await db.execute(
+        select(models.StreakLog.date, models.StreakLog.completed_count)
+        .where(models.StreakLog.user_id == user_id, models.StreakLog.date >= start)
+        .order_by(models.StreakLog.date)
+    )
+    return {day.isoformat(): count for day, count in rows}
+
+
+async def build_dashboard(
+    db: AsyncSession,
+    user: UserSnapshot,
+    widgets: List[str],
+    task_limit: int,
+    days: int,
+    leaderboard_limit: int,
+) -> dict:
+    out = {}
+
+    if "user" in widgets:
+        out["user"] = schemas.UserOut.model_validate(user)
+
+    if "stats" in widgets:
+        by_status = await _task_counts(db, user.id)
+        out["stats"] = schemas.DashboardStats(
+            total_points=user.total_points,
+            current_streak=user.current_streak,
+            longest_streak=user.longest_streak,
+            tasks_completed=by_status.get("completed", 0),
+            tasks_total=sum(by_status.values()),
+            tasks_by_status=by_status,
+        )
+
+    if "calendar" in widgets:
+        out["calendar"] = await _calendar(db, user.id, days)
+
+    if "tasks" in widgets:
+        rows = (await db.scalars(task_list_query(user.id, limit=task_limit + 1))).all()
+        next_cursor = None
+        if len(rows) > task_limit:
+            rows = rows[:task_limit]
+            next_cursor = encode_task_cursor(rows[-1].created_at, rows[-1].id)
+        out["tasks"] = schemas.DashboardTasks(
+            items=[schemas.TaskOut.model_validate(row) for row in rows],
+            next_cursor=next_cursor,
+        )
+
+    if "leaderboard" in widgets:
+        top, _ = leaderboard.page("all", leaderboard_limit)
+        out["leaderboard"] = {"top": top, "me": leaderboard.rank(user.id)}
+
+    return out
@@ -0,0 +1,443 @@
+"""
+Push channel: per-user events and leaderboard deltas, streamed to clients as
+server-sent events by GET /events.
+
+Writers record events on the SQLAlchemy session; they are published once the
+transaction commits and dropped on rollback, like the cache invalidations.
+The hub fans them out to the streams open in this process. With
+EVENTS_BROKER_URL set, each worker relays through a small broker instead, so
+a stream sees events whichever worker handled the write. The same channel
+carries the workers' own state changes (leaderboard awards, cache
+invalidations): listen() registers an in-process callback for what other
+workers publish. Run the broker whenever there is more than one worker.
+
+Usage (from backend/):
+    python -m app.events broker [--host 127.0.0.1] [--port 7070]
+    EVENTS_BROKER_URL=tcp://127.0.0.1:7070 uvicorn app.main:app --workers 4
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import secrets
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+
+from sqlalchemy import delete, event, inspect
+from sqlalchemy.orm import Session
+
+from . import models
+
+
+# ================= EVENTS CONFIG ==================
+EVENTS_BROKER_URL = os.getenv("EVENTS_BROKER_URL", "")                # empty → in-process only
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))        # per open stream
+EVENTS_HEARTBEAT_S = float(os.getenv("EVENTS_HEARTBEAT_S", "15"))     # keeps proxies from timing out
+EVENTS_RETRY_MS = int(os.getenv("EVENTS_RETRY_MS", "3000"))           # client reconnect delay
+EVENTS_OUTBOX_SIZE = int(os.getenv("EVENTS_OUTBOX_SIZE", "10000"))    # waiting for the broker
+EVENTS_BROKER_MAX_BUFFER = 4 * 1024 * 1024                            # per worker, in the broker
+EVENTS_TICKET_TTL_S = int(os.getenv("EVENTS_TICKET_TTL_S", "60"))      # to open a stream with it
+
+LEADERBOARD_CHANNEL = "leaderboard"
+
+# Worker-to-worker only; never subscribed to by a stream
+LEADERBOARD_SYNC_CHANNEL = "sync:leaderboard"
+DATA_CHANGED_CHANNEL = "sync:data"
+USER_CHANGED_CHANNEL = "sync:users"
+
+# Sent in place of events a stream had no room for: the client should refetch
+RESYNC = {"type": "resync"}
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def format_sse(payload: dict) -> str:
+    data = json.dumps(payload, separators=(",", ":"), default=str)
+    return f"event: {payload['type']}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """One open stream's bounded inbox, owned by the event loop that opened it."""
+
+    def __init__(self, channels: Iterable[str], maxsize: int):
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize)
+
+    def _deliver(self, payload: dict):
+        # A client that can't keep up loses its backlog and is told to resync,
+        # rather than the server holding memory for it
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            payload = RESYNC
+        self.queue.put_nowait(payload)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Next event, or None if nothing arrived within timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+Listener = Callable[[dict], None]
+
+
+class LocalHub:
+    """Fan-out to this process's subscribers. publish() is safe from any thread."""
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.published = 0
+        self._subs: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._listeners: Dict[str, List[Listener]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def start(self):
+        pass
+
+    def listen(self, channel: str, callback: Listener):
+        """
+        Call callback(payload) for events other workers publish on channel,
+        and with RESYNC when some of them may have been lost. A single
+        process has no other workers, so here it is never called.
+        """
+        with self._lock:
+            self._listeners[channel].append(callback)
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        subscription = Subscription(channels, self.queue_size)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subs[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subs = self._subs.get(channel)
+                if subs is not None:
+                    subs.discard(subscription)
+                    if not subs:
+                        del self._subs[channel]
+
+    def publish(self, channel: str, payload: dict):
+        self._dispatch(channel, payload)
+
+    def _dispatch(self, channel: str, payload: dict):
+        with self._lock:
+            self.published += 1
+            subs = list(self._subs.get(channel, ()))
+        for subscription in subs:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, payload)
+            except RuntimeError:
+                pass    # loop already closed; the stream is going away
+
+    def _dispatch_all(self, payload: dict):
+        with self._lock:
+            subs = {s for channel_subs in self._subs.values() for s in channel_subs}
+        for subscription in subs:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, payload)
+            except RuntimeError:
+                pass
+
+    def _notify(self, channel: str, payload: dict):
+        with self._lock:
+            callbacks = list(self._listeners.get(channel, ()))
+        for callback in callbacks:
+            try:
+                callback(payload)
+            except Exception as e:
+                print("Event listener error →", e)
+
+    def _notify_all(self, payload: dict):
+        with self._lock:
+            channels = list(self._listeners)
+        for channel in channels:
+            self._notify(channel, payload)
+
+    def close(self):
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            streams = len({s for channel_subs in self._subs.values() for s in channel_subs})
+            return {"streams": streams, "channels": len(self._subs), "published": self.published}
+
+
+class BrokerHub(LocalHub):
+    """
+    Sends every event to the broker and dispatches whatever the broker relays,
+    so events cross worker processes. Best effort: while the broker is
+    unreachable events are dropped, and open streams get a resync once the
+    connection is back.
+    """
+
+    def __init__(self, url: str, queue_size: int = EVENTS_QUEUE_SIZE):
+        super().__init__(queue_size)
+        parts = urlsplit(url)
+        self.address = (parts.hostname or "127.0.0.1", parts.port or 7070)
+        self.origin = uuid.uuid4().hex      # tells this worker's events apart when relayed back
+        self.dropped = 0
+        self._outbox: "queue.Queue[Optional[bytes]]" = queue.Queue(EVENTS_OUTBOX_SIZE)
+        self._sock: Optional[socket.socket] = None
+        self._closed = threading.Event()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            threading.Thread(target=self._read_loop, name="events-broker-read", daemon=True).start()
+            threading.Thread(target=self._write_loop, name="events-broker-write", daemon=True).start()
+            self._started = True
+
+    def start(self):
+        """Connect now, so listeners hear other workers before any stream opens."""
+        self._ensure_started()
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        self._ensure_started()
+        return super().subscribe(channels)
+
+    def publish(self, channel: str, payload: dict):
+        self._ensure_started()
+        line = json.dumps(
+            {"channel": channel, "event": payload, "origin": self.origin},
+            separators=(",", ":"), default=str,
+        )
+        try:
+            self._outbox.put_nowait(line.encode("utf-8") + b"\n")
+        except queue.Full:
+            self.dropped += 1
+
+    def _read_loop(self):
+        backoff = 0.5
+        connected_before = False
+        while not self._closed.is_set():
+            try:
+                sock = socket.create_connection(self.address, timeout=5)
+                sock.settimeout(None)
+            except OSError:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 10)
+                continue
+
+            backoff = 0.5
+            self._sock = sock
+            if connected_before:
+                # Whatever was sent meanwhile is lost
+                self._dispatch_all(RESYNC)
+                self._notify_all(RESYNC)
+            connected_before = True
+
+            try:
+                for line in sock.makefile("rb"):
+                    message = json.loads(line)
+                    self._dispatch(message["channel"], message["event"])
+                    if message.get("origin") != self.origin:
+                        self._notify(message["channel"], message["event"])
+            except (OSError, ValueError) as e:
+                if not self._closed.is_set():
+                    print("Event broker error →", e)
+            finally:
+                self._sock = None
+                sock.close()
+
+    def _write_loop(self):
+        while True:
+            line = self._outbox.get()
+            if line is None:
+                return
+            sock = self._sock
+            if sock is None:
+                self.dropped += 1
+                continue
+            try:
+                sock.sendall(line)
+            except OSError:
+                self.dropped += 1       # the reader sees the broken socket and reconnects
+
+    def close(self):
+        self._closed.set()
+        self._outbox.put(None)
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        return {**super().stats(), "broker_connected": self._sock is not None, "dropped": self.dropped}
+
+
+def make_hub(broker_url: str = EVENTS_BROKER_URL) -> LocalHub:
+    return BrokerHub(broker_url) if broker_url else LocalHub()
+
+
+event_hub = make_hub()
+
+
+# ================= SESSION HOOKS ==================
+# Task row changes are collected at flush and sent as one "tasks" event per
+# user per commit; other events are recorded explicitly with record_event().
+
+def record_event(session: Session, user_id: int, payload: dict):
+    session.info.setdefault("pending_events", []).append((user_channel(user_id), payload))
+
+
+def record_task_change(session: Session, user_id: int, task_id: int, action: str, **fields):
+    """For task writes that bypass the ORM unit of work (Core INSERT/DELETE)."""
+    changes = session.info.setdefault("task_changes", {}).setdefault(user_id, {})
+    previous = changes.get(task_id)
+    if previous is not None and previous["action"] == "created" and action == "updated":
+        action = "created"
+    changes[task_id] = {"id": task_id, "action": action, **fields}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_task_changes(session, flush_context):
+    for objects, action in (
+        (session.new, "created"),
+        (session.dirty, "updated"),
+        (session.deleted, "deleted"),
+    ):
+        for obj in objects:
+            if not isinstance(obj, models.Task) or obj.id is None:
+                continue
+            if action == "updated" and not session.is_modified(obj):
+                continue
+            record_task_change(
+                session, obj.owner_id, obj.id, action,
+                status=obj.status, proof_status=obj.proof_status,
+            )
+
+            # History is still intact in after_flush
+            verdict = inspect(obj).attrs.proof_status.history
+            if action != "deleted" and verdict.added and obj.proof_status in ("approved", "rejected"):
+                record_event(session, obj.owner_id, {
+                    "type": "proof",
+                    "task_id": obj.id,
+                    "proof_status": obj.proof_status,
+                    "proof_feedback": obj.proof_feedback,
+                })
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session):
+    for user_id, changes in session.info.pop("task_changes", {}).items():
+        event_hub.publish(user_channel(user_id), {"type": "tasks", "changes": list(changes.values())})
+    for channel, payload in session.info.pop("pending_events", ()):
+        event_hub.publish(channel, payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_on_rollback(session):
+    session.info.pop("task_changes", None)
+    session.info.pop("pending_events", None)
+
+
+# ================= STREAM TICKETS ==================
+# EventSource can't send an Authorization header. Rather than putting the
+# day-long access token in the URL (and so in access logs), the client trades
+# it for a ticket that opens one stream within EVENTS_TICKET_TTL_S. Tickets
+# live in the database so any worker can redeem them; only their hash is kept.
+
+def _ticket_hash(ticket: str) -> str:
+    return hashlib.sha256(ticket.encode("utf-8")).hexdigest()
+
+
+def issue_stream_ticket(db: Session, user_id: int) -> str:
+    now = datetime.utcnow()
+    db.execute(delete(models.StreamTicket).where(models.StreamTicket.expires_at <= now))
+    ticket = secrets.token_urlsafe(32)
+    db.add(models.StreamTicket(
+        ticket_hash=_ticket_hash(ticket),
+        user_id=user_id,
+        expires_at=now + timedelta(seconds=EVENTS_TICKET_TTL_S),
+    ))
+    db.commit()
+    return ticket
+
+
+def redeem_stream_ticket(db: Session, ticket: str) -> Optional[int]:
+    """The ticket's user id, or None if it's unknown, expired or already used."""
+    user_id = db.execute(
+        delete(models.StreamTicket)
+        .where(
+            models.StreamTicket.ticket_hash == _ticket_hash(ticket),
+            models.StreamTicket.expires_at > datetime.utcnow(),
+        )
+        .returning(models.StreamTicket.user_id)
+    ).scalar()
+    db.commit()
+    return user_id
+
+
+# ================= BROKER ==================
+
+async def run_broker(host: str, port: int):
+    """Relay every line any worker sends to all connected workers (itself included)."""
+    workers: Set[asyncio.StreamWriter] = set()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        workers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                for worker in list(workers):
+                    # Cut off a worker that stopped reading instead of buffering for it
+                    if worker.transport.get_write_buffer_size() > EVENTS_BROKER_MAX_BUFFER:
+                        workers.discard(worker)
+                        worker.close()
+                        continue
+                    worker.write(line)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            workers.discard(writer)
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Event broker listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.events")
+    sub = parser.add_subparsers(dest="command", required=True)
+    broker = sub.add_parser("broker", help="relay events between workers")
+    broker.add_argument("--host", default="127.0.0.1")
+    broker.add_argument("--port", type=int, default=7070)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(run_broker(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
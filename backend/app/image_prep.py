@@ -0,0 +1,147 @@
+import os
+from io import BytesIO
+from typing import TYPE_CHECKING, Tuple
+
+# Pillow is imported inside the functions below, on first use, so it stays
+# out of worker boot
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+# ================= PREPROCESSING CONFIG ==================
+PROOF_IMAGE_MAX_DIM = int(os.getenv("PROOF_IMAGE_MAX_DIM", "1024"))   # longest side, px
+PROOF_IMAGE_QUALITY = int(os.getenv("PROOF_IMAGE_QUALITY", "80"))     # JPEG quality
+
+OUTPUT_FORMAT = "JPEG"
+OUTPUT_MIME = "image/jpeg"
+
+# Formats the vision API accepts as-is, used when re-encoding doesn't pay off
+PASSTHROUGH_MIME = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+    "GIF": "image/gif",
+}
+
+ORIENTATION_TAG = 0x0112    # EXIF orientation; 1 = upright
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def validate_image(path: str) -> str:
+    """Check that the file is a readable image. Returns the detected format."""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            fmt = img.format
+            img.verify()
+    except Exception as e:
+        raise InvalidImage("Invalid or corrupted image.") from e
+    return fmt
+
+
+def image_dhash(path: str, size: int = 8) -> int:
+    """
+    64-bit difference hash: grayscale, shrink to (size+1) x size and record
+    whether each pixel is brighter than its right neighbour. Survives
+    re-encoding, resizing and small edits; compare with Hamming distance.
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(path) as img:
+            img.draft("L", (size * 8, size * 8))
+            img = ImageOps.exif_transpose(img).convert("L")
+            img = img.resize((size + 1, size), Image.Resampling.BILINEAR)
+            pixels = img.tobytes()
+    except Exception as e:
+        raise InvalidImage("Invalid or corrupted image.") from e
+
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+def _downscaled_jpeg(img: "Image.Image", max_dim: int, quality: int) -> bytes:
+    """Upright RGB JPEG of img fitting inside max_dim x max_dim."""
+    from PIL import Image, ImageOps
+
+    # JPEG can decode straight at a reduced scale, much cheaper than resizing
+    img.draft("RGB", (max_dim, max_dim))
+    img = ImageOps.exif_transpose(img)
+
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+
+    out = BytesIO()
+    img.save(out, OUTPUT_FORMAT, quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def prepare_image(
+    path: str,
+    max_dim: int = PROOF_IMAGE_MAX_DIM,
+    quality: int = PROOF_IMAGE_QUALITY,
+) -> Tuple[bytes, str]:
+    """
+    Shrink a proof photo to what the vision model actually needs:
+    apply EXIF orientation, fit inside max_dim x max_dim, flatten alpha
+    and re-encode as JPEG. Small, upright images that are already compact
+    are passed through untouched.
+    Returns: (encoded_bytes, mime_type)
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            source_format = img.format
+            untouched = (
+                max(img.size) <= max_dim
+                and img.getexif().get(ORIENTATION_TAG, 1) == 1
+            )
+
+            encoded = _downscaled_jpeg(img, max_dim, quality)
+    except Exception as e:
+        raise InvalidImage("Invalid or corrupted image.") from e
+
+    if untouched and source_format in PASSTHROUGH_MIME:
+        if os.path.getsize(path) <= len(encoded):
+            with open(path, "rb") as f:
+                return f.read(), PASSTHROUGH_MIME[source_format]
+
+    return encoded, OUTPUT_MIME
+
+
+def make_thumbnail(path: str, max_dim: int, quality: int = PROOF_IMAGE_QUALITY) -> bytes:
+    """Always-JPEG preview of a proof photo for the task list."""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            return _downscaled_jpeg(img, max_dim, quality)
+    except Exception as e:
+        raise InvalidImage("Invalid or corrupted image.") from e
+
+
+def image_mime(path: str) -> str:
+    """Content type of an image file, from its header rather than its name."""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            return Image.MIME.get(img.format, "application/octet-stream")
+    except Exception:
+        return "application/octet-stream"
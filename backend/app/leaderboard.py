@@ -0,0 +1,352 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+from .events import LEADERBOARD_CHANNEL, LEADERBOARD_SYNC_CHANNEL, RESYNC, event_hub
+
+
+WINDOWS = ("all", "daily", "weekly")
+
+# Sort key: highest points first, ties broken by user id
+Key = Tuple[int, int]
+
+
+def _key(user_id: int, points: int) -> Key:
+    return (-points, user_id)
+
+
+def encode_cursor(key: Key) -> str:
+    return f"{-key[0]}:{key[1]}"
+
+
+def decode_cursor(cursor: str) -> Key:
+    points, _, user_id = cursor.partition(":")
+    return _key(int(user_id), int(points))
+
+
+def window_start(window: str, today: date) -> Optional[date]:
+    if window == "daily":
+        return today
+    if window == "weekly":
+        return today - timedelta(days=today.weekday())   # Monday
+    return None
+
+
+class RankedBoard:
+    """Sorted (-points, user_id) keys: rank lookups are a bisect, O(log n)."""
+
+    def __init__(self):
+        self.keys: List[Key] = []
+        self.scores: Dict[int, int] = {}
+
+    def load(self, scores: Dict[int, int]):
+        self.scores = dict(scores)
+        self.keys = sorted(_key(uid, pts) for uid, pts in scores.items())
+
+    def set(self, user_id: int, points: int):
+        old = self.scores.get(user_id)
+        if old is not None:
+            i = bisect_left(self.keys, _key(user_id, old))
+            del self.keys[i]
+        self.scores[user_id] = points
+        insort(self.keys, _key(user_id, points))
+
+    def add(self, user_id: int, delta: int):
+        self.set(user_id, self.scores.get(user_id, 0) + delta)
+
+    def rank_of_points(self, points: int) -> int:
+        """1 + number of users strictly ahead (ties share a rank)."""
+        return bisect_left(self.keys, (-points, -1)) + 1
+
+    def rank(self, user_id: int) -> Optional[Tuple[int, int]]:
+        points = self.scores.get(user_id)
+        if points is None:
+            return None
+        return self.rank_of_points(points), points
+
+    def page(self, after: Optional[Key], limit: int) -> List[Key]:
+        start = bisect_right(self.keys, after) if after is not None else 0
+        return self.keys[start:start + limit]
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class Leaderboard:
+    """
+    In-memory leaderboard kept in step with point awards.
+
+    Built from the database on first use, then updated incrementally:
+    awards recorded through record_award() are applied after their
+    transaction commits. Daily/weekly boards hold points earned since the
+    start of the current UTC day / ISO week and reset when it rolls over.
+    State is per process: each worker builds its own copy at startup, then
+    applies the awards and signups other workers relay through the events
+    broker. Only a lost broker connection triggers another full rebuild.
+    """
+
+    def __init__(self):
+        self.boards: Dict[str, RankedBoard] = {w: RankedBoard() for w in WINDOWS}
+        self.window_keys: Dict[str, Optional[date]] = {w: None for w in WINDOWS}
+        self.meta: Dict[int, Tuple[str, int]] = {}          # user_id → (username, streak)
+        self.built = False
+        self.version = 0            # bumped whenever any board changes
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.RLock()      # one rebuild at a time
+        # Updates applied while a rebuild is loading, replayed onto its boards
+        self._replay: Optional[List[tuple]] = None
+
+    # ---------- build ----------
+
+    def rebuild(self, db: Optional[Session] = None):
+        """
+        Reload every board from the database. The new boards are built
+        without holding the lock, so reads and awards carry on meanwhile;
+        awards applied during the rebuild are replayed onto the new boards
+        before they're swapped in.
+        """
+        with self._rebuild_lock:
+            with self._lock:
+                self._replay = []
+            try:
+                built = self._load(db)
+            except BaseException:
+                with self._lock:
+                    self._replay = None
+                raise
+
+            boards, window_keys, meta = built
+            with self._lock:
+                replay, self._replay = self._replay, None
+                self.boards, self.window_keys, self.meta = boards, window_keys, meta
+                self.built = True
+                # An award committed just before _load read the rows but applied
+                # after it started counts twice; that gap is the commit → hook delay
+                for apply, args in replay:
+                    apply(*args)
+                self.version += 1
+
+    def _load(self, db: Optional[Session]):
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            today = datetime.utcnow().date()
+            users = db.query(
+                models.User.id,
+                models.User.username,
+                models.User.total_points,
+                models.User.current_streak,
+            ).all()
+
+            window_scores = {}
+            for window in ("daily", "weekly"):
+                rows = (
+                    db.query(models.StreakLog.user_id, func.sum(models.StreakLog.points))
+                    .filter(models.StreakLog.date >= window_start(window, today))
+                    .group_by(models.StreakLog.user_id)
+                    .all()
+                )
+                window_scores[window] = {user_id: int(points) for user_id, points in rows}
+        finally:
+            if own_session:
+                db.close()
+
+        boards = {w: RankedBoard() for w in WINDOWS}
+        boards["all"].load({u.id: u.total_points or 0 for u in users})
+        window_keys: Dict[str, Optional[date]] = {"all": None}
+        for window, scores in window_scores.items():
+            boards[window].load(scores)
+            window_keys[window] = window_start(window, today)
+        meta = {u.id: (u.username, u.current_streak or 0) for u in users}
+        return boards, window_keys, meta
+
+    def _ensure_built(self):
+        if not self.built:
+            with self._rebuild_lock:
+                if not self.built:
+                    self.rebuild()
+
+    # ---------- other workers ----------
+
+    def on_remote(self, payload: dict):
+        """Listener for LEADERBOARD_SYNC_CHANNEL: apply another worker's update."""
+        if payload["type"] == RESYNC["type"]:
+            # Updates were lost with the broker connection; reload off the relay thread
+            threading.Thread(target=self._rebuild_quietly, name="leaderboard-rebuild", daemon=True).start()
+        elif payload["type"] == "award":
+            self.apply_award(
+                payload["user_id"], payload["username"], payload["current_streak"],
+                payload["points"], date.fromisoformat(payload["day"]), announce=False,
+            )
+        elif payload["type"] == "user":
+            self.add_user(payload["user_id"], payload["username"])
+
+    def _rebuild_quietly(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            print("Leaderboard rebuild error →", e)
+
+    def _roll_windows(self, today: date):
+        for window in ("daily", "weekly"):
+            start = window_start(window, today)
+            if self.window_keys[window] != start:
+                self.boards[window] = RankedBoard()
+                self.window_keys[window] = start
+                self.version += 1
+
+    # ---------- updates ----------
+
+    def record_award(self, db: Session, user: models.User, points: int, when: datetime):
+        """Queue an award on the session; it's applied once the session commits."""
+        db.info.setdefault("leaderboard_awards", []).append(
+            (user.id, user.username, user.current_streak or 0, points, when.date())
+        )
+
+    def apply_award(
+        self, user_id: int, username: str, streak: int, points: int, day: date, announce: bool = True
+    ):
+        """announce=False for awards relayed from another worker, which told the streams itself."""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((self._apply, (user_id, username, streak, points, day)))
+            if not self.built:
+                return      # the rebuild in progress (or on first read) will include it
+            self._apply(user_id, username, streak, points, day)
+            self.version += 1
+            rank, total = self.boards["all"].rank(user_id)
+            version = self.version
+
+        if not announce:
+            return
+
+        # Delta for open streams; clients patch their copy or refetch a page
+        event_hub.publish(LEADERBOARD_CHANNEL, {
+            "type": "leaderboard",
+            "user_id": user_id,
+            "username": username,
+            "points_added": points,
+            "total_points": total,
+            "rank": rank,
+            "current_streak": streak,
+            "version": version,
+        })
+
+    def _apply(self, user_id: int, username: str, streak: int, points: int, day: date):
+        """Add an award to the boards. Caller holds the lock."""
+        self._roll_windows(datetime.utcnow().date())
+        self.meta[user_id] = (username, streak)
+        self.boards["all"].add(user_id, points)
+        for window in ("daily", "weekly"):
+            if day >= self.window_keys[window]:
+                self.boards[window].add(user_id, points)
+
+    def add_user(self, user_id: int, username: str):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((self._add_user, (user_id, username)))
+            if self.built:
+                self._add_user(user_id, username)
+
+    def _add_user(self, user_id: int, username: str):
+        if user_id in self.meta:
+            return
+        self.meta[user_id] = (username, 0)
+        self.boards["all"].set(user_id, 0)
+        self.version += 1
+
+    # ---------- reads ----------
+
+    def current_version(self) -> int:
+        """Board version after rolling any expired daily/weekly window."""
+        self._ensure_built()
+        with self._lock:
+            self._roll_windows(datetime.utcnow().date())
+            return self.version
+
+    def page(self, window: str = "all", limit: int = 20, cursor: Optional[str] = None):
+        """Returns (items, next_cursor)."""
+        self._ensure_built()
+        with self._lock:
+            self._roll_windows(datetime.utcnow().date())
+            board = self.boards[window]
+            after = decode_cursor(cursor) if cursor else None
+            keys = board.page(after, limit + 1)
+
+            items = []
+            for neg_points, user_id in keys[:limit]:
+                username, streak = self.meta.get(user_id, ("", 0))
+                items.append(
+                    {
+                        "rank": board.rank_of_points(-neg_points),
+                        "user_id": user_id,
+                        "username": username,
+                        "points": -neg_points,
+                        "total_points": self.boards["all"].scores.get(user_id, 0),
+                        "current_streak": streak,
+                    }
+                )
+
+            next_cursor = encode_cursor(keys[limit - 1]) if len(keys) > limit else None
+            return items, next_cursor
+
+    def rank(self, user_id: int, window: str = "all") -> dict:
+        self._ensure_built()
+        with self._lock:
+            self._roll_windows(datetime.utcnow().date())
+            board = self.boards[window]
+            found = board.rank(user_id)
+            if found is None:
+                # No points in this window yet → tied with everyone else on 0
+                rank, points = len(board) + 1, 0
+            else:
+                rank, points = found
+            return {
+                "window": window,
+                "rank": rank,
+                "points": points,
+                "total_users": len(self.boards["all"]),
+            }
+
+
+leaderboard = Leaderboard()
+event_hub.listen(LEADERBOARD_SYNC_CHANNEL, leaderboard.on_remote)
+
+
+# ================= SESSION HOOKS ==================
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_users(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, models.User):
+            session.info.setdefault("leaderboard_new_users", []).append(
+                (obj.id, obj.username)
+            )
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session):
+    # Applied here, then relayed so the other workers' boards follow
+    for user_id, username in session.info.pop("leaderboard_new_users", ()):
+        leaderboard.add_user(user_id, username)
+        event_hub.publish(LEADERBOARD_SYNC_CHANNEL, {
+            "type": "user", "user_id": user_id, "username": username,
+        })
+    for user_id, username, streak, points, day in session.info.pop("leaderboard_awards", ()):
+        leaderboard.apply_award(user_id, username, streak, points, day)
+        event_hub.publish(LEADERBOARD_SYNC_CHANNEL, {
+            "type": "award", "user_id": user_id, "username": username,
+            "current_streak": streak, "points": points, "day": day.isoformat(),
+        })
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_on_rollback(session):
+    session.info.pop("leaderboard_new_users", None)
+    session.info.pop("leaderboard_awards", None)
@@ -1,29 +1,109 @@
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from contextlib import asynccontextmanager
 import os
-from datetime import datetime
+import threading
+from datetime import date, datetime, timedelta
 
-from . import models, schemas
-from .database import engine, get_db
+from . import models, schemas, migrations
+from .database import engine, get_db, get_async_db, AsyncSessionLocal
+from .openai_client import get_client
 from .auth_utils import (
     get_password_hash,
-    verify_password,
     create_access_token,
     decode_access_token,
-    verify_proof_image
+    password_hasher,
+    HasherBusy,
 )
 from .streaks import update_user_streak_and_points
-from .ai_verifier import ai_verify_proof
+from .principal_cache import principal_cache, UserSnapshot
+from .response_cache import etag_matches, mark_data_changed, response_cache
+from .events import (
+    EVENTS_HEARTBEAT_S,
+    EVENTS_RETRY_MS,
+    EVENTS_TICKET_TTL_S,
+    LEADERBOARD_CHANNEL,
+    event_hub,
+    format_sse,
+    issue_stream_ticket,
+    record_task_change,
+    redeem_stream_ticket,
+    user_channel,
+)
+from .leaderboard import leaderboard
+from .dashboard import LEADERBOARD_WIDGETS, build_dashboard, parse_widgets
+from .task_queries import (
+    task_list_query,
+    parse_fields,
+    encode_task_cursor,
+    decode_task_cursor,
+)
+from .proof_queue import proof_queue
+from .uploads import UploadLimitMiddleware, save_upload
+from .image_prep import InvalidImage, image_dhash, image_mime, validate_image
+from .phash_index import encode_phash, phash_index
+from .proof_blobs import acquire_blob, proof_tag, record_stored_blob, release_proof, serving_path
+from .thumbnails import THUMBNAIL_SIZES, ensure_thumbnail
+from .storage import storage
+from . import metrics
+
+
+# ================= STARTUP CONFIG ==================
+# Schema changes are applied with `python -m app.migrations upgrade` before
+# the workers start; set MIGRATE_ON_STARTUP=1 to have each worker do it (dev)
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "0") == "1"
+# Import Pillow and build the model client in the background once serving,
+# so the first proof upload doesn't pay for it
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "1") == "1"
+
+
+def _check_schema():
+    if MIGRATE_ON_STARTUP:
+        migrations.upgrade(engine)
+        return
+    pending = migrations.pending(engine)
+    if pending:
+        raise RuntimeError(
+            f"Database schema is behind (pending migrations {pending}); "
+            "run `python -m app.migrations upgrade` first."
+        )
+
+
+def _warm_up():
+    try:
+        import PIL.Image  # noqa: F401
 
+        if os.getenv("OPENAI_API_KEY"):
+            get_client()
+    except Exception as e:
+        print("Warm-up error →", e)
 
-# Create DB tables
-models.Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _check_schema()
+    # Pick up proofs that were still pending when the last worker stopped
+    proof_queue.requeue_pending()
+    # Hear other workers' updates from before the leaderboard is read
+    event_hub.start()
+    leaderboard.rebuild()
+    if WARM_UP_ON_STARTUP:
+        threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
 
-app = FastAPI(title="TaskSure API")
+    yield
+
+    proof_queue.shutdown(wait=False)
+    event_hub.close()
+
+
+app = FastAPI(title="TaskSure API", lifespan=lifespan)
 
 # Allow frontend calls
 origins = [
@@ -32,12 +112,28 @@ origins = [
     "https://tasksure-frontend.onrender.com"
 ]
 
+# Innermost: refuses oversized proof bodies before the form is parsed
+app.add_middleware(UploadLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Accept-Ranges", "Content-Range"],
+)
+
+# Added last so it wraps everything, CORS included
+app.add_middleware(metrics.MetricsMiddleware)
+
+metrics.registry.gauge(
+    "tasksure_proof_queue_pending", "Proofs queued or being verified.",
+    read=lambda: {(): proof_queue.pending()},
+)
+metrics.registry.gauge(
+    "tasksure_event_streams", "Open /events streams in this worker.",
+    read=lambda: {(): event_hub.stats()["streams"]},
 )
 
 
@@ -46,20 +142,35 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 # ---------------- AUTH HELPERS ----------------
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> models.User:
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    db: AsyncSession = Depends(get_async_db),
+) -> UserSnapshot:
+    return await _user_for_token(token, db)
 
-    user_id = payload.get("sub")
-    user = db.get(models.User, int(user_id))
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
 
-    return user
+async def _user_for_token(token: str, db: AsyncSession) -> UserSnapshot:
+    user_id = principal_cache.get_token(token)
+    if user_id is None:
+        payload = decode_access_token(token)
+        if payload is None:
+            raise HTTPException(status_code=401, detail="Invalid token")
+
+        user_id = int(payload.get("sub"))
+        principal_cache.put_token(token, user_id, payload.get("exp"))
+
+    return await _user_snapshot(user_id, db)
+
+
+async def _user_snapshot(user_id: int, db: AsyncSession) -> UserSnapshot:
+    snapshot = principal_cache.get_user(user_id)
+    if snapshot is None:
+        user = await db.get(models.User, user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        snapshot = principal_cache.put_user(user)
+
+    return snapshot
 
 
 # ---------------- ROOT ----------------
@@ -74,6 +185,21 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus text format (per worker)."""
+    return Response(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/metrics/cache")
+def cache_metrics():
+    """Hit rates of the in-process caches (per worker)."""
+    return {
+        "responses": response_cache.stats(),
+        "principals": principal_cache.stats(),
+    }
+
+
 # ---------------- AUTH ----------------
 
 @app.post("/auth/register", response_model=schemas.UserOut)
@@ -82,10 +208,15 @@ def register_user(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
+    try:
+        hashed_password = get_password_hash(user_in.password)
+    except HasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again shortly")
+
     user = models.User(
         email=user_in.email,
         username=user_in.username,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password,
     )
 
     db.add(user)
@@ -101,46 +232,67 @@ def login(
 ):
     user = db.query(models.User).filter(models.User.email == form_data.username).first()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+
+    try:
+        ok, new_hash = password_hasher.verify_and_update(
+            form_data.password, user.hashed_password
+        )
+    except HasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again shortly")
+
+    if not ok:
         raise HTTPException(status_code=401, detail="Incorrect email or password")
 
+    # Legacy SHA-256 / outdated cost → upgrade transparently
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+
     token = create_access_token({"sub": str(user.id)})
     return {"access_token": token, "token_type": "bearer"}
 
 
 @app.get("/auth/me", response_model=schemas.UserOut)
-def read_current_user(current_user: models.User = Depends(get_current_user)):
+async def read_current_user(current_user: UserSnapshot = Depends(get_current_user)):
     return current_user
 
 
 # ---------------- STATS ----------------
 
 @app.get("/stats/me", response_model=schemas.UserStats)
-def get_my_stats(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+async def get_my_stats(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    tasks_completed = (
-        db.query(models.Task)
-        .filter(models.Task.owner_id == current_user.id, models.Task.status == "completed")
-        .count()
-    )
+    async def build():
+        tasks_completed = await db.scalar(
+            select(func.count())
+            .select_from(models.Task)
+            .where(models.Task.owner_id == current_user.id, models.Task.status == "completed")
+        )
 
-    return {
-        "total_points": current_user.total_points,
-        "current_streak": current_user.current_streak,
-        "longest_streak": current_user.longest_streak,
-        "tasks_completed": tasks_completed,
-    }
+        return schemas.UserStats(
+            total_points=current_user.total_points,
+            current_streak=current_user.current_streak,
+            longest_streak=current_user.longest_streak,
+            tasks_completed=tasks_completed,
+        ), {}
+
+    return await response_cache.respond(
+        request, "stats_me", current_user.id, response_cache.version(current_user.id), build
+    )
 
 
 # ---------------- TASK CRUD ----------------
 
 @app.post("/tasks", response_model=schemas.TaskOut)
-def create_task(
+async def create_task(
     task_in: schemas.TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     task = models.Task(
         title=task_in.title,
@@ -150,39 +302,66 @@ def create_task(
         owner_id=current_user.id,
     )
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task)
     return task
 
 
 @app.get("/tasks", response_model=List[schemas.TaskOut])
-def list_tasks(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+async def list_tasks(
+    request: Request,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    priority: Optional[str] = None,
+    due_before: Optional[datetime] = None,
+    due_after: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    return (
-        db.query(models.Task)
-        .filter(models.Task.owner_id == current_user.id)
-        .order_by(models.Task.created_at.desc())
-        .all()
-    )
+    # Without limit/cursor this is the old "everything" listing
+    try:
+        after = decode_task_cursor(cursor) if cursor else None
+        columns = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def build():
+        stmt = task_list_query(
+            current_user.id,
+            columns=columns,
+            status=status_filter,
+            priority=priority,
+            due_before=due_before,
+            due_after=due_after,
+            cursor=after,
+            limit=limit + 1 if limit else None,
+        )
 
+        if columns is None:
+            rows = (await db.scalars(stmt)).all()
+        else:
+            rows = (await db.execute(stmt)).all()
 
-@app.put("/tasks/{task_id}", response_model=schemas.TaskOut)
-def update_task(
-    task_id: int,
-    task_in: schemas.TaskUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
-):
-    task = (
-        db.query(models.Task)
-        .filter(models.Task.id == task_id, models.Task.owner_id == current_user.id)
-        .first()
+        headers = {}
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_task_cursor(rows[-1].created_at, rows[-1].id)
+
+        if columns is None:
+            return [schemas.TaskOut.model_validate(row) for row in rows], headers
+
+        # Sparse field set: only the requested columns were selected
+        return [{name: getattr(row, name) for name in columns} for row in rows], headers
+
+    return await response_cache.respond(
+        request, "tasks", current_user.id, response_cache.version(current_user.id), build
     )
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
 
+
+def _apply_task_update(task: models.Task, task_in: schemas.TaskUpdate) -> bool:
+    """Copy the set fields onto task. Returns True if it just became completed."""
     old_status = task.status
 
     # Update fields
@@ -197,94 +376,344 @@ def update_task(
     if task_in.status is not None:
         task.status = task_in.status
 
+    return task.status == "completed" and old_status != "completed"
+
+
+# ---------------- BULK TASK OPS ----------------
+# One transaction per batch. Declared before /tasks/{task_id} so "bulk"
+# is never parsed as a task id.
+
+@app.post("/tasks/bulk", response_model=schemas.BulkResult)
+async def bulk_create_tasks(
+    batch: schemas.TaskBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    rows = [
+        {
+            "title": item.title,
+            "description": item.description,
+            "priority": item.priority,
+            "due_date": item.due_date,
+            "owner_id": current_user.id,
+        }
+        for item in batch.items
+    ]
+
+    # One multi-row INSERT ... RETURNING instead of a round trip per task
+    tasks = (await db.scalars(insert(models.Task).returning(models.Task), rows)).all()
+    mark_data_changed(db, current_user.id)
+    for task in tasks:
+        record_task_change(
+            db, current_user.id, task.id, "created", status=task.status, proof_status=task.proof_status
+        )
+    await db.commit()
+
+    return {
+        "results": [
+            {"index": i, "id": task.id, "ok": True, "task": task}
+            for i, task in enumerate(tasks)
+        ]
+    }
+
+
+@app.patch("/tasks/bulk", response_model=schemas.BulkResult)
+async def bulk_update_tasks(
+    batch: schemas.TaskBulkUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    ids = [item.id for item in batch.items]
+    tasks = {
+        task.id: task
+        for task in await db.scalars(
+            select(models.Task).where(
+                models.Task.id.in_(ids), models.Task.owner_id == current_user.id
+            )
+        )
+    }
+
+    now = datetime.utcnow()
+    completions = 0
+    results = []
+
+    for i, item in enumerate(batch.items):
+        task = tasks.get(item.id)
+        if task is None:
+            results.append({"index": i, "id": item.id, "ok": False, "error": "Task not found"})
+            continue
+
+        if _apply_task_update(task, item):
+            task.completed_at = now
+            completions += 1
+        results.append({"index": i, "id": item.id, "ok": True, "task": task})
+
+    # Streak/points once for the whole batch
+    if completions:
+        user = await db.get(models.User, current_user.id)
+        await db.run_sync(update_user_streak_and_points, user, now, completions)
+
+    await db.commit()
+    return {"results": results}
+
+
+@app.delete("/tasks/bulk", response_model=schemas.BulkResult)
+async def bulk_delete_tasks(
+    batch: schemas.TaskBulkDelete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    rows = (
+        await db.execute(
+            select(models.Task.id, models.Task.proof_url).where(
+                models.Task.id.in_(batch.ids), models.Task.owner_id == current_user.id
+            )
+        )
+    ).all()
+    owned = {task_id for task_id, _ in rows}
+
+    if owned:
+        for _, proof_url in rows:
+            await db.run_sync(release_proof, proof_url)
+        await db.execute(delete(models.Task).where(models.Task.id.in_(owned)))
+        mark_data_changed(db, current_user.id)
+        for task_id in owned:
+            record_task_change(db, current_user.id, task_id, "deleted")
+        await db.commit()
+        phash_index.forget(current_user.id)
+
+    return {
+        "results": [
+            {"index": i, "id": task_id, "ok": True}
+            if task_id in owned
+            else {"index": i, "id": task_id, "ok": False, "error": "Task not found"}
+            for i, task_id in enumerate(batch.ids)
+        ]
+    }
+
+
+@app.put("/tasks/{task_id}", response_model=schemas.TaskOut)
+async def update_task(
+    task_id: int,
+    task_in: schemas.TaskUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    task = await db.scalar(
+        select(models.Task).where(
+            models.Task.id == task_id, models.Task.owner_id == current_user.id
+        )
+    )
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
     # Streak update
-    if task.status == "completed" and old_status != "completed":
+    if _apply_task_update(task, task_in):
         task.completed_at = datetime.utcnow()
-        update_user_streak_and_points(db, current_user, task.completed_at)
+        user = await db.get(models.User, current_user.id)
+        await db.run_sync(update_user_streak_and_points, user, task.completed_at)
 
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task)
     return task
 
 
 @app.delete("/tasks/{task_id}", status_code=204)
-def delete_task(
+async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    task = (
-        db.query(models.Task)
-        .filter(models.Task.id == task_id, models.Task.owner_id == current_user.id)
-        .first()
+    task = await db.scalar(
+        select(models.Task).where(
+            models.Task.id == task_id, models.Task.owner_id == current_user.id
+        )
     )
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    db.delete(task)
-    db.commit()
+    await db.run_sync(release_proof, task.proof_url)
+    await db.delete(task)
+    await db.commit()
+    if task.proof_phash:
+        phash_index.remove(current_user.id, task_id)
     return
 
 
 # ---------------- LEADERBOARD ----------------
 
 @app.get("/leaderboard")
-def get_leaderboard(db: Session = Depends(get_db)):
-    users = (
-        db.query(models.User)
-        .order_by(models.User.total_points.desc())
-        .limit(20)
-        .all()
+async def get_leaderboard(
+    request: Request,
+    window: str = Query("all", pattern="^(all|daily|weekly)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    async def build():
+        try:
+            items, next_cursor = leaderboard.page(window, limit, cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        # Body stays a plain list; the next page is advertised in a header
+        return items, {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+    # Same for everyone, so one cache entry per page serves all users
+    return await response_cache.respond(
+        request, "leaderboard", None, f"lb{leaderboard.current_version()}", build
     )
 
-    return [
-        {
-            "username": user.username,
-            "total_points": user.total_points,
-            "current_streak": user.current_streak,
-        }
-        for user in users
-    ]
-@app.get("/calendar/me")
-def calendar_event_me(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    from datetime import datetime, timedelta
 
-    today = datetime.utcnow().date()
-    start = today - timedelta(days=60)
+@app.get("/leaderboard/me")
+async def get_my_rank(
+    window: str = Query("all", pattern="^(all|daily|weekly)$"),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    return leaderboard.rank(current_user.id, window)
+
 
-    logs = (
-        db.query(models.StreakLog)
-        .filter(models.StreakLog.user_id == current_user.id)
-        .filter(models.StreakLog.date >= start)
-        .all()
-    )
+async def _streak_logs_between(db: AsyncSession, user_id: int, start, end):
+    stmt = select(models.StreakLog).where(models.StreakLog.user_id == user_id)
+    if start is not None:
+        stmt = stmt.where(models.StreakLog.date >= start)
+    if end is not None:
+        stmt = stmt.where(models.StreakLog.date <= end)
+    return (await db.scalars(stmt.order_by(models.StreakLog.date))).all()
+
+
+@app.get("/calendar/me")
+async def calendar_event_me(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    # Default window: the last 60 days
+    if start is None:
+        start = datetime.utcnow().date() - timedelta(days=60)
+
+    logs = await _streak_logs_between(db, current_user.id, start, end)
 
     return [
-        {"date": log.date.isoformat(), "points": log.points}
+        {
+            "date": log.date.isoformat(),
+            "points": log.points,
+            "completed_count": log.completed_count,
+        }
         for log in logs
     ]
+
+
 @app.get("/streak/calendar")
-def streak_calendar(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+async def streak_calendar(
+    request: Request,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    tasks = (
-        db.query(models.Task)
-        .filter(
-            models.Task.owner_id == current_user.id,
-            models.Task.status == "completed",
-            models.Task.completed_at.isnot(None),
-        )
-        .all()
+    async def build():
+        logs = await _streak_logs_between(db, current_user.id, start, end)
+        return {log.date.isoformat(): log.completed_count for log in logs}, {}
+
+    return await response_cache.respond(
+        request, "streak_calendar", current_user.id, response_cache.version(current_user.id), build
     )
 
-    calendar = {}
 
-    for task in tasks:
-        day = task.completed_at.date().isoformat()
-        calendar[day] = calendar.get(day, 0) + 1
+# ---------------- DASHBOARD ----------------
+
+@app.get("/dashboard", response_model=schemas.DashboardOut, response_model_exclude_none=True)
+async def get_dashboard(
+    request: Request,
+    fields: Optional[str] = None,
+    task_limit: int = Query(20, ge=1, le=100),
+    days: int = Query(60, ge=1, le=366),
+    leaderboard_limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """user, stats, tasks, calendar and leaderboard in one call; ?fields= picks widgets."""
+    try:
+        widgets = parse_widgets(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    version = response_cache.version(current_user.id)
+    if LEADERBOARD_WIDGETS.intersection(widgets):
+        version = f"{version}-lb{leaderboard.current_version()}"
+    if "calendar" in widgets:
+        # The window moves at midnight even when no data changed
+        version = f"{version}-{datetime.utcnow().date().isoformat()}"
+
+    async def build():
+        return await build_dashboard(
+            db, current_user, widgets, task_limit, days, leaderboard_limit
+        ), {}
+
+    return await response_cache.respond(request, "dashboard", current_user.id, version, build)
 
-    return calendar
+
+# ---------------- PUSH EVENTS ----------------
+
+@app.post("/events/ticket", response_model=schemas.StreamTicketOut)
+async def create_stream_ticket(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """Single-use ticket for GET /events?ticket=, valid for EVENTS_TICKET_TTL_S seconds."""
+    ticket = await db.run_sync(issue_stream_ticket, current_user.id)
+    return {"ticket": ticket, "expires_in": EVENTS_TICKET_TTL_S}
+
+
+@app.get("/events")
+async def stream_events(
+    request: Request,
+    ticket: Optional[str] = None,
+    leaderboard_updates: bool = Query(True, alias="leaderboard"),
+):
+    """
+    Server-sent events for the current user, so clients can stop polling:
+    "tasks" (rows created/updated/deleted), "proof" (a verdict landed),
+    "stats" (points/streak) and, unless leaderboard=false, "leaderboard"
+    deltas. "resync" means events were missed: refetch what's on screen.
+    EventSource can't set headers, so browsers pass ?ticket= from
+    POST /events/ticket (a fresh one per connection) instead of the token.
+    """
+    scheme, _, bearer = request.headers.get("authorization", "").partition(" ")
+    token = bearer if scheme.lower() == "bearer" else None
+    if not token and not ticket:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    # Own short session: the stream stays open far longer than the lookup
+    async with AsyncSessionLocal() as db:
+        if token:
+            current_user = await _user_for_token(token, db)
+        else:
+            user_id = await db.run_sync(redeem_stream_ticket, ticket)
+            if user_id is None:
+                raise HTTPException(status_code=401, detail="Invalid or expired ticket")
+            current_user = await _user_snapshot(user_id, db)
+
+    channels = [user_channel(current_user.id)]
+    if leaderboard_updates:
+        channels.append(LEADERBOARD_CHANNEL)
+
+    async def stream():
+        subscription = event_hub.subscribe(channels)
+        try:
+            yield f"retry: {EVENTS_RETRY_MS}\n\n"
+            while True:
+                payload = await subscription.get(EVENTS_HEARTBEAT_S)
+                yield ": ping\n\n" if payload is None else format_sse(payload)
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # ---------------- PROOF UPLOAD + AI CHECK ----------------
@@ -293,63 +722,198 @@ async def upload_task_proof(
     task_id: int,
     proof_text: str = Form(""),
     file: UploadFile | None = File(None),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
 
-    task = (
-        db.query(models.Task)
-        .filter(models.Task.id == task_id, models.Task.owner_id == current_user.id)
-        .first()
+    task = await db.scalar(
+        select(models.Task).where(
+            models.Task.id == task_id, models.Task.owner_id == current_user.id
+        )
     )
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    upload_dir = os.path.join(os.path.dirname(__file__), "..", "proof_uploads")
-    os.makedirs(upload_dir, exist_ok=True)
-
-    if file:
-        filename = f"task_{task.id}_{datetime.utcnow().timestamp()}_{file.filename}"
-        saved_path = os.path.join(upload_dir, filename)
-        with open(saved_path, "wb") as f:
-            f.write(await file.read())
+    # ✅ SMART PROOF DECISION
+    final_text = proof_text or task.proof_text
+    text_approved = bool(final_text and len(final_text.strip()) >= 30)
 
-        task.proof_url = saved_path
-        task.proof_type = "image"
+    # Anything else goes to the background AI check; claim a slot up front
+    if not text_approved and not proof_queue.reserve():
+        raise HTTPException(
+            status_code=503, detail="Proof verification is busy, try again shortly"
+        )
 
-    if proof_text:
-        task.proof_text = proof_text
-        if not task.proof_type:
-            task.proof_type = "text"
+    phash = None
+    duplicate = None
+    staged_path = None
+    retry_path = None
+    new_blob = False
+
+    try:
+        if file:
+            staged_path = storage.staging_path()
+            size, sha256 = await save_upload(file, staged_path)
+
+            # Pillow decode is CPU-bound → keep it off the event loop
+            try:
+                await run_in_threadpool(validate_image, staged_path)
+                phash = await run_in_threadpool(image_dhash, staged_path)
+            except InvalidImage as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            # Content-addressed: identical files share one stored blob. The
+            # file goes to storage before the refcount write so no upload runs
+            # under the DB write lock; if the transaction then rolls back,
+            # the file is deleted again unless another upload claimed it.
+            if sha256 != task.proof_url:
+                if not await run_in_threadpool(storage.exists, sha256):
+                    retry_path = await run_in_threadpool(storage.keep_staged, staged_path)
+                    await run_in_threadpool(storage.store, sha256, staged_path)
+                    await db.run_sync(record_stored_blob, sha256)
+                new_blob = await db.run_sync(acquire_blob, sha256, size) == 1
+                await db.run_sync(release_proof, task.proof_url)
+
+            task.proof_url = sha256
+            task.proof_type = "image"
+            task.proof_phash = encode_phash(phash)
+
+            # Same photo as one of the user's earlier proofs → no vision call
+            duplicate = await db.run_sync(
+                phash_index.find, current_user.id, phash, task.id
+            )
+
+        if proof_text:
+            task.proof_text = proof_text
+            if not task.proof_type:
+                task.proof_type = "text"
+
+        task.proof_submitted_at = datetime.utcnow()
+        task.rejection_reason = "duplicate_image" if duplicate else None
+
+        if duplicate:
+            task.proof_status = "rejected"
+            task.proof_feedback = (
+                f"This photo was already used as proof for task #{duplicate[0]}."
+            )
+        elif text_approved:
+            task.proof_status = "approved"
+            task.proof_feedback = "Proof accepted based on detailed text verification."
+
+            if task.status != "completed":
+                task.status = "completed"
+                task.completed_at = datetime.utcnow()
+                user = await db.get(models.User, current_user.id)
+                await db.run_sync(update_user_streak_and_points, user, task.completed_at)
+        else:
+            task.proof_status = "pending"
+            task.proof_feedback = None
+            task.proof_claimed_until = None     # a new proof; any old claim is moot
+
+        await db.commit()
+        await db.refresh(task)
+
+        # A GC of the blob's old zero-count row can delete the file between
+        # our store and acquire; now that the row is ours, put it back
+        if new_blob and not await run_in_threadpool(storage.exists, sha256):
+            await run_in_threadpool(storage.store, sha256, retry_path or staged_path)
+    except Exception:
+        # Explicit, so the rollback hooks run before the session is closed
+        await db.rollback()
+        if not text_approved:
+            proof_queue.release()
+        raise
+    finally:
+        for path in (staged_path, retry_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    if phash is not None:
+        phash_index.add(current_user.id, phash, task.id)
+
+    if not text_approved:
+        if duplicate:
+            proof_queue.release()
+        else:
+            # Verdict lands later; the client polls /tasks/{id}/proof/status
+            proof_queue.submit(task.id)
 
-    # ✅ SMART PROOF DECISION
-    approved = False
-    feedback = ""
-
-    if task.proof_text and len(task.proof_text.strip()) >= 30:
-        approved = True
-        feedback = "Proof accepted based on detailed text verification."
-    else:
-        approved, feedback = ai_verify_proof(
-            task.proof_text,
-            task.proof_url,
-            task_title=task.title,
-            task_description=task.description,
-        )
+    return task   # ✅ INSIDE FUNCTION
 
-    task.proof_feedback = feedback
 
-    if approved:
-        task.proof_status = "approved"
+def _prepare_proof_image(proof_url: str, size: str):
+    """Blocking part of serving a proof image: (path, media_type) or None."""
+    path = serving_path(proof_url)
+    if path is None:
+        return None
+    if size == "full":
+        return path, image_mime(path)
+    return ensure_thumbnail(proof_tag(proof_url), path, size), "image/jpeg"
 
-        if task.status != "completed":
-            task.status = "completed"
-            task.completed_at = datetime.utcnow()
-            update_user_streak_and_points(db, current_user, task.completed_at)
-    else:
-        task.proof_status = "rejected"
 
-    db.commit()
-    db.refresh(task)
+@app.get("/tasks/{task_id}/proof/image")
+async def get_task_proof_image(
+    task_id: int,
+    request: Request,
+    size: str = Query("full", pattern=f"^(full|{'|'.join(THUMBNAIL_SIZES)})$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """
+    The task's proof photo, or a cached JPEG thumbnail of it (size=thumb|preview).
+    Sent with FileResponse, so Range/If-Range work and servers that support
+    it use sendfile. The ETag is derived from the content, so clients can
+    revalidate with If-None-Match and get a 304 without touching the file.
+    """
+    row = (
+        await db.execute(
+            select(models.Task.proof_url).where(
+                models.Task.id == task_id, models.Task.owner_id == current_user.id
+            )
+        )
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    proof_url = row.proof_url
+    if not proof_url:
+        raise HTTPException(status_code=404, detail="Task has no proof image")
+
+    tag = proof_tag(proof_url)
+    etag = f'"{tag}"' if size == "full" else f'"{tag}-{size}"'
+    # The URL stays the same when the proof is replaced, so always revalidate
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        prepared = await run_in_threadpool(_prepare_proof_image, proof_url, size)
+    except InvalidImage:
+        prepared = None
+    if prepared is None:
+        raise HTTPException(status_code=404, detail="Proof image is no longer available")
+
+    path, media_type = prepared
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@app.get("/tasks/{task_id}/proof/status", response_model=schemas.ProofStatusOut)
+async def get_task_proof_status(
+    task_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    task = await db.scalar(
+        select(models.Task).where(
+            models.Task.id == task_id, models.Task.owner_id == current_user.id
+        )
+    )
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
 
-    return task   # ✅ INSIDE FUNCTION
+    return {
+        "task_id": task.id,
+        "status": task.status,
+        "proof_status": task.proof_status,
+        "proof_feedback": task.proof_feedback,
+        "proof_submitted_at": task.proof_submitted_at,
+    }
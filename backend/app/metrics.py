@@ -0,0 +1,311 @@
+"""
+Process metrics in Prometheus text format, served at GET /metrics.
+
+Hand-rolled counters, gauges and histograms (no client library dependency).
+Per-request SQL accounting rides on a context variable set by
+MetricsMiddleware and filled by engine events, so work done in threadpools
+and run_sync calls is attributed to the request that caused it. Background
+threads (proof queue, GC) only show up in the global SQL metrics.
+
+With SLOW_REQUEST_MS > 0, requests slower than that are printed together
+with the queries they ran.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# ================= METRICS CONFIG ==================
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "0"))            # 0 = off
+SLOW_REQUEST_MAX_QUERIES = int(os.getenv("SLOW_REQUEST_MAX_QUERIES", "50"))
+SLOW_QUERY_SQL_CHARS = 300
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BYTE_BUCKETS = (16e3, 64e3, 256e3, 1e6, 2e6, 5e6, 10e6, 25e6)
+
+# Long-lived or self-referential routes whose duration isn't a latency
+UNTIMED_ROUTES = {"/events", "/metrics"}
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value read at scrape time from a callback returning {label values: value}."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=(), read: Optional[Callable[[], Dict]] = None):
+        super().__init__(name, help_text, labels)
+        self.read = read
+
+    def render(self) -> List[str]:
+        try:
+            values = self.read() if self.read else {}
+        except Exception as e:
+            print("Metrics error →", e)
+            values = {}
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, key)} {_number(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[LabelValues, list] = {}      # [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = self.header()
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# ---------- HTTP ----------
+http_requests = registry.counter(
+    "tasksure_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+http_duration = registry.histogram(
+    "tasksure_http_request_duration_seconds", "HTTP request latency.", ("method", "route")
+)
+http_sql_queries = registry.histogram(
+    "tasksure_http_request_sql_queries", "SQL statements run per request.", ("method", "route"),
+    buckets=COUNT_BUCKETS,
+)
+http_sql_duration = registry.histogram(
+    "tasksure_http_request_sql_seconds", "Time spent in SQL per request.", ("method", "route")
+)
+
+# ---------- SQL (all callers, including background threads) ----------
+sql_duration = registry.histogram(
+    "tasksure_sql_query_duration_seconds", "SQL statement latency by kind.", ("kind",)
+)
+sql_errors = registry.counter("tasksure_sql_errors_total", "SQL statements that raised.", ("kind",))
+
+# ---------- AI model ----------
+ai_duration = registry.histogram(
+    "tasksure_ai_call_duration_seconds", "Model call latency, retries included.", ("model", "outcome")
+)
+ai_calls = registry.counter("tasksure_ai_calls_total", "Model calls by outcome.", ("model", "outcome"))
+ai_attempt_errors = registry.counter(
+    "tasksure_ai_attempt_errors_total", "Failed attempts by error type (before any retry).",
+    ("model", "error"),
+)
+ai_tokens = registry.counter("tasksure_ai_tokens_total", "Tokens used by model and kind.", ("model", "kind"))
+ai_verify_errors = registry.counter(
+    "tasksure_ai_verify_errors_total", "Proofs rejected because verification itself failed.", ("model",)
+)
+
+# ---------- uploads ----------
+upload_bytes = registry.histogram(
+    "tasksure_upload_bytes", "Size of proof uploads written to staging.", buckets=BYTE_BUCKETS
+)
+upload_duration = registry.histogram(
+    "tasksure_upload_write_seconds", "Time to receive and write a proof upload to disk."
+)
+
+
+# ================= PER-REQUEST SQL ACCOUNTING ==================
+
+class RequestStats:
+    __slots__ = ("queries", "sql_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.statements: Optional[List[Tuple[str, float]]] = [] if SLOW_REQUEST_MS > 0 else None
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def _statement_kind(statement: str) -> str:
+    word = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return word if word in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    sql_duration.observe(elapsed, kind=_statement_kind(statement))
+
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.sql_seconds += elapsed
+        if stats.statements is not None and len(stats.statements) < SLOW_REQUEST_MAX_QUERIES:
+            stats.statements.append((statement, elapsed))
+
+
+@event.listens_for(Engine, "handle_error")
+def _query_failed(context):
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+    sql_errors.inc(kind=_statement_kind(context.statement or ""))
+
+
+# ================= MIDDLEWARE ==================
+
+class MetricsMiddleware:
+    """Times each HTTP request by route template and records its SQL work."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = {"code": 500}
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+
+            http_requests.inc(method=method, route=route, status=status["code"])
+            if route not in UNTIMED_ROUTES:
+                http_duration.observe(elapsed, method=method, route=route)
+                http_sql_queries.observe(stats.queries, method=method, route=route)
+                http_sql_duration.observe(stats.sql_seconds, method=method, route=route)
+
+                if SLOW_REQUEST_MS > 0 and elapsed * 1000 >= SLOW_REQUEST_MS:
+                    _log_slow_request(method, scope.get("path", ""), status["code"], elapsed, stats)
+
+
+def _log_slow_request(method, path, status, elapsed, stats: RequestStats):
+    print(
+        f"Slow request → {method} {path} {status} {elapsed * 1000:.0f} ms, "
+        f"{stats.queries} queries / {stats.sql_seconds * 1000:.0f} ms SQL"
+    )
+    for statement, seconds in stats.statements or ():
+        sql = " ".join(statement.split())[:SLOW_QUERY_SQL_CHARS]
+        print(f"    {seconds * 1000:8.1f} ms  {sql}")
+    if stats.queries > len(stats.statements or ()):
+        print(f"    … {stats.queries - len(stats.statements or ())} more")
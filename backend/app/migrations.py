@@ -0,0 +1,249 @@
+"""
+Schema migrations for existing databases.
+
+create_all only creates missing tables, so anything that changes an existing
+table (new columns, new indexes) goes here as a numbered step. Every step is
+idempotent, and the applied version is recorded in schema_migrations.
+
+The app doesn't migrate on import or startup (unless MIGRATE_ON_STARTUP=1);
+run upgrade once per deploy, before the workers start. They refuse to start
+while steps are pending.
+
+Usage (from backend/):
+    python -m app.migrations upgrade     # apply pending steps
+    python -m app.migrations status      # show current version
+    python -m app.migrations pending     # list pending steps; exit 1 if any
+    python -m app.migrations check       # EXPLAIN the hot task queries (upgraded DB only)
+    python -m app.migrations backfill-streaks   # rebuild streak_logs from tasks
+"""
+import sys
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    inspect,
+    select,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from . import models
+from .task_queries import task_list_query
+from .streaks import backfill_streak_log
+from .database import Base, engine as default_engine
+
+
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+# ================= HELPERS ==================
+
+def add_column_if_missing(conn: Connection, table: str, column: Column):
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column.name in existing:
+        return
+    col_type = column.type.compile(dialect=conn.dialect)
+    conn.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN "{column.name}" {col_type}')
+
+
+def create_indexes(conn: Connection, table: Table, names: List[str]):
+    for index in table.indexes:
+        if index.name in names:
+            index.create(conn, checkfirst=True)
+
+
+# ================= STEPS ==================
+
+def _create_tables(conn: Connection):
+    Base.metadata.create_all(bind=conn)
+
+
+def _task_owner_indexes(conn: Connection):
+    create_indexes(
+        conn,
+        models.Task.__table__,
+        ["ix_tasks_owner_created", "ix_tasks_owner_status_completed"],
+    )
+
+
+def _streak_logs(conn: Connection):
+    models.StreakLog.__table__.create(conn, checkfirst=True)
+    backfill_streak_log(Session(bind=conn))
+
+
+def _task_proof_phash(conn: Connection):
+    add_column_if_missing(conn, "tasks", models.Task.__table__.c.proof_phash)
+    create_indexes(conn, models.Task.__table__, ["ix_tasks_owner_phash"])
+
+
+def _proof_blobs(conn: Connection):
+    models.ProofBlob.__table__.create(conn, checkfirst=True)
+
+
+def _task_proof_claim(conn: Connection):
+    add_column_if_missing(conn, "tasks", models.Task.__table__.c.proof_claimed_until)
+
+
+def _stream_tickets(conn: Connection):
+    models.StreamTicket.__table__.create(conn, checkfirst=True)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "create tables", _create_tables),
+    (2, "task owner composite indexes", _task_owner_indexes),
+    (3, "streak_logs daily rollup", _streak_logs),
+    (4, "tasks.proof_phash + owner index", _task_proof_phash),
+    (5, "proof_blobs refcounts", _proof_blobs),
+    (6, "tasks.proof_claimed_until lease", _task_proof_claim),
+    (7, "stream_tickets for /events", _stream_tickets),
+]
+
+
+# ================= RUNNER ==================
+
+def current_version(conn: Connection) -> int:
+    schema_migrations.create(conn, checkfirst=True)
+    version = conn.execute(select(func.max(schema_migrations.c.version))).scalar()
+    return version or 0
+
+
+def pending(engine: Engine = default_engine) -> List[int]:
+    """Steps not yet applied. Read-only, unlike current_version()."""
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(schema_migrations.name):
+            version = 0
+        else:
+            version = conn.execute(select(func.max(schema_migrations.c.version))).scalar() or 0
+    return [number for number, _, _ in MIGRATIONS if number > version]
+
+
+def upgrade(engine: Engine = default_engine) -> List[int]:
+    """Apply every pending step, each in its own transaction."""
+    applied = []
+    with engine.begin() as conn:
+        version = current_version(conn)
+
+    for number, name, step in MIGRATIONS:
+        if number <= version:
+            continue
+        with engine.begin() as conn:
+            step(conn)
+            conn.execute(
+                schema_migrations.insert().values(
+                    version=number, name=name, applied_at=datetime.utcnow()
+                )
+            )
+        applied.append(number)
+    return applied
+
+
+# ================= QUERY PLAN CHECK ==================
+
+def hot_task_queries(owner_id: int = 1, task_id: int = 1):
+    """The queries behind list/stats/calendar and the ownership lookups."""
+    Task = models.Task
+    return {
+        "list_tasks": task_list_query(owner_id, limit=50),
+        "list_tasks_page": task_list_query(
+            owner_id,
+            columns=["title", "status"],
+            cursor=(datetime(2024, 1, 1), 100),
+            limit=50,
+        ),
+        "get_my_stats": select(func.count())
+        .select_from(Task)
+        .where(Task.owner_id == owner_id, Task.status == "completed"),
+        "streak_calendar": select(models.StreakLog).where(
+            models.StreakLog.user_id == owner_id,
+            models.StreakLog.date >= datetime(2024, 1, 1).date(),
+        ),
+        "task_by_owner": select(Task).where(Task.id == task_id, Task.owner_id == owner_id),
+        "proof_phashes": select(Task.id, Task.proof_phash).where(
+            Task.owner_id == owner_id, Task.proof_phash.is_not(None)
+        ),
+    }
+
+
+def check_query_plans(engine: Engine = default_engine) -> List[Tuple[str, str, bool]]:
+    """
+    EXPLAIN QUERY PLAN each hot query (SQLite only).
+    A query passes when no step is a table SCAN or a temp sort.
+    Returns: [(query_name, plan_text, ok)]
+    """
+    results = []
+    with engine.connect() as conn:
+        if conn.dialect.name != "sqlite":
+            return results
+        for name, stmt in hot_task_queries().items():
+            sql = str(stmt.compile(conn, compile_kwargs={"literal_binds": True}))
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+            details = [row[-1] for row in rows]
+            ok = not any(
+                d.startswith("SCAN") or "TEMP B-TREE" in d for d in details
+            )
+            results.append((name, "; ".join(details), ok))
+    return results
+
+
+def main(argv: List[str]) -> int:
+    command = argv[0] if argv else "upgrade"
+
+    if command == "upgrade":
+        applied = upgrade()
+        print(f"Applied: {applied}" if applied else "Schema up to date.")
+        return 0
+
+    if command == "status":
+        with default_engine.begin() as conn:
+            version = current_version(conn)
+        print(f"Schema version {version} (latest {MIGRATIONS[-1][0]})")
+        return 0
+
+    if command == "pending":
+        # Exits 1 while steps are pending, for deploy checks
+        steps = pending()
+        print(f"Pending: {steps}" if steps else "Schema up to date.")
+        return 1 if steps else 0
+
+    if command == "backfill-streaks":
+        with default_engine.begin() as conn:
+            written = backfill_streak_log(Session(bind=conn))
+        print(f"Wrote {written} streak_logs rows.")
+        return 0
+
+    if command == "check":
+        # The hot queries reference the latest columns; plan them on that schema only
+        steps = pending()
+        if steps:
+            print("Schema not up to date; run `upgrade` first. Pending:")
+            for number, name, _ in MIGRATIONS:
+                if number in steps:
+                    print(f"    {number} {name}")
+            return 1
+
+        failed = 0
+        for name, plan, ok in check_query_plans():
+            print(f"{'OK  ' if ok else 'SCAN'} {name:<16} {plan}")
+            failed += not ok
+        return 1 if failed else 0
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
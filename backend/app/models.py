@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     Text,
     Date,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -58,8 +59,63 @@ class Task(Base):
     proof_feedback = Column(Text, nullable=True)  # 🔹 NEW: AI explanation
     proof_image = Column(String, nullable=True)
     rejection_reason = Column(String, nullable=True)
+    proof_phash = Column(String(16), nullable=True)   # dHash of the proof photo, hex
+    proof_claimed_until = Column(DateTime, nullable=True)  # a worker is verifying it until then
 
     owner_id = Column(Integer, ForeignKey("users.id"))
     owner = relationship("User", back_populates="tasks")
 
+    __table_args__ = (
+        # GET /tasks: owner's tasks newest first
+        Index("ix_tasks_owner_created", "owner_id", "created_at"),
+        # stats / streak calendar: owner's completed tasks by completion time
+        Index("ix_tasks_owner_status_completed", "owner_id", "status", "completed_at"),
+        # duplicate-photo index load: owner's proof hashes
+        Index("ix_tasks_owner_phash", "owner_id", "proof_phash"),
+    )
 
+
+
+class StreakLog(Base):
+    """Per-user, per-day rollup of completions, written with each award."""
+    __tablename__ = "streak_logs"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True, index=True)
+    completed_count = Column(Integer, default=0, nullable=False)
+    points = Column(Integer, default=0, nullable=False)
+
+
+
+class ProofVerdict(Base):
+    """Cached AI verdicts, keyed by a digest of the proof content."""
+    __tablename__ = "proof_verdicts"
+
+    key = Column(String, primary_key=True)            # sha256 of model + image + text
+    model = Column(String, nullable=False)
+    approved = Column(Boolean, nullable=False)
+    feedback = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+    hit_count = Column(Integer, default=0)
+
+
+
+class ProofBlob(Base):
+    """Stored proof file, content-addressed; refcount = tasks whose proof_url is this key."""
+    __tablename__ = "proof_blobs"
+
+    key = Column(String(64), primary_key=True)        # sha256 of the file
+    size = Column(Integer, nullable=False)
+    refcount = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class StreamTicket(Base):
+    """Short-lived, single-use credential for opening GET /events from EventSource."""
+    __tablename__ = "stream_tickets"
+
+    ticket_hash = Column(String(64), primary_key=True)    # sha256 of the ticket
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
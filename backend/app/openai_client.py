@@ -0,0 +1,233 @@
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+from . import metrics
+
+
+# ================= OPENAI CLIENT CONFIG ==================
+OPENAI_TIMEOUT_S = float(os.getenv("OPENAI_TIMEOUT_S", "30"))             # per-call deadline
+OPENAI_CONNECT_TIMEOUT_S = float(os.getenv("OPENAI_CONNECT_TIMEOUT_S", "5"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+OPENAI_RETRY_BASE_MS = int(os.getenv("OPENAI_RETRY_BASE_MS", "250"))
+OPENAI_MAX_INFLIGHT = int(os.getenv("OPENAI_MAX_INFLIGHT", "16"))
+OPENAI_POOL_CONNECTIONS = int(os.getenv("OPENAI_POOL_CONNECTIONS", "32"))
+OPENAI_POOL_KEEPALIVE = int(os.getenv("OPENAI_POOL_KEEPALIVE", "16"))
+
+# ================= CIRCUIT BREAKER ==================
+BREAKER_FAILURES = int(os.getenv("OPENAI_BREAKER_FAILURES", "5"))        # consecutive
+BREAKER_RESET_S = float(os.getenv("OPENAI_BREAKER_RESET_S", "30"))
+
+
+def retryable_errors() -> tuple:
+    """Worth another attempt: network trouble, rate limits and 5xx."""
+    import openai
+
+    return (
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+
+
+class ModelUnavailable(Exception):
+    """The model endpoint is degraded; leave the proof pending and retry later."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive transient errors and fast-fails calls
+    for reset_after seconds. Then a single trial call is let through
+    (half-open): success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failures: int = BREAKER_FAILURES, reset_after: float = BREAKER_RESET_S):
+        self.failures = failures
+        self.reset_after = reset_after
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_after:
+                return "half-open"
+            return "open"
+
+    def retry_after(self) -> float:
+        """Seconds until the next trial call is allowed (0 when closed)."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_after - time.monotonic())
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_after or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive += 1
+            if self._trial_running or self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class ModelClient:
+    """
+    The one OpenAI client for the app: pooled HTTP connections, a deadline on
+    every call, jittered retries for transient errors, a cap on in-flight
+    calls and a circuit breaker in front of all of it.
+    Call sites use client.chat.completions.create(...) as with OpenAI().
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = OPENAI_TIMEOUT_S,
+        max_retries: int = OPENAI_MAX_RETRIES,
+        max_inflight: int = OPENAI_MAX_INFLIGHT,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        # The SDK takes about half a second to import; pay it on first use,
+        # not at worker boot
+        import httpx
+        from openai import OpenAI
+
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self._inflight = threading.BoundedSemaphore(max_inflight)
+        self._retryable = retryable_errors()
+
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=OPENAI_POOL_CONNECTIONS,
+                max_keepalive_connections=OPENAI_POOL_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(timeout, connect=OPENAI_CONNECT_TIMEOUT_S),
+        )
+        # Retries are ours (with the breaker in the loop), not the SDK's
+        self._openai = OpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            base_url=base_url,
+            max_retries=0,
+            timeout=timeout,
+            http_client=http_client,
+        )
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self._openai.api_key
+
+    @property
+    def chat(self):
+        return self
+
+    @property
+    def completions(self):
+        return self
+
+    def create(self, **kwargs):
+        model = kwargs.get("model", "unknown")
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = self._create(kwargs)
+            outcome = "ok"
+        except ModelUnavailable:
+            outcome = "unavailable"
+            raise
+        finally:
+            metrics.ai_calls.inc(model=model, outcome=outcome)
+            metrics.ai_duration.observe(time.perf_counter() - start, model=model, outcome=outcome)
+
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            metrics.ai_tokens.inc(usage.prompt_tokens or 0, model=model, kind="prompt")
+            metrics.ai_tokens.inc(usage.completion_tokens or 0, model=model, kind="completion")
+        return response
+
+    def _create(self, kwargs: dict):
+        model = kwargs.get("model", "unknown")
+        deadline = time.monotonic() + self.timeout
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise ModelUnavailable("AI model unavailable (circuit open).")
+
+            # Wait for an in-flight slot, but never past the deadline
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._inflight.acquire(timeout=remaining):
+                self.breaker.record_failure()
+                raise ModelUnavailable("AI model busy (deadline reached).")
+
+            try:
+                response = self._openai.chat.completions.create(
+                    timeout=max(0.1, deadline - time.monotonic()), **kwargs
+                )
+            except self._retryable as e:
+                self.breaker.record_failure()
+                metrics.ai_attempt_errors.inc(model=model, error=type(e).__name__)
+                error = e
+            except Exception as e:
+                # 4xx etc.: the endpoint is fine, the request isn't
+                self.breaker.record_success()
+                metrics.ai_attempt_errors.inc(model=model, error=type(e).__name__)
+                raise
+            else:
+                self.breaker.record_success()
+                return response
+            finally:
+                self._inflight.release()
+
+            # Full jitter; give up early if the backoff would overrun the deadline
+            backoff = random.uniform(0, OPENAI_RETRY_BASE_MS * 2 ** attempt / 1000)
+            if attempt == self.max_retries or time.monotonic() + backoff >= deadline:
+                break
+            time.sleep(backoff)
+
+        raise ModelUnavailable(f"AI model unavailable: {error}")
+
+    def close(self):
+        self._openai.close()
+
+
+_client: Optional[ModelClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ModelClient:
+    """The shared client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ModelClient()
+        return _client
+
+
+def has_api_key() -> bool:
+    """Whether there is a key to call the model with; ModelClient() raises without one."""
+    with _client_lock:
+        if _client is not None:
+            return bool(_client.api_key)
+    return bool(os.getenv("OPENAI_API_KEY"))
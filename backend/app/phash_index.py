@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+
+
+# ================= DUPLICATE PROOF CONFIG ==================
+# Max differing bits (of 64) for two proof photos to count as the same; -1 disables
+PHASH_REUSE_DISTANCE = int(os.getenv("PHASH_REUSE_DISTANCE", "4"))
+PHASH_INDEX_MAX_USERS = int(os.getenv("PHASH_INDEX_MAX_USERS", "10000"))
+# A user's cached index is reloaded from the DB after this many seconds, so
+# proofs committed by other workers are picked up
+PHASH_INDEX_TTL_S = float(os.getenv("PHASH_INDEX_TTL_S", "60"))
+
+HASH_BITS = 64
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def encode_phash(value: int) -> str:
+    return format(value, "016x")
+
+
+def decode_phash(value: str) -> int:
+    return int(value, 16)
+
+
+class MultiIndexHash:
+    """
+    Near-duplicate lookup for 64-bit hashes within a fixed Hamming radius.
+
+    The hash is cut into radius+1 chunks, each with its own exact-match table.
+    Two hashes within the radius must agree on at least one whole chunk
+    (pigeonhole), so a query is radius+1 dict lookups plus one popcount per
+    candidate instead of a walk over every stored hash.
+    """
+
+    def __init__(self, radius: int = PHASH_REUSE_DISTANCE):
+        self.radius = radius
+        chunks = radius + 1
+        widths = [HASH_BITS // chunks + (i < HASH_BITS % chunks) for i in range(chunks)]
+        self._chunks: List[Tuple[int, int]] = []     # (shift, mask)
+        shift = 0
+        for width in widths:
+            self._chunks.append((shift, (1 << width) - 1))
+            shift += width
+
+        self._hashes: List[int] = []
+        self._items: List[Optional[int]] = []       # None = discarded
+        self._positions: Dict[int, List[int]] = {}  # item → its positions
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in self._chunks]
+
+    def __len__(self) -> int:
+        return sum(len(positions) for positions in self._positions.values())
+
+    def add(self, value: int, item: int):
+        position = len(self._hashes)
+        self._hashes.append(value)
+        self._items.append(item)
+        self._positions.setdefault(item, []).append(position)
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            table.setdefault((value >> shift) & mask, []).append(position)
+
+    def discard(self, item: int):
+        """Drop every hash stored for item (tombstoned until the next reload)."""
+        for position in self._positions.pop(item, ()):
+            self._items[position] = None
+
+    def search(self, value: int) -> List[Tuple[int, int]]:
+        """All stored (distance, item) within the radius, closest first."""
+        seen = set()
+        found = []
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            for position in table.get((value >> shift) & mask, ()):
+                if position in seen:
+                    continue
+                seen.add(position)
+                if self._items[position] is None:
+                    continue
+                distance = (self._hashes[position] ^ value).bit_count()
+                if distance <= self.radius:
+                    found.append((distance, self._items[position]))
+        found.sort()
+        return found
+
+
+class DuplicateIndex:
+    """
+    Per-user MultiIndexHash of proof image hashes (item = task id).
+
+    A user's index is loaded from tasks.proof_phash on first lookup and kept
+    in an LRU of max_users for up to ttl seconds. The cache is only a hint:
+    every match is confirmed against tasks before it's reported, so an entry
+    left stale by another worker can't reject a proof, and the TTL bounds
+    how long a hash committed elsewhere can go unseen.
+    """
+
+    def __init__(
+        self,
+        radius: int = PHASH_REUSE_DISTANCE,
+        max_users: int = PHASH_INDEX_MAX_USERS,
+        ttl: float = PHASH_INDEX_TTL_S,
+    ):
+        self.radius = radius
+        self.max_users = max_users
+        self.ttl = ttl
+        # user_id → (index, time.monotonic() when loaded)
+        self._users: "OrderedDict[int, Tuple[MultiIndexHash, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, user_id: int) -> MultiIndexHash:
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached is not None and time.monotonic() - cached[1] < self.ttl:
+                self._users.move_to_end(user_id)
+                return cached[0]
+
+        loaded_at = time.monotonic()
+        index = MultiIndexHash(self.radius)
+        rows = db.execute(
+            select(models.Task.id, models.Task.proof_phash).where(
+                models.Task.owner_id == user_id, models.Task.proof_phash.is_not(None)
+            )
+        )
+        for task_id, phash in rows:
+            index.add(decode_phash(phash), task_id)
+
+        with self._lock:
+            self._users[user_id] = (index, loaded_at)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return index
+
+    def find(
+        self,
+        db: Session,
+        user_id: int,
+        phash: int,
+        exclude_task_id: Optional[int] = None,
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Closest earlier proof photo of this user within the radius.
+        Returns: (task_id, distance) or None
+        """
+        if self.radius < 0:
+            return None
+        index = self._load(db, user_id)
+        candidates = [task_id for _, task_id in index.search(phash) if task_id != exclude_task_id]
+        if not candidates:
+            return None
+
+        # Confirm against the rows as committed now (ix_tasks_owner_phash)
+        rows = db.execute(
+            select(models.Task.id, models.Task.proof_phash).where(
+                models.Task.owner_id == user_id,
+                models.Task.id.in_(candidates),
+                models.Task.proof_phash.is_not(None),
+            )
+        ).all()
+        current = {task_id: decode_phash(value) for task_id, value in rows}
+
+        best = None
+        with self._lock:
+            for task_id in candidates:
+                value = current.get(task_id)
+                distance = hamming(value, phash) if value is not None else None
+                if distance is None or distance > self.radius:
+                    # Deleted or re-proved elsewhere; fix the hint
+                    index.discard(task_id)
+                    if value is not None:
+                        index.add(value, task_id)
+                elif best is None or distance < best[1]:
+                    best = (task_id, distance)
+        return best
+
+    def add(self, user_id: int, phash: int, task_id: int):
+        """Record a committed proof hash, replacing the task's old one (no-op if the user isn't loaded)."""
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached is not None:
+                cached[0].discard(task_id)
+                cached[0].add(phash, task_id)
+
+    def remove(self, user_id: int, task_id: int):
+        """Drop a deleted task's hash."""
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached is not None:
+                cached[0].discard(task_id)
+
+    def forget(self, user_id: int):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+
+phash_index = DuplicateIndex()
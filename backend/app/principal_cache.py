@@ -0,0 +1,187 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import models
+from .events import RESYNC, USER_CHANGED_CHANNEL, event_hub
+
+
+# ================= CACHE CONFIG ==================
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+# Other workers' User writes arrive through the events broker; without one
+# this bounds how stale a snapshot can get
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+
+
+class UserSnapshot:
+    """Read-only copy of the User columns authenticated endpoints read."""
+
+    __slots__ = (
+        "id",
+        "email",
+        "username",
+        "is_active",
+        "total_points",
+        "current_streak",
+        "longest_streak",
+        "last_active_date",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "UserSnapshot":
+        return cls(**{name: getattr(user, name) for name in cls.__slots__})
+
+
+class _TTLCache:
+    """Small thread-safe LRU whose entries carry their own expiry time."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[object, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, ttl: float):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses, size = self.hits, self.misses, len(self._data)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "size": size,
+        }
+
+
+class PrincipalCache:
+    """
+    Two layers in front of get_current_user:
+    token → user id (skips the JWT verify, bounded by the token's exp) and
+    user id → UserSnapshot (skips the User SELECT, dropped on any User write).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = PRINCIPAL_CACHE_SIZE,
+        token_ttl: int = TOKEN_CACHE_TTL_SECONDS,
+        user_ttl: int = USER_CACHE_TTL_SECONDS,
+    ):
+        self.token_ttl = token_ttl
+        self.user_ttl = user_ttl
+        self.tokens = _TTLCache(maxsize)
+        self.users = _TTLCache(maxsize)
+
+    def get_token(self, token: str) -> Optional[int]:
+        return self.tokens.get(token)
+
+    def put_token(self, token: str, user_id: int, exp: Optional[float]):
+        ttl = self.token_ttl
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+        self.tokens.put(token, user_id, ttl)
+
+    def get_user(self, user_id: int) -> Optional[UserSnapshot]:
+        return self.users.get(user_id)
+
+    def put_user(self, user: models.User) -> UserSnapshot:
+        snapshot = UserSnapshot.from_user(user)
+        self.users.put(user.id, snapshot, self.user_ttl)
+        return snapshot
+
+    def invalidate_user(self, user_id: int):
+        self.users.pop(user_id)
+
+    def on_remote(self, payload: dict):
+        """Listener for USER_CHANGED_CHANNEL: another worker committed these User writes."""
+        if payload["type"] == RESYNC["type"]:
+            self.users.clear()
+            return
+        for user_id in payload["user_ids"]:
+            self.invalidate_user(user_id)
+
+    def clear(self):
+        self.tokens.clear()
+        self.users.clear()
+
+    def stats(self) -> dict:
+        return {"tokens": self.tokens.stats(), "users": self.users.stats()}
+
+
+principal_cache = PrincipalCache()
+event_hub.listen(USER_CHANGED_CHANNEL, principal_cache.on_remote)
+
+
+# ================= INVALIDATION ==================
+# Any flushed change to a User row drops its snapshot, both at flush time and
+# again after commit so a concurrent reader can't re-cache the old row; the
+# other workers drop theirs when the commit is relayed to them.
+
+def mark_user_changed(session: Session, user_id: int):
+    """For User writes that bypass the ORM unit of work (bulk/Core UPDATEs)."""
+    session.info.setdefault("touched_user_ids", set()).add(user_id)
+    principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_writes(session, flush_context):
+    touched = session.info.setdefault("touched_user_ids", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.User) and obj.id is not None:
+            touched.add(obj.id)
+            principal_cache.invalidate_user(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    user_ids = session.info.pop("touched_user_ids", None)
+    if not user_ids:
+        return
+    for user_id in user_ids:
+        principal_cache.invalidate_user(user_id)
+    event_hub.publish(USER_CHANGED_CHANNEL, {"type": "user_changed", "user_ids": sorted(user_ids)})
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("touched_user_ids", None)
@@ -0,0 +1,314 @@
+"""
+Reference counting and garbage collection for stored proof files.
+
+tasks.proof_url holds a content key (sha256), and proof_blobs.refcount counts
+the tasks pointing at it. acquire_blob/release_proof run inside the request's
+transaction; a blob whose count reaches zero is deleted after the commit,
+under a row lock so a concurrent upload of the same content can't lose it.
+A file stored ahead of its acquire_blob is deleted again if that
+transaction rolls back and no other upload has claimed the key.
+
+Usage (from backend/):
+    python -m app.proof_blobs gc [--dry-run]       # recount, drop orphans
+    python -m app.proof_blobs import-legacy        # move old path-style proofs into storage
+"""
+import hashlib
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+from .storage import BlobStorage, is_blob_key, storage
+from .thumbnails import drop_thumbnails
+from .uploads import file_sha256
+
+
+# ================= BLOB GC CONFIG ==================
+# Unreferenced blobs younger than this may belong to an upload still in flight
+BLOB_GC_GRACE_MINUTES = int(os.getenv("BLOB_GC_GRACE_MINUTES", "60"))
+
+_gc_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="blob-gc")
+
+
+def acquire_blob(db: Session, key: str, size: int) -> int:
+    """Count one more task using key. Returns the new refcount."""
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else pg_insert
+        stmt = insert(models.ProofBlob).values(key=key, size=size, refcount=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={"refcount": models.ProofBlob.refcount + 1},
+        ).returning(models.ProofBlob.refcount)
+        return db.execute(stmt).scalar_one()
+
+    # Other backends: plain read-modify-write
+    blob = db.get(models.ProofBlob, key, with_for_update=True)
+    if blob is None:
+        blob = models.ProofBlob(key=key, size=size, refcount=0)
+        db.add(blob)
+    blob.refcount += 1
+    db.flush()
+    return blob.refcount
+
+
+def record_stored_blob(db: Session, key: str):
+    """key's file was stored for this transaction; collect it if the transaction rolls back."""
+    db.info.setdefault("stored_blobs", []).append(key)
+
+
+def release_proof(db: Session, proof_url: Optional[str]):
+    """
+    A task stops using proof_url (deleted, or its proof replaced).
+    Content keys are decremented and collected after commit once unused;
+    files from before content addressing are simply removed after commit.
+    """
+    if not proof_url:
+        return
+    if is_blob_key(proof_url):
+        db.execute(
+            update(models.ProofBlob)
+            .where(models.ProofBlob.key == proof_url)
+            .values(refcount=models.ProofBlob.refcount - 1)
+        )
+    db.info.setdefault("released_proofs", []).append(proof_url)
+
+
+def collect(keys: List[str], blob_storage: Optional[BlobStorage] = None) -> int:
+    """
+    Delete blobs among keys whose refcount is zero. The row is deleted first
+    and the file removed before that commits, so an upload re-acquiring the
+    key waits for us and then re-stores the file.
+    """
+    blob_storage = blob_storage or storage
+    removed = 0
+    for key in keys:
+        db = SessionLocal()
+        try:
+            gone = db.execute(
+                delete(models.ProofBlob)
+                .where(models.ProofBlob.key == key, models.ProofBlob.refcount <= 0)
+                .returning(models.ProofBlob.key)
+            ).first()
+            if gone:
+                blob_storage.delete(key)
+                drop_thumbnails(key, blob_storage)
+                removed += 1
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print("Blob GC error →", e)
+        finally:
+            db.close()
+    return removed
+
+
+def discard_unclaimed(keys: List[str], blob_storage: Optional[BlobStorage] = None) -> int:
+    """
+    Delete stored files among keys that have no proof_blobs row: uploads
+    whose transaction failed after storing. An upload claiming the same key
+    meanwhile sees the file gone after its commit and stores it again.
+    """
+    blob_storage = blob_storage or storage
+    removed = 0
+    for key in keys:
+        db = SessionLocal()
+        try:
+            if db.get(models.ProofBlob, key) is None:
+                blob_storage.delete(key)
+                removed += 1
+        except Exception as e:
+            print("Blob GC error →", e)
+        finally:
+            db.close()
+    return removed
+
+
+def _remove_legacy_file(path: str):
+    try:
+        drop_thumbnails(proof_tag(path))
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print("Blob GC error →", e)
+
+
+@event.listens_for(Session, "after_commit")
+def _collect_after_commit(session):
+    session.info.pop("stored_blobs", None)
+    released = session.info.pop("released_proofs", None)
+    if not released:
+        return
+    keys = [url for url in released if is_blob_key(url)]
+    if keys:
+        _gc_executor.submit(collect, keys)
+    for path in released:
+        if not is_blob_key(path):
+            _gc_executor.submit(_remove_legacy_file, path)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("released_proofs", None)
+    stored = session.info.pop("stored_blobs", None)
+    if stored:
+        _gc_executor.submit(discard_unclaimed, stored)
+
+
+@contextmanager
+def proof_file(proof_url: Optional[str]) -> Iterator[Optional[str]]:
+    """Local path for a task's proof image (None if there isn't one)."""
+    if is_blob_key(proof_url):
+        with storage.local_copy(proof_url) as path:
+            yield path
+    elif proof_url and os.path.exists(proof_url):
+        yield proof_url        # stored before content addressing
+    else:
+        yield None
+
+
+def proof_tag(proof_url: str) -> str:
+    """
+    Stable identifier of a proof's content, used for ETags and thumbnail
+    names: the content key, or a hash of the path for files stored before
+    content addressing (those are never rewritten in place).
+    """
+    if is_blob_key(proof_url):
+        return proof_url
+    return hashlib.sha256(proof_url.encode("utf-8")).hexdigest()
+
+
+def serving_path(proof_url: Optional[str]) -> Optional[str]:
+    """A local file to stream for a task's proof image (None if there isn't one)."""
+    if is_blob_key(proof_url):
+        try:
+            return storage.cached_path(proof_url)
+        except FileNotFoundError:
+            return None
+    if proof_url and os.path.exists(proof_url):
+        return proof_url
+    return None
+
+
+# ================= SWEEP ==================
+
+def gc(dry_run: bool = False, blob_storage: Optional[BlobStorage] = None) -> dict:
+    """
+    Repair refcounts from tasks.proof_url, then delete blobs nothing uses:
+    zero-count rows, and stored objects with no row (older than the grace
+    period). Returns counts of what was (or would be) changed.
+    """
+    blob_storage = blob_storage or storage
+    report = {"recounted": 0, "unreferenced": 0, "orphans": 0}
+    db = SessionLocal()
+    try:
+        actual = dict(
+            db.execute(
+                select(models.Task.proof_url, func.count())
+                .where(models.Task.proof_url.is_not(None))
+                .group_by(models.Task.proof_url)
+            ).all()
+        )
+        rows = {blob.key: blob for blob in db.scalars(select(models.ProofBlob))}
+        for key, blob in rows.items():
+            count = actual.get(key, 0)
+            if blob.refcount != count:
+                report["recounted"] += 1
+                blob.refcount = count
+        for key, count in actual.items():
+            if is_blob_key(key) and key not in rows and blob_storage.exists(key):
+                report["recounted"] += 1
+                db.add(models.ProofBlob(key=key, size=0, refcount=count))
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+
+        unreferenced = list(
+            db.scalars(select(models.ProofBlob.key).where(models.ProofBlob.refcount <= 0))
+        )
+        known = set(db.scalars(select(models.ProofBlob.key)))
+    finally:
+        db.close()
+
+    report["unreferenced"] = len(unreferenced)
+    if not dry_run:
+        collect(unreferenced, blob_storage)
+
+    cutoff = datetime.utcnow() - timedelta(minutes=BLOB_GC_GRACE_MINUTES)
+    for key, modified in blob_storage.keys():
+        if key in known or modified > cutoff:
+            continue
+        report["orphans"] += 1
+        if not dry_run:
+            blob_storage.delete(key)
+            drop_thumbnails(key, blob_storage)
+    return report
+
+
+def import_legacy(blob_storage: Optional[BlobStorage] = None) -> int:
+    """Move proofs stored as file paths into blob storage, one task at a time."""
+    blob_storage = blob_storage or storage
+    moved = 0
+    db = SessionLocal()
+    try:
+        tasks = db.scalars(
+            select(models.Task).where(models.Task.proof_url.is_not(None))
+        ).all()
+        for task in tasks:
+            path = task.proof_url
+            if is_blob_key(path) or not os.path.exists(path):
+                continue
+
+            key = file_sha256(path)
+            refs = acquire_blob(db, key, os.path.getsize(path))
+            if refs == 1 or not blob_storage.exists(key):
+                staged = blob_storage.staging_path()
+                shutil.copyfile(path, staged)
+                blob_storage.store(key, staged)
+
+            release_proof(db, path)
+            task.proof_url = key
+            db.commit()
+            moved += 1
+    finally:
+        db.close()
+    return moved
+
+
+def main(argv: List[str]) -> int:
+    command = argv[0] if argv else ""
+
+    if command == "gc":
+        dry_run = "--dry-run" in argv
+        report = gc(dry_run=dry_run)
+        fixed, removed = ("Would fix", "would remove") if dry_run else ("Fixed", "removed")
+        print(
+            f"{fixed} {report['recounted']} refcounts, {removed} "
+            f"{report['unreferenced']} unreferenced and {report['orphans']} orphan blobs."
+        )
+        return 0
+
+    if command == "import-legacy":
+        print(f"Moved {import_legacy()} proofs into blob storage.")
+        _gc_executor.shutdown(wait=True)
+        return 0
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,322 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from sqlalchemy import or_, select, update
+
+from . import models
+from .database import SessionLocal
+from .events import record_event, record_task_change
+from .response_cache import mark_data_changed
+from .ai_verifier import ai_verify_proof
+from .openai_client import ModelUnavailable, get_client
+from .proof_blobs import proof_file
+from .storage import is_blob_key
+from .streaks import update_user_streak_and_points
+from .text_batcher import TextBatcher, text_batcher
+
+
+# ================= QUEUE CONFIG ==================
+PROOF_WORKERS = int(os.getenv("PROOF_WORKERS", "4"))
+PROOF_QUEUE_SIZE = int(os.getenv("PROOF_QUEUE_SIZE", "200"))
+PROOF_RETRY_MIN_S = float(os.getenv("PROOF_RETRY_MIN_S", "5"))
+# How long a claimed proof is off-limits to other workers; longer than a verification
+PROOF_CLAIM_LEASE_S = float(os.getenv("PROOF_CLAIM_LEASE_S", "300"))
+
+Verifier = Callable[..., Tuple[bool, str]]
+
+
+class PendingProof(NamedTuple):
+    task_id: int
+    proof_text: Optional[str]
+    proof_url: Optional[str]
+    title: Optional[str]
+    description: Optional[str]
+
+
+class ProofQueue:
+    """
+    Bounded background pool that runs proof verification off the request path.
+    Uploads reserve a slot, commit the task as "pending" and then submit it;
+    a worker calls the verifier and finalizes the task in its own session.
+    Text-only proofs go to the batcher instead, so the worker is free again
+    while they wait for their batch. If the model endpoint is unavailable the
+    proof stays pending and is retried once the circuit breaker allows it.
+
+    A worker claims a proof (a lease in tasks.proof_claimed_until) before
+    verifying it, so with several processes each pending proof is verified
+    by one of them; a crashed worker's claims lapse and are picked up again.
+    """
+
+    def __init__(
+        self,
+        verifier: Verifier = ai_verify_proof,
+        workers: int = PROOF_WORKERS,
+        max_pending: int = PROOF_QUEUE_SIZE,
+        batcher: Optional[TextBatcher] = text_batcher,
+    ):
+        self.verifier = verifier
+        self.batcher = batcher
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="proof-verify"
+                )
+            return self._executor
+
+    def reserve(self) -> bool:
+        """Claim a queue slot without blocking. False means the queue is full."""
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._lock:
+            self._pending += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def pending(self) -> int:
+        """Proofs holding a slot: queued or being verified."""
+        with self._lock:
+            return self._pending
+
+    def submit(self, task_id: int):
+        """Queue a task whose slot was already claimed with reserve()."""
+        try:
+            self._get_executor().submit(self._run, task_id)
+        except Exception:
+            self.release()
+            raise
+
+    def _run(self, task_id: int):
+        batched = False
+        retrying = False
+        try:
+            proof = claim_pending_proof(task_id)
+            if proof is None:
+                return
+
+            if self.batcher is not None and not proof.proof_url:
+                future = self.batcher.submit(proof.proof_text, proof.title, proof.description)
+                future.add_done_callback(lambda f: self._finish_batched(proof, f))
+                batched = True
+                return
+
+            finalize_proof(task_id, self.verifier, proof=proof)
+        except ModelUnavailable as e:
+            retrying = self._retry_later(task_id, e)
+        except Exception as e:
+            print("Proof queue error →", e)
+            release_claim(task_id)
+        finally:
+            if not (batched or retrying):
+                self.release()
+
+    def _finish_batched(self, proof: PendingProof, future):
+        # Runs on a batcher thread; the slot was held since submit()
+        retrying = False
+        try:
+            approved, feedback = future.result()
+            apply_verdict(proof, approved, feedback)
+        except ModelUnavailable as e:
+            retrying = self._retry_later(proof.task_id, e)
+        except Exception as e:
+            print("Proof queue error →", e)
+            release_claim(proof.task_id)
+        finally:
+            if not retrying:
+                self.release()
+
+    def _retry_later(self, task_id: int, error: Exception) -> bool:
+        """
+        Keep the slot and re-submit after the breaker's cool-down.
+        Returns False if the queue is shutting down (the proof then stays
+        pending until requeue_pending() on the next start).
+        """
+        # Let go of the claim while waiting, so no other worker is locked out
+        release_claim(task_id)
+        if self._executor is None:
+            return False
+        delay = max(PROOF_RETRY_MIN_S, get_client().breaker.retry_after())
+        print(f"Proof {task_id} left pending, retry in {delay:.0f}s →", error)
+        timer = threading.Timer(delay, self._resubmit, (task_id,))
+        timer.daemon = True
+        timer.start()
+        return True
+
+    def _resubmit(self, task_id: int):
+        with self._lock:
+            executor = self._executor
+        try:
+            if executor is None:
+                raise RuntimeError("proof queue stopped")
+            executor.submit(self._run, task_id)
+        except Exception:
+            self.release()
+
+    def requeue_pending(self) -> int:
+        """Re-submit pending proofs that no live worker has claimed."""
+        Task = models.Task
+        db = SessionLocal()
+        try:
+            task_ids = db.scalars(
+                select(Task.id).where(
+                    Task.proof_status == "pending",
+                    or_(
+                        Task.proof_claimed_until.is_(None),
+                        Task.proof_claimed_until < datetime.utcnow(),
+                    ),
+                )
+            ).all()
+        finally:
+            db.close()
+
+        queued = 0
+        for task_id in task_ids:
+            if not self.reserve():
+                break
+            self.submit(task_id)
+            queued += 1
+        return queued
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+def claim_pending_proof(task_id: int) -> Optional[PendingProof]:
+    """
+    Take the lease on a pending proof and snapshot it, so no session is held
+    during the model call. None if it isn't pending or another worker has it.
+    """
+    Task = models.Task
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        row = db.execute(
+            update(Task)
+            .where(
+                Task.id == task_id,
+                Task.proof_status == "pending",
+                or_(Task.proof_claimed_until.is_(None), Task.proof_claimed_until < now),
+            )
+            .values(proof_claimed_until=now + timedelta(seconds=PROOF_CLAIM_LEASE_S))
+            .returning(Task.id, Task.proof_text, Task.proof_url, Task.title, Task.description)
+            .execution_options(synchronize_session=False)
+        ).first()
+        db.commit()
+        return PendingProof(*row) if row else None
+    finally:
+        db.close()
+
+
+def release_claim(task_id: int):
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(models.Task)
+            .where(models.Task.id == task_id, models.Task.proof_status == "pending")
+            .values(proof_claimed_until=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except Exception as e:
+        print("Proof queue error →", e)
+    finally:
+        db.close()
+
+
+def finalize_proof(
+    task_id: int,
+    verifier: Verifier = ai_verify_proof,
+    proof: Optional[PendingProof] = None,
+):
+    """Run the verifier for a pending task and store the verdict."""
+    if proof is None:
+        proof = claim_pending_proof(task_id)
+        if proof is None:
+            return
+
+    # Content keys are the file's sha256, so the verdict cache needn't rehash
+    digest = proof.proof_url if is_blob_key(proof.proof_url) else None
+
+    with proof_file(proof.proof_url) as path:
+        approved, feedback = verifier(
+            proof.proof_text,
+            path,
+            task_title=proof.title,
+            task_description=proof.description,
+            image_digest=digest,
+        )
+    apply_verdict(proof, approved, feedback)
+
+
+def apply_verdict(proof: PendingProof, approved: bool, feedback: str) -> bool:
+    """
+    Store the verdict if the task still holds this exact pending proof.
+    The check and the write are one conditional UPDATE, so of several
+    verdicts for the same proof only one lands (and awards points).
+    Returns whether this one did.
+    """
+    Task = models.Task
+    proof_status = "approved" if approved else "rejected"
+    db = SessionLocal()
+    try:
+        # Task deleted or proof re-submitted meanwhile → no row, verdict dropped
+        row = db.execute(
+            update(Task)
+            .where(
+                Task.id == proof.task_id,
+                Task.proof_status == "pending",
+                Task.proof_text.is_not_distinct_from(proof.proof_text),
+                Task.proof_url.is_not_distinct_from(proof.proof_url),
+            )
+            .values(proof_status=proof_status, proof_feedback=feedback, proof_claimed_until=None)
+            .returning(Task.owner_id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row is None:
+            db.rollback()
+            return False
+        owner_id = row.owner_id
+
+        task = db.get(Task, proof.task_id)
+        if approved and task.status != "completed":
+            task.status = "completed"
+            task.completed_at = datetime.utcnow()
+            owner = db.get(models.User, owner_id)
+            update_user_streak_and_points(db, owner, task.completed_at)
+
+        # The verdict itself went around the unit of work, so the flush
+        # hooks didn't see it
+        mark_data_changed(db, owner_id)
+        record_task_change(
+            db, owner_id, task.id, "updated", status=task.status, proof_status=proof_status
+        )
+        record_event(db, owner_id, {
+            "type": "proof",
+            "task_id": task.id,
+            "proof_status": proof_status,
+            "proof_feedback": feedback,
+        })
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+proof_queue = ProofQueue()
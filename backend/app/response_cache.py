@@ -0,0 +1,168 @@
+import itertools
+import os
+import threading
+import uuid
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import models
+from .events import DATA_CHANGED_CHANNEL, RESYNC, event_hub
+from .principal_cache import _TTLCache
+
+
+# ================= RESPONSE CACHE CONFIG ==================
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "5000"))
+# Other workers' writes arrive through the events broker; without one, or
+# while it's unreachable, this bounds how long they can go unnoticed here
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+
+# Built payload plus any extra response headers (e.g. X-Next-Cursor)
+Builder = Callable[[], Awaitable[Tuple[object, Dict[str, str]]]]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match list, as RFC 9110 asks for GET."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+class ResponseCache:
+    """
+    Serialized JSON for polled read endpoints, keyed by
+    (scope, endpoint, query string, version).
+
+    Each user's data carries a version that changes after any commit touching
+    their tasks, streak logs or user row, in whichever worker it happened,
+    so a cached body is never served for data that has moved on; old
+    versions just age out of the LRU. The version also makes a weak ETag,
+    so an unchanged poll costs a 304.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: int = RESPONSE_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        # Tells this process's ETags apart from another worker's or a restart's
+        self.epoch = uuid.uuid4().hex[:8]
+        self.versions = _TTLCache(maxsize)
+        self.bodies = _TTLCache(maxsize)
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "not_modified": 0}
+        )
+
+    # ---------- versions ----------
+
+    def version(self, user_id: int) -> int:
+        current = self.versions.get(user_id)
+        if current is None:
+            # Unknown or expired: a fresh number can't match anything cached
+            current = self.bump(user_id)
+        return current
+
+    def bump(self, user_id: int) -> int:
+        with self._lock:
+            version = next(self._counter)
+        self.versions.put(user_id, version, self.ttl)
+        return version
+
+    def on_remote(self, payload: dict):
+        """Listener for DATA_CHANGED_CHANNEL: another worker committed these users' writes."""
+        if payload["type"] == RESYNC["type"]:
+            self.versions.clear()       # missed some; every user gets a fresh version
+            return
+        for user_id in payload["user_ids"]:
+            self.bump(user_id)
+
+    # ---------- serving ----------
+
+    def _count(self, endpoint: str, outcome: str):
+        with self._lock:
+            self._endpoints[endpoint][outcome] += 1
+
+    async def respond(
+        self,
+        request: Request,
+        endpoint: str,
+        scope: Hashable,
+        version: Hashable,
+        build: Builder,
+    ) -> Response:
+        """304 if the client has this version, else the cached or freshly built body."""
+        etag = f'W/"{self.epoch}-{version}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self._count(endpoint, "not_modified")
+            return Response(status_code=304, headers=headers)
+
+        key = (scope, endpoint, request.url.query, version)
+        cached = self.bodies.get(key)
+        if cached is not None:
+            self._count(endpoint, "hits")
+            body, extra = cached
+        else:
+            self._count(endpoint, "misses")
+            payload, extra = await build()
+            body = JSONResponse(jsonable_encoder(payload)).body
+            self.bodies.put(key, (body, extra), self.ttl)
+
+        return Response(body, media_type="application/json", headers={**extra, **headers})
+
+    def stats(self) -> dict:
+        with self._lock:
+            endpoints = {name: dict(counts) for name, counts in self._endpoints.items()}
+        for counts in endpoints.values():
+            served = counts["hits"] + counts["not_modified"]
+            total = served + counts["misses"]
+            counts["hit_rate"] = served / total if total else 0.0
+        return {"bodies": self.bodies.stats(), "endpoints": endpoints}
+
+
+response_cache = ResponseCache()
+event_hub.listen(DATA_CHANGED_CHANNEL, response_cache.on_remote)
+
+
+# ================= INVALIDATION ==================
+# Owners of flushed Task / StreakLog / User rows get a new version once the
+# transaction commits; readers can't see the new rows before that. The other
+# workers are told through the events broker.
+
+def mark_data_changed(session: Session, user_id: int):
+    """For writes that bypass the ORM unit of work (Core INSERT/UPDATE/DELETE)."""
+    session.info.setdefault("changed_data_user_ids", set()).add(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_data_writes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (models.Task, models.StreakLog)):
+            user_id = obj.owner_id if isinstance(obj, models.Task) else obj.user_id
+        elif isinstance(obj, models.User):
+            user_id = obj.id
+        else:
+            continue
+        if user_id is not None:
+            mark_data_changed(session, user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session):
+    user_ids = session.info.pop("changed_data_user_ids", None)
+    if not user_ids:
+        return
+    for user_id in user_ids:
+        response_cache.bump(user_id)
+    event_hub.publish(DATA_CHANGED_CHANNEL, {"type": "data_changed", "user_ids": sorted(user_ids)})
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("changed_data_user_ids", None)
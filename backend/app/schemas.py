@@ -1,7 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 
 
@@ -75,8 +75,72 @@ class TaskOut(TaskBase):
     class Config:
         from_attributes = True
 
+# ---------- Bulk Task Schemas ----------
+
+MAX_BULK_ITEMS = 500
+
+
+class TaskBulkCreate(BaseModel):
+    items: List[TaskCreate] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class TaskBulkUpdateItem(TaskUpdate):
+    id: int
+
+
+class TaskBulkUpdate(BaseModel):
+    items: List[TaskBulkUpdateItem] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class TaskBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class BulkItemResult(BaseModel):
+    index: int                      # position in the request
+    id: Optional[int] = None
+    ok: bool
+    error: Optional[str] = None
+    task: Optional[TaskOut] = None
+
+
+class BulkResult(BaseModel):
+    results: List[BulkItemResult]
+
+class ProofStatusOut(BaseModel):
+    task_id: int
+    status: str
+    proof_status: Optional[str] = None      # none | pending | approved | rejected
+    proof_feedback: Optional[str] = None
+    proof_submitted_at: Optional[datetime] = None
+
+class StreamTicketOut(BaseModel):
+    ticket: str
+    expires_in: int                          # seconds
+
 class UserStats(BaseModel):
   total_points: int
   current_streak: int
   longest_streak: int
   tasks_completed: int
+
+
+# ---------- Dashboard Schemas ----------
+
+class DashboardStats(UserStats):
+    tasks_total: int
+    tasks_by_status: Dict[str, int]
+
+
+class DashboardTasks(BaseModel):
+    items: List[TaskOut]
+    next_cursor: Optional[str] = None     # pass as ?cursor= to GET /tasks
+
+
+class DashboardOut(BaseModel):
+    """Only the widgets asked for in ?fields= are present."""
+    user: Optional[UserOut] = None
+    stats: Optional[DashboardStats] = None
+    tasks: Optional[DashboardTasks] = None
+    calendar: Optional[Dict[str, int]] = None       # ISO date → tasks completed
+    leaderboard: Optional[dict] = None              # {"top": [...], "me": {...}}
@@ -0,0 +1,370 @@
+import hashlib
+import hmac
+import os
+import re
+import shutil
+import tempfile
+import uuid
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from io import BytesIO
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+
+# ================= STORAGE CONFIG ==================
+PROOF_STORAGE = os.getenv("PROOF_STORAGE", "local")                     # local | s3
+PROOF_STORAGE_DIR = os.getenv(
+    "PROOF_STORAGE_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "proof_uploads"),
+)
+# Local copies for serving: thumbnails, and originals when the blobs are remote
+PROOF_CACHE_DIR = os.getenv("PROOF_CACHE_DIR", os.path.join(PROOF_STORAGE_DIR, ".cache"))
+
+# S3 or any S3-compatible service (MinIO, R2, ...), path-style addressing
+PROOF_S3_ENDPOINT = os.getenv("PROOF_S3_ENDPOINT", "https://s3.amazonaws.com")
+PROOF_S3_BUCKET = os.getenv("PROOF_S3_BUCKET", "")
+PROOF_S3_PREFIX = os.getenv("PROOF_S3_PREFIX", "proofs/")
+PROOF_S3_REGION = os.getenv("PROOF_S3_REGION", "us-east-1")
+PROOF_S3_ACCESS_KEY = os.getenv("PROOF_S3_ACCESS_KEY", "")
+PROOF_S3_SECRET_KEY = os.getenv("PROOF_S3_SECRET_KEY", "")
+
+COPY_CHUNK_SIZE = 256 * 1024
+
+_BLOB_KEY = re.compile(r"^[0-9a-f]{64}$")
+
+
+def is_blob_key(value: Optional[str]) -> bool:
+    """True for content keys (sha256 hex); older tasks hold a file path instead."""
+    return bool(value and _BLOB_KEY.match(value))
+
+
+def shard_path(key: str) -> str:
+    """ab/cd/abcd… so no directory grows past 65k entries."""
+    return f"{key[:2]}/{key[2:4]}/{key}"
+
+
+class BlobStorage:
+    """
+    Where proof files live, addressed by the sha256 of their content.
+    Uploads are staged to a local file first (validated and hashed there),
+    then handed to store(). Methods block; async callers use a threadpool.
+    """
+
+    def __init__(self, staging_dir: str, cache_dir: str = PROOF_CACHE_DIR):
+        self.staging_dir = staging_dir
+        self.cache_dir = cache_dir
+
+    def staging_path(self) -> str:
+        os.makedirs(self.staging_dir, exist_ok=True)
+        return os.path.join(self.staging_dir, uuid.uuid4().hex)
+
+    def keep_staged(self, staged_path: str) -> str:
+        """A second staged file with the same content, still there after store() takes the first."""
+        kept = self.staging_path()
+        try:
+            os.link(staged_path, kept)
+        except OSError:
+            shutil.copyfile(staged_path, kept)      # no hard links on this filesystem
+        return kept
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def store(self, key: str, staged_path: str):
+        """Take ownership of staged_path and keep it under key."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def keys(self) -> Iterator[Tuple[str, datetime]]:
+        """Every stored key with its last-modified time (UTC, naive)."""
+        raise NotImplementedError
+
+    def cached_path(self, key: str) -> str:
+        """
+        A local file with the blob's content that stays put while a response
+        streams it. Content never changes under a key, so the copy is kept in
+        cache_dir until the blob is deleted. Raises FileNotFoundError.
+        """
+        path = os.path.join(self.cache_dir, "blobs", shard_path(key))
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f"{path}.{uuid.uuid4().hex}.part"
+            try:
+                self._download(key, partial)
+                os.replace(partial, path)
+            finally:
+                if os.path.exists(partial):
+                    os.remove(partial)
+        return path
+
+    def _download(self, key: str, dest_path: str):
+        with self.open(key) as src, open(dest_path, "wb") as out:
+            shutil.copyfileobj(src, out, COPY_CHUNK_SIZE)
+
+    def _drop_cached(self, key: str):
+        try:
+            os.remove(os.path.join(self.cache_dir, "blobs", shard_path(key)))
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        """A filesystem path with the blob's content, for code that needs one."""
+        path = self.staging_path()
+        try:
+            self._download(key, path)
+            yield path
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class LocalBlobStorage(BlobStorage):
+    """Sharded directories on local disk: root/ab/cd/<sha256>."""
+
+    def __init__(self, root: str = PROOF_STORAGE_DIR):
+        self.root = os.path.abspath(root)
+        # Staging on the same filesystem makes store() an atomic rename
+        super().__init__(os.path.join(self.root, ".staging"), os.path.join(self.root, ".cache"))
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, shard_path(key))
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def store(self, key: str, staged_path: str):
+        dest = self.path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(staged_path, dest)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.path(key), "rb")
+
+    def keys(self) -> Iterator[Tuple[str, datetime]]:
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            if dirpath == self.root:
+                dirnames[:] = [d for d in dirnames if len(d) == 2]
+            for name in filenames:
+                if is_blob_key(name):
+                    mtime = os.path.getmtime(os.path.join(dirpath, name))
+                    yield name, datetime.utcfromtimestamp(mtime)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        yield self.path(key)
+
+    def cached_path(self, key: str) -> str:
+        path = self.path(key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        return path
+
+
+# ================= S3 ==================
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _uri_encode(value: str, safe: str = "-_.~") -> str:
+    return quote(value, safe=safe)
+
+
+def sigv4_authorization(
+    method: str,
+    url: str,
+    headers: Dict[str, str],
+    payload_sha256: str,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    now: datetime,
+) -> str:
+    """AWS Signature V4 Authorization header for an S3 request."""
+    parts = urlsplit(url)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    scope = f"{now:%Y%m%d}/{region}/s3/aws4_request"
+
+    query = []
+    for pair in filter(None, parts.query.split("&")):
+        name, _, value = pair.partition("=")
+        query.append((_uri_encode(unquote(name)), _uri_encode(unquote(value))))
+    canonical_query = "&".join(f"{n}={v}" for n, v in sorted(query))
+
+    signed = {k.lower(): v.strip() for k, v in headers.items()}
+    signed["host"] = parts.netloc
+    names = sorted(signed)
+
+    canonical_request = "\n".join([
+        method,
+        _uri_encode(unquote(parts.path) or "/", safe="/-_.~"),
+        canonical_query,
+        "".join(f"{n}:{signed[n]}\n" for n in names),
+        ";".join(names),
+        payload_sha256,
+    ])
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256",
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+    ])
+
+    key = _hmac(f"AWS4{secret_key}".encode("utf-8"), f"{now:%Y%m%d}")
+    for part in (region, "s3", "aws4_request"):
+        key = _hmac(key, part)
+    signature = hmac.new(key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    return (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={';'.join(names)}, Signature={signature}"
+    )
+
+
+class S3BlobStorage(BlobStorage):
+    """
+    S3-compatible object storage over plain HTTPS with SigV4 signing.
+    Objects live at <bucket>/<prefix>ab/cd/<sha256>; the key doubles as the
+    payload hash the signature needs, so uploads are never re-read to sign.
+    """
+
+    EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+    def __init__(
+        self,
+        endpoint: str = PROOF_S3_ENDPOINT,
+        bucket: str = PROOF_S3_BUCKET,
+        prefix: str = PROOF_S3_PREFIX,
+        region: str = PROOF_S3_REGION,
+        access_key: str = PROOF_S3_ACCESS_KEY,
+        secret_key: str = PROOF_S3_SECRET_KEY,
+        staging_dir: Optional[str] = None,
+        cache_dir: str = PROOF_CACHE_DIR,
+    ):
+        if not bucket:
+            raise RuntimeError("PROOF_STORAGE=s3 needs PROOF_S3_BUCKET")
+        self.endpoint = endpoint.rstrip("/")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.region = region
+        self.access_key = access_key
+        self.secret_key = secret_key
+
+        import httpx    # only the S3 backend needs it; keeps it out of local boot
+
+        self._http = httpx.Client(timeout=httpx.Timeout(60, connect=5))
+        super().__init__(
+            staging_dir or os.path.join(tempfile.gettempdir(), "tasksure-staging"), cache_dir
+        )
+
+    def _url(self, key: str = "") -> str:
+        object_key = self.prefix + shard_path(key) if key else ""
+        return f"{self.endpoint}/{self.bucket}/{_uri_encode(object_key, safe='/-_.~')}"
+
+    def _signed_headers(self, method: str, url: str, payload_sha256: str = EMPTY_SHA256):
+        now = datetime.now(timezone.utc)
+        headers = {"x-amz-content-sha256": payload_sha256, "x-amz-date": f"{now:%Y%m%dT%H%M%SZ}"}
+        headers["Authorization"] = sigv4_authorization(
+            method, url, headers, payload_sha256,
+            self.access_key, self.secret_key, self.region, now,
+        )
+        return headers
+
+    def _request(self, method, url, payload_sha256=EMPTY_SHA256, headers=None, **kwargs):
+        headers = {**(headers or {}), **self._signed_headers(method, url, payload_sha256)}
+        return self._http.request(method, url, headers=headers, **kwargs)
+
+    def exists(self, key: str) -> bool:
+        response = self._request("HEAD", self._url(key))
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    def store(self, key: str, staged_path: str):
+        try:
+            size = os.path.getsize(staged_path)
+            with open(staged_path, "rb") as body:
+                response = self._request(
+                    "PUT",
+                    self._url(key),
+                    payload_sha256=key,
+                    headers={"Content-Length": str(size)},
+                    content=body,
+                )
+            response.raise_for_status()
+        finally:
+            os.remove(staged_path)
+
+    def delete(self, key: str):
+        response = self._request("DELETE", self._url(key))
+        if response.status_code not in (200, 204, 404):
+            response.raise_for_status()
+        self._drop_cached(key)
+
+    def open(self, key: str) -> BinaryIO:
+        response = self._request("GET", self._url(key))
+        response.raise_for_status()
+        return BytesIO(response.content)
+
+    def _download(self, key: str, dest_path: str):
+        # Stream straight to disk instead of buffering the object
+        url = self._url(key)
+        with self._http.stream("GET", url, headers=self._signed_headers("GET", url)) as response:
+            if response.status_code == 404:
+                raise FileNotFoundError(key)
+            response.raise_for_status()
+            with open(dest_path, "wb") as out:
+                for chunk in response.iter_bytes(COPY_CHUNK_SIZE):
+                    out.write(chunk)
+
+    def keys(self) -> Iterator[Tuple[str, datetime]]:
+        token = None
+        while True:
+            query = f"list-type=2&prefix={_uri_encode(self.prefix)}"
+            if token:
+                query += f"&continuation-token={_uri_encode(token)}"
+            response = self._request("GET", f"{self._url()}?{query}")
+            response.raise_for_status()
+
+            root = ET.fromstring(response.content)
+            ns = {"s3": root.tag.split("}")[0].strip("{")} if root.tag.startswith("{") else {}
+            find = (lambda el, tag: el.find(f"s3:{tag}", ns)) if ns else (lambda el, tag: el.find(tag))
+            for item in root.iter(f"{{{ns['s3']}}}Contents" if ns else "Contents"):
+                name = find(item, "Key").text.rsplit("/", 1)[-1]
+                if is_blob_key(name):
+                    modified = datetime.fromisoformat(
+                        find(item, "LastModified").text.replace("Z", "+00:00")
+                    )
+                    yield name, modified.astimezone(timezone.utc).replace(tzinfo=None)
+
+            truncated = find(root, "IsTruncated")
+            next_token = find(root, "NextContinuationToken")
+            if truncated is None or truncated.text != "true" or next_token is None:
+                return
+            token = next_token.text
+
+
+def make_storage(kind: str = PROOF_STORAGE) -> BlobStorage:
+    if kind == "local":
+        return LocalBlobStorage()
+    if kind == "s3":
+        return S3BlobStorage()
+    raise RuntimeError(f"Unknown PROOF_STORAGE {kind!r} (expected local or s3)")
+
+
+storage = make_storage()
@@ -1,46 +1,161 @@
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from . import models
+from .leaderboard import leaderboard
+from .principal_cache import mark_user_changed
+from .response_cache import mark_data_changed
+from .events import record_event
 
 POINTS_PER_TASK = 10
 
 
+def _streak_after(completion_day: date):
+    """SQL for the streak once a completion on completion_day lands."""
+    last = models.User.last_active_date
+    return case(
+        (last.is_(None), 1),
+        (last >= completion_day, models.User.current_streak),      # same day / older
+        (last == completion_day - timedelta(days=1), models.User.current_streak + 1),
+        else_=1,                                                   # gap → reset
+    )
+
+
 def update_user_streak_and_points(
     db: Session,
     user: models.User,
     completed_at: datetime,
+    completions: int = 1,
 ):
-    """Update user's streak and points when they complete a task."""
-    if completed_at is None:
+    """
+    Update user's streak and points when they complete a task
+    (or a batch of tasks all completed at completed_at).
+
+    Done as one UPDATE computed from the row's current values (and an upsert
+    for the day's rollup), so concurrent completions can't overwrite each
+    other's increments. The row lock lasts only until the transaction ends.
+    """
+    if completed_at is None or completions < 1:
         return
 
+    points = completions * POINTS_PER_TASK
     completion_day: date = completed_at.date()
-    last_day: date | None = user.last_active_date
-
-    # Update streak
-    if last_day is None:
-        # First ever completion
-        user.current_streak = 1
-    else:
-        diff = (completion_day - last_day).days
-        if diff == 0:
-            # Same day -> streak unchanged
-            pass
-        elif diff == 1:
-            # Consecutive day -> streak +1
-            user.current_streak += 1
-        else:
-            # Gap -> streak reset
-            user.current_streak = 1
-
-    # Update longest streak
-    if user.current_streak > user.longest_streak:
-        user.longest_streak = user.current_streak
-
-    # Update last active day
-    user.last_active_date = completion_day
-
-    # Add points
-    user.total_points += POINTS_PER_TASK
-
-    db.add(user)
+    new_streak = _streak_after(completion_day)
+    last = models.User.last_active_date
+
+    stmt = (
+        update(models.User)
+        .where(models.User.id == user.id)
+        .values(
+            total_points=func.coalesce(models.User.total_points, 0) + points,
+            current_streak=new_streak,
+            longest_streak=case(
+                (new_streak > func.coalesce(models.User.longest_streak, 0), new_streak),
+                else_=models.User.longest_streak,
+            ),
+            last_active_date=case(
+                (or_(last.is_(None), last < completion_day), completion_day),
+                else_=last,
+            ),
+        )
+        .returning(
+            models.User.total_points,
+            models.User.current_streak,
+            models.User.longest_streak,
+            models.User.last_active_date,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(stmt).one()
+
+    # Reflect the new values on the in-session object without dirtying it
+    for name in ("total_points", "current_streak", "longest_streak", "last_active_date"):
+        set_committed_value(user, name, getattr(row, name))
+
+    # Bypasses the ORM, so tell the caches explicitly
+    mark_user_changed(db, user.id)
+    mark_data_changed(db, user.id)
+
+    # Pushed to the user's open streams after commit
+    record_event(db, user.id, {
+        "type": "stats",
+        "total_points": row.total_points,
+        "current_streak": row.current_streak,
+        "longest_streak": row.longest_streak,
+    })
+
+    # Per-day rollup for the calendars, same transaction as the points
+    _bump_streak_log(db, user.id, completion_day, completions)
+
+    # Leaderboard picks this up once the transaction commits
+    leaderboard.record_award(db, user, points, completed_at)
+
+
+def _bump_streak_log(db: Session, user_id: int, day: date, completed: int = 1):
+    dialect = db.get_bind().dialect.name
+    values = {
+        "user_id": user_id,
+        "date": day,
+        "completed_count": completed,
+        "points": completed * POINTS_PER_TASK,
+    }
+
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else pg_insert
+        stmt = insert(models.StreakLog).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "date"],
+            set_={
+                "completed_count": models.StreakLog.completed_count + stmt.excluded.completed_count,
+                "points": models.StreakLog.points + stmt.excluded.points,
+            },
+        )
+        db.execute(stmt)
+        return
+
+    # Other backends: plain read-modify-write
+    log = db.get(models.StreakLog, (user_id, day))
+    if log is None:
+        log = models.StreakLog(user_id=user_id, date=day, completed_count=0, points=0)
+        db.add(log)
+    log.completed_count += completed
+    log.points += completed * POINTS_PER_TASK
+    db.flush()
+
+
+def backfill_streak_log(db: Session) -> int:
+    """
+    Rebuild streak_logs from tasks.completed_at (one row per user per day).
+    Returns the number of rows written.
+    """
+    day = func.date(models.Task.completed_at)
+    completed = func.count(models.Task.id)
+
+    rows = db.execute(
+        select(models.Task.owner_id, day, completed)
+        .where(
+            models.Task.status == "completed",
+            models.Task.completed_at.isnot(None),
+            models.Task.owner_id.isnot(None),
+        )
+        .group_by(models.Task.owner_id, day)
+    ).all()
+
+    db.query(models.StreakLog).delete(synchronize_session=False)
+    db.bulk_insert_mappings(
+        models.StreakLog,
+        [
+            {
+                "user_id": owner_id,
+                "date": date.fromisoformat(str(completion_day)[:10]),
+                "completed_count": count,
+                "points": count * POINTS_PER_TASK,
+            }
+            for owner_id, completion_day, count in rows
+        ],
+    )
+    return len(rows)
+
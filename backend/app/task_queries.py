@@ -0,0 +1,89 @@
+import base64
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.sql import Select
+
+from . import models, schemas
+
+# Columns a client may ask for with ?fields=
+TASK_FIELDS = tuple(schemas.TaskOut.model_fields)
+
+# Always selected: the keyset cursor is built from them
+CURSOR_FIELDS = ("id", "created_at")
+
+
+def encode_task_cursor(created_at: datetime, task_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{task_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_task_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError on a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, _, task_id = base64.urlsafe_b64decode(padded).decode("utf-8").partition("|")
+        return datetime.fromisoformat(created_at), int(task_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """'id,title' → ['id', 'title']; None means every column. Raises ValueError."""
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in names if f not in TASK_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def task_list_query(
+    owner_id: int,
+    columns: Optional[Sequence[str]] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    due_before: Optional[datetime] = None,
+    due_after: Optional[datetime] = None,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    """
+    Owner's tasks newest first, keyset-paginated on (created_at, id).
+    Rides ix_tasks_owner_created; id is the rowid so the tie-break is free.
+    """
+    Task = models.Task
+
+    if columns is None:
+        stmt = select(Task)
+    else:
+        wanted = list(dict.fromkeys([*CURSOR_FIELDS, *columns]))
+        stmt = select(*(getattr(Task, name) for name in wanted))
+
+    stmt = stmt.where(Task.owner_id == owner_id)
+
+    if status is not None:
+        stmt = stmt.where(Task.status == status)
+    if priority is not None:
+        stmt = stmt.where(Task.priority == priority)
+    if due_before is not None:
+        stmt = stmt.where(Task.due_date < due_before)
+    if due_after is not None:
+        stmt = stmt.where(Task.due_date >= due_after)
+
+    if cursor is not None:
+        created_at, task_id = cursor
+        stmt = stmt.where(
+            or_(
+                Task.created_at < created_at,
+                and_(Task.created_at == created_at, Task.id < task_id),
+            )
+        )
+
+    stmt = stmt.order_by(Task.created_at.desc(), Task.id.desc())
+
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
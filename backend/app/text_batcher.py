@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from .ai_verifier import TEXT_MODEL, TextProof, ai_verify_proof, verify_text_batch
+from .openai_client import ModelUnavailable
+from .verdict_cache import verdict_cache, verdict_key
+
+
+# ================= BATCH CONFIG ==================
+TEXT_BATCH_SIZE = int(os.getenv("TEXT_BATCH_SIZE", "16"))            # 1 disables batching
+TEXT_BATCH_WINDOW_MS = int(os.getenv("TEXT_BATCH_WINDOW_MS", "250"))
+TEXT_BATCH_CALLS = int(os.getenv("TEXT_BATCH_CALLS", "4"))           # batches in flight
+
+Verdict = Tuple[bool, str]
+BatchFn = Callable[[List[TextProof]], List[Optional[Verdict]]]
+
+
+class TextBatcher:
+    """
+    Micro-batches text-only proof checks into one model call.
+    submit() returns a Future; pending proofs are flushed when max_items have
+    queued up or the oldest one has waited window_ms. Items the batch reply
+    doesn't cover are re-checked one by one with the single-proof verifier.
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchFn = verify_text_batch,
+        single_fn: Callable[..., Verdict] = ai_verify_proof,
+        max_items: int = TEXT_BATCH_SIZE,
+        window_ms: int = TEXT_BATCH_WINDOW_MS,
+        max_calls: int = TEXT_BATCH_CALLS,
+    ):
+        self.batch_fn = batch_fn
+        self.single_fn = single_fn
+        self.max_items = max_items
+        self.window = window_ms / 1000
+        self.max_calls = max_calls
+
+        self.batches = 0
+        self.items = 0
+        self.fallbacks = 0
+
+        self._stats_lock = threading.Lock()
+        self._pending: List[Tuple[str, TextProof, Future]] = []
+        self._oldest = 0.0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(
+        self,
+        proof_text: Optional[str],
+        task_title: Optional[str] = None,
+        task_description: Optional[str] = None,
+    ) -> Future:
+        future: Future = Future()
+
+        key = verdict_key(TEXT_MODEL, None, proof_text, task_title, task_description)
+        cached = verdict_cache.get(key)
+        if cached is not None:
+            future.set_result(cached)
+            return future
+
+        with self._cond:
+            self._start()
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((key, (proof_text, task_title, task_description), future))
+            self._cond.notify()
+        return future
+
+    def verify(self, proof_text, task_title=None, task_description=None) -> Verdict:
+        """Blocking form of submit()."""
+        return self.submit(proof_text, task_title, task_description).result()
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "fallbacks": self.fallbacks,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+    # ---------------- internals ----------------
+
+    def _start(self):
+        # Caller holds self._cond
+        if self._thread is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_calls, thread_name_prefix="text-batch"
+            )
+            self._thread = threading.Thread(
+                target=self._collect, name="text-batcher", daemon=True
+            )
+            self._thread.start()
+
+    def _collect(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                while len(self._pending) < self.max_items:
+                    remaining = self._oldest + self.window - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = self._pending[: self.max_items]
+                self._pending = self._pending[self.max_items :]
+                self._oldest = time.monotonic()
+
+            self._executor.submit(self._flush, batch)
+
+    def _flush(self, batch: List[Tuple[str, TextProof, Future]]):
+        with self._stats_lock:
+            self.batches += 1
+            self.items += len(batch)
+
+        if len(batch) == 1:
+            verdicts: List[Optional[Verdict]] = [None]
+        else:
+            try:
+                verdicts = self.batch_fn([proof for _, proof, _ in batch])
+            except ModelUnavailable as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                return
+            except Exception as e:
+                print("AI batch error →", e)
+                for _, _, future in batch:
+                    future.set_result((False, "AI verification failed."))
+                return
+
+        for (key, proof, future), verdict in zip(batch, verdicts):
+            try:
+                if verdict is None:
+                    # Not covered by the batch reply → ask for this one alone
+                    if len(batch) > 1:
+                        with self._stats_lock:
+                            self.fallbacks += 1
+                    text, title, description = proof
+                    verdict = self.single_fn(
+                        text, None, task_title=title, task_description=description
+                    )
+                else:
+                    verdict_cache.put(key, TEXT_MODEL, *verdict)
+                future.set_result(verdict)
+            except Exception as e:
+                future.set_exception(e)
+
+
+text_batcher: Optional[TextBatcher] = TextBatcher() if TEXT_BATCH_SIZE > 1 else None
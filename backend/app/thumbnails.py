@@ -0,0 +1,55 @@
+"""
+Proof photo previews for the task list, generated on first request and
+cached on disk next to the blob cache: <cache_dir>/thumbs/ab/cd/<key>-<size>.jpg.
+A key's content never changes, so a cached thumbnail never goes stale; it is
+removed together with its blob.
+"""
+import os
+import uuid
+from typing import Optional
+
+from .image_prep import make_thumbnail
+from .storage import BlobStorage, shard_path, storage
+
+
+# ================= THUMBNAIL CONFIG ==================
+THUMBNAIL_SIZES = {
+    "thumb": int(os.getenv("PROOF_THUMB_DIM", "256")),        # longest side, px
+    "preview": int(os.getenv("PROOF_PREVIEW_DIM", "768")),
+}
+PROOF_THUMB_QUALITY = int(os.getenv("PROOF_THUMB_QUALITY", "75"))
+
+
+def thumbnail_path(key: str, size: str, blob_storage: Optional[BlobStorage] = None) -> str:
+    blob_storage = blob_storage or storage
+    return os.path.join(blob_storage.cache_dir, "thumbs", f"{shard_path(key)}-{size}.jpg")
+
+
+def ensure_thumbnail(key: str, source_path: str, size: str) -> str:
+    """
+    Path of the cached thumbnail, rendering it from source_path first if needed.
+    Concurrent first requests may both render; the rename makes that harmless.
+    """
+    path = thumbnail_path(key, size)
+    if os.path.exists(path):
+        return path
+
+    data = make_thumbnail(source_path, THUMBNAIL_SIZES[size], PROOF_THUMB_QUALITY)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.{uuid.uuid4().hex}.part"
+    try:
+        with open(partial, "wb") as out:
+            out.write(data)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return path
+
+
+def drop_thumbnails(key: str, blob_storage: Optional[BlobStorage] = None):
+    for size in THUMBNAIL_SIZES:
+        try:
+            os.remove(thumbnail_path(key, size, blob_storage))
+        except FileNotFoundError:
+            pass
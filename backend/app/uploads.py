@@ -0,0 +1,149 @@
+import os
+import re
+import hashlib
+import json
+import time
+from typing import Tuple
+
+import anyio
+from fastapi import HTTPException, UploadFile
+
+from . import metrics
+
+
+# ================= UPLOAD CONFIG ==================
+UPLOAD_CHUNK_SIZE = 64 * 1024                                         # bytes per read/write
+PROOF_MAX_BYTES = int(os.getenv("PROOF_MAX_BYTES", str(10 * 1024 * 1024)))
+# Room for the multipart envelope and the text fields next to the file
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+
+# Routes whose request bodies carry a proof file
+UPLOAD_PATHS = re.compile(r"^/tasks/\d+/proof$")
+
+
+def _too_large_detail() -> str:
+    return f"Proof file too large (max {PROOF_MAX_BYTES // (1024 * 1024)} MB)"
+
+
+def _too_large():
+    return HTTPException(status_code=413, detail=_too_large_detail())
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadLimitMiddleware:
+    """
+    Enforces the proof size limit while the body is still arriving.
+
+    Form fields are parsed (and files spooled to a temp file) before the
+    handler runs, so save_upload's check alone comes after a huge body has
+    been received in full. Here a declared Content-Length over the limit is
+    refused before reading anything, and a body that grows past it is cut
+    off mid-stream.
+    """
+
+    def __init__(self, app, max_bytes: int = PROOF_MAX_BYTES + UPLOAD_FORM_OVERHEAD):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not UPLOAD_PATHS.match(scope["path"]):
+            return await self.app(scope, receive, send)
+
+        declared = dict(scope["headers"]).get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.max_bytes:
+            return await self._reject(send)
+
+        state = {"received": 0, "exceeded": False}
+
+        async def limited_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["received"] += len(message.get("body", b""))
+                if state["received"] > self.max_bytes:
+                    state["exceeded"] = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            # Whatever the app makes of the aborted body, the answer is 413
+            if not state["exceeded"]:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _BodyTooLarge:
+            pass
+        if state["exceeded"]:
+            await self._reject(send)
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": _too_large_detail()}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+async def save_upload(
+    file: UploadFile,
+    dest_path: str,
+    max_bytes: int = PROOF_MAX_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> Tuple[int, str]:
+    """
+    Stream an upload to disk in fixed-size chunks, hashing as it goes.
+    Only one chunk is held in memory at a time, and file writes run in a
+    worker thread so the event loop never waits on the disk. Aborts with 413
+    (and removes the partial file) as soon as the size limit is crossed.
+    Returns: (size_in_bytes, sha256_hex)
+    """
+    # Reject early when the client told us the size up front
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large()
+
+    digest = hashlib.sha256()
+    size = 0
+    start = time.perf_counter()
+
+    try:
+        async with await anyio.open_file(dest_path, "wb") as out:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large()
+
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+
+    metrics.upload_duration.observe(time.perf_counter() - start)
+    metrics.upload_bytes.observe(size)
+    return size, digest.hexdigest()
+
+
+def file_sha256(path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """Hash a file already on disk, one chunk at a time."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,138 @@
+import os
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from . import models
+from .database import SessionLocal
+
+
+# ================= CACHE CONFIG ==================
+VERDICT_CACHE_TTL_HOURS = int(os.getenv("VERDICT_CACHE_TTL_HOURS", str(24 * 7)))
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "10000"))
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Collapse whitespace and case so trivially re-typed proofs share a key."""
+    return " ".join((text or "").split()).lower()
+
+
+def verdict_key(
+    model: str,
+    image_digest: Optional[str],
+    proof_text: Optional[str],
+    task_title: Optional[str],
+    task_description: Optional[str],
+) -> str:
+    h = hashlib.sha256()
+    for part in (
+        model,
+        image_digest or "",
+        normalize_text(proof_text),
+        normalize_text(task_title),
+        normalize_text(task_description),
+    ):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class VerdictCache:
+    """
+    Persistent verdict cache stored in the proof_verdicts table.
+    Entries expire after a TTL; when the table grows past max_entries the
+    least recently used rows are evicted.
+    """
+
+    def __init__(
+        self,
+        ttl: timedelta = timedelta(hours=VERDICT_CACHE_TTL_HOURS),
+        max_entries: int = VERDICT_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[Tuple[bool, str]]:
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            entry = db.get(models.ProofVerdict, key)
+            if entry is None or entry.expires_at <= now:
+                self._count(hit=False)
+                return None
+
+            verdict = (entry.approved, entry.feedback)
+            entry.last_used_at = now
+            entry.hit_count = (entry.hit_count or 0) + 1
+            db.commit()
+
+            self._count(hit=True)
+            return verdict
+        finally:
+            db.close()
+
+    def put(self, key: str, model: str, approved: bool, feedback: str):
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            db.merge(
+                models.ProofVerdict(
+                    key=key,
+                    model=model,
+                    approved=approved,
+                    feedback=feedback,
+                    created_at=now,
+                    expires_at=now + self.ttl,
+                    last_used_at=now,
+                    hit_count=0,
+                )
+            )
+            db.flush()
+            self._evict(db, now)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print("Verdict cache write error →", e)
+        finally:
+            db.close()
+
+    def _evict(self, db, now: datetime):
+        db.query(models.ProofVerdict).filter(
+            models.ProofVerdict.expires_at <= now
+        ).delete(synchronize_session=False)
+
+        excess = db.query(models.ProofVerdict).count() - self.max_entries
+        if excess > 0:
+            stale_keys = (
+                db.query(models.ProofVerdict.key)
+                .order_by(models.ProofVerdict.last_used_at.asc())
+                .limit(excess)
+                .subquery()
+            )
+            db.query(models.ProofVerdict).filter(
+                models.ProofVerdict.key.in_(stale_keys.select())
+            ).delete(synchronize_session=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+
+verdict_cache = VerdictCache()
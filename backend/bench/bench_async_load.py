@@ -0,0 +1,90 @@
+"""
+Concurrent load against a running server: req/s and latency per endpoint.
+
+Registers a throwaway user, seeds some tasks, then keeps --concurrency
+requests in flight per endpoint. Needs httpx.
+
+Usage (from backend/, with the API running, e.g. uvicorn app.main:app):
+    python -m bench.bench_async_load --base-url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def hammer(client, method, path, headers, total, concurrency, body_fn=None):
+    latencies = []
+    errors = 0
+    sent = 0
+
+    async def worker():
+        nonlocal errors, sent
+        while sent < total:
+            sent += 1
+            kwargs = {"headers": headers}
+            if body_fn:
+                kwargs["json"] = body_fn()
+            start = time.perf_counter()
+            resp = await client.request(method, path, **kwargs)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if resp.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "errors": errors,
+    }
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        email = f"load-{uuid.uuid4().hex[:8]}@example.com"
+        await client.post(
+            "/auth/register",
+            json={"email": email, "username": email.split("@")[0], "password": "pw"},
+        )
+        login = await client.post("/auth/login", data={"username": email, "password": "pw"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        for i in range(args.tasks):
+            await client.post("/tasks", json={"title": f"seed {i}"}, headers=headers)
+
+        endpoints = [
+            ("GET", "/tasks", None),
+            ("GET", "/stats/me", None),
+            ("GET", "/leaderboard", None),
+            ("POST", "/tasks", lambda: {"title": "load"}),
+        ]
+
+        print(f"concurrency={args.concurrency} requests={args.requests} seeded={args.tasks}")
+        print(f"{'endpoint':<18} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for method, path, body_fn in endpoints:
+            r = await hammer(
+                client, method, path, headers, args.requests, args.concurrency, body_fn
+            )
+            name = f"{method} {path}"
+            print(f"{name:<18} {r['rps']:>9.1f} {r['p50']:>9.1f} {r['p99']:>9.1f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,184 @@
+"""
+Worker cold start: how long `import app.main` takes, and how long a fresh
+uvicorn process takes to answer its first requests.
+
+1. import: --runs fresh interpreters import app.main against a database
+   path that doesn't exist; reports the median, the slowest app modules
+   (cumulative) and packages (own time of their modules, from -X importtime),
+   and checks that the import neither touched the database nor pulled in
+   openai/PIL.
+2. first request: migrates a scratch SQLite file once, then --runs times
+   starts uvicorn on it and records spawn → first 200 from /health and from
+   /leaderboard (which needs the startup hooks to have run).
+
+Writes the numbers as JSON to --out so they can be tracked across commits.
+
+Usage (from backend/):
+    python -m bench.bench_cold_start [--runs 5] [--out cold-start.json]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy dependencies the app should only load on first use
+DEFERRED = ("openai", "PIL")
+
+IMPORT_PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {DEFERRED!r} if m in sys.modules))
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def scratch_env(workdir: str) -> dict:
+    return {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{workdir}/cold.db",
+        "PROOF_STORAGE_DIR": os.path.join(workdir, "proofs"),
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "fake"),
+    }
+
+
+def measure_import(runs: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix="tasksure-cold-")
+    env = scratch_env(workdir)
+
+    times, loaded = [], set()
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND, env=env,
+            check=True, capture_output=True, text=True,
+        ).stdout.split()
+        times.append(float(out[0]))
+        if len(out) > 1:
+            loaded.update(out[1].split(","))
+
+    # One more run with -X importtime for the breakdown
+    trace = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], cwd=BACKEND, env=env,
+        check=True, capture_output=True, text=True,
+    ).stderr
+    app_modules, packages = {}, defaultdict(int)
+    for line in trace.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        if name.startswith("app."):
+            app_modules[name] = int(cumulative_us) / 1000
+        # Own time of every module, summed per top-level package
+        packages[name.split(".")[0]] += int(self_us) / 1000
+
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "max_s": max(times),
+        "touched_database": os.path.exists(os.path.join(workdir, "cold.db")),
+        "deferred_loaded": sorted(loaded),
+        "slowest_app_modules_ms": dict(sorted(app_modules.items(), key=lambda kv: -kv[1])[:8]),
+        "slowest_packages_ms": dict(sorted(packages.items(), key=lambda kv: -kv[1])[:8]),
+    }
+
+
+def first_ok(url: str, start: float, server: subprocess.Popen, timeout: float = 60) -> float:
+    while True:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        if server.poll() is not None or time.perf_counter() - start > timeout:
+            raise RuntimeError(f"API server did not answer {url}")
+        time.sleep(0.01)
+
+
+def measure_first_request(runs: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix="tasksure-cold-")
+    env = scratch_env(workdir)
+    subprocess.run(
+        [sys.executable, "-m", "app.migrations", "upgrade"], cwd=BACKEND, env=env,
+        check=True, capture_output=True,
+    )
+
+    health, leaderboard = [], []
+    for _ in range(runs):
+        port = free_port()
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+             "--log-level", "warning"],
+            cwd=BACKEND, env=env,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            health.append(first_ok(f"{base_url}/health", start, server))
+            leaderboard.append(first_ok(f"{base_url}/leaderboard", start, server))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    return {
+        "health_median_s": statistics.median(health),
+        "leaderboard_median_s": statistics.median(leaderboard),
+        "health_s": health,
+        "leaderboard_s": leaderboard,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.bench_cold_start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--out", default="cold-start.json")
+    args = parser.parse_args()
+
+    imports = measure_import(args.runs)
+    print(
+        f"import app.main: median {imports['median_s'] * 1000:.0f} ms "
+        f"(min {imports['min_s'] * 1000:.0f}, max {imports['max_s'] * 1000:.0f})"
+    )
+    for name, ms in imports["slowest_packages_ms"].items():
+        print(f"    {ms:8.1f} ms  {name}")
+    for name, ms in imports["slowest_app_modules_ms"].items():
+        print(f"    {ms:8.1f} ms  {name}")
+
+    first = measure_first_request(args.runs)
+    print(
+        f"spawn → first 200: /health {first['health_median_s'] * 1000:.0f} ms, "
+        f"/leaderboard {first['leaderboard_median_s'] * 1000:.0f} ms (median of {args.runs})"
+    )
+
+    with open(args.out, "w") as f:
+        json.dump({"runs": args.runs, "import": imports, "first_request": first}, f, indent=2)
+    print(f"Wrote {args.out}")
+
+    checks = [
+        ("import doesn't touch the database", not imports["touched_database"]),
+        (f"{'/'.join(DEFERRED)} not loaded at import", not imports["deferred_loaded"]),
+    ]
+    failed = 0
+    for name, passed in checks:
+        print(f"{'OK  ' if passed else 'FAIL'} {name}")
+        failed += not passed
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Payload size and preprocessing time for proof images.
+
+Usage (from backend/):
+    python -m bench.bench_image_prep [image ...]
+
+Defaults to everything in proof_uploads/.
+"""
+import glob
+import os
+import sys
+import time
+
+from app.image_prep import PROOF_IMAGE_MAX_DIM, prepare_image
+
+
+def b64_len(n: int) -> int:
+    return 4 * ((n + 2) // 3)
+
+
+def main(paths):
+    print(f"max_dim={PROOF_IMAGE_MAX_DIM}")
+    print(f"{'file':<48} {'raw b64':>10} {'prep b64':>10} {'saved':>7} {'ms':>8}")
+
+    total_raw = total_prep = 0
+    for path in paths:
+        raw = os.path.getsize(path)
+
+        start = time.perf_counter()
+        payload, _ = prepare_image(path)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        raw_b64, prep_b64 = b64_len(raw), b64_len(len(payload))
+        total_raw += raw_b64
+        total_prep += prep_b64
+        saved = 1 - prep_b64 / raw_b64 if raw_b64 else 0.0
+
+        name = os.path.basename(path)[-48:]
+        print(f"{name:<48} {raw_b64:>10} {prep_b64:>10} {saved:>7.0%} {elapsed_ms:>8.1f}")
+
+    if total_raw:
+        print(f"{'TOTAL':<48} {total_raw:>10} {total_prep:>10} {1 - total_prep / total_raw:>7.0%}")
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or sorted(glob.glob(os.path.join("proof_uploads", "*")))
+    main(paths)
@@ -0,0 +1,62 @@
+"""
+Leaderboard operations at scale, in memory (no database).
+
+Usage (from backend/):
+    python -m bench.bench_leaderboard [--users 1000000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+
+from app.leaderboard import Leaderboard
+
+
+def timed(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6   # µs per op
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    n = args.users
+    board = Leaderboard()
+
+    start = time.perf_counter()
+    board.meta = {uid: (f"user{uid}", 0) for uid in range(1, n + 1)}
+    board.boards["all"].load({uid: rng.randrange(0, 50_000, 10) for uid in range(1, n + 1)})
+    board._roll_windows(datetime.utcnow().date())
+    board.built = True
+    print(f"users={n:,}  build: {time.perf_counter() - start:.2f}s")
+
+    today = datetime.utcnow().date()
+    award = lambda: board.apply_award(rng.randint(1, n), "u", 1, 10, today)
+    rank = lambda: board.rank(rng.randint(1, n))
+    top = lambda: board.page("all", 20)
+
+    cursors = []
+    _, cursor = board.page("all", 20)
+    for _ in range(50):
+        cursors.append(cursor)
+        _, cursor = board.page("all", 20, cursor)
+    deep = lambda: board.page("all", 20, rng.choice(cursors))
+
+    print(f"{'op':<22} {'µs/op':>10}")
+    for name, fn in (
+        ("award (incremental)", award),
+        ("rank lookup /me", rank),
+        ("top 20 page", top),
+        ("cursor page", deep),
+    ):
+        print(f"{name:<22} {timed(fn, args.ops):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Login throughput at different password-hash cost settings.
+
+Drives verify_and_update from many client threads at once, the way
+concurrent /auth/login requests hit it, and reports verifications/s.
+
+Usage (from backend/):
+    python -m bench.bench_login [--clients 32] [--logins 200]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.auth_utils import (
+    HASH_MAX_PENDING,
+    HASH_WORKERS,
+    Argon2Hasher,
+    BcryptHasher,
+    HasherBusy,
+    PasswordContext,
+)
+
+PASSWORD = "correct horse battery staple"
+
+
+def run(hasher, clients: int, logins: int):
+    ctx = PasswordContext(hasher, workers=HASH_WORKERS, max_pending=HASH_MAX_PENDING)
+    stored = hasher.hash(PASSWORD)
+    rejected = 0
+
+    def login(_):
+        nonlocal rejected
+        while True:
+            try:
+                return ctx.verify_and_update(PASSWORD, stored)
+            except HasherBusy:
+                rejected += 1           # a real client would get 503 and retry
+                time.sleep(0.01)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+
+    return logins / elapsed, elapsed / logins * 1000, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+
+    settings = [(f"bcrypt rounds={r}", lambda r=r: BcryptHasher(rounds=r)) for r in (8, 10, 12)]
+    settings += [
+        (f"argon2 t={t} m={m // 1024}MiB", lambda t=t, m=m: Argon2Hasher(time_cost=t, memory_cost=m))
+        for t, m in ((2, 19 * 1024), (3, 64 * 1024))
+    ]
+
+    print(f"workers={HASH_WORKERS} max_pending={HASH_MAX_PENDING} clients={args.clients}")
+    print(f"{'setting':<28} {'logins/s':>10} {'ms/login':>10} {'503s':>8}")
+    for name, factory in settings:
+        try:
+            hasher = factory()
+        except RuntimeError as e:
+            print(f"{name:<28} skipped ({e})")
+            continue
+        rate, ms, rejected = run(hasher, args.clients, args.logins)
+        print(f"{name:<28} {rate:>10.1f} {ms:>10.2f} {rejected:>8}")
+
+
+if __name__ == "__main__":
+    main()
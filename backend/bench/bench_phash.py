@@ -0,0 +1,133 @@
+"""
+Duplicate proof photo detection: dHash cost and index lookup at scale.
+
+1. dHash time per image, and the distance between an image and its
+   resized / re-encoded / brightened copies vs an unrelated image.
+2. MultiIndexHash with --stored hashes (default 1M): build time, lookup
+   latency for near-duplicates and misses, against a linear scan.
+
+Stored hashes are random, which is the even-spread case for the chunk
+tables; real photo hashes cluster more and produce more candidates.
+
+Usage (from backend/):
+    python -m bench.bench_phash [--stored 1000000] [--queries 2000] [--image path.jpg]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from PIL import Image, ImageDraw, ImageEnhance
+
+from app.image_prep import image_dhash
+from app.phash_index import PHASH_REUSE_DISTANCE, MultiIndexHash, hamming
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def synthetic_photo(path, seed):
+    rnd = random.Random(seed)
+    img = Image.new("RGB", (3000, 2000), tuple(rnd.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        box = sorted(rnd.sample(range(3000), 2)), sorted(rnd.sample(range(2000), 2))
+        draw.ellipse(
+            (box[0][0], box[1][0], box[0][1], box[1][1]),
+            fill=tuple(rnd.randrange(256) for _ in range(3)),
+        )
+    img.save(path, "JPEG", quality=90)
+
+
+def hash_robustness(image_path):
+    workdir = tempfile.mkdtemp()
+    if image_path is None:
+        image_path = os.path.join(workdir, "original.jpg")
+        synthetic_photo(image_path, 1)
+    other = os.path.join(workdir, "other.jpg")
+    synthetic_photo(other, 2)
+
+    with Image.open(image_path) as img:
+        img = img.convert("RGB")
+        variants = {
+            "resized 50%": img.resize((img.width // 2, img.height // 2)),
+            "jpeg q40": img,
+            "brightened": ImageEnhance.Brightness(img).enhance(1.2),
+            "cropped 3%": img.crop(
+                (img.width * 3 // 100, img.height * 3 // 100, img.width, img.height)
+            ),
+        }
+        paths = {}
+        for name, variant in variants.items():
+            path = os.path.join(workdir, name.replace(" ", "_").replace("%", "") + ".jpg")
+            variant.save(path, "JPEG", quality=40 if name == "jpeg q40" else 90)
+            paths[name] = path
+
+    start = time.perf_counter()
+    runs = 20
+    for _ in range(runs):
+        original = image_dhash(image_path)
+    per_image = (time.perf_counter() - start) / runs * 1000
+
+    print(f"dHash: {per_image:.1f} ms per image ({os.path.getsize(image_path) // 1024} KiB)")
+    for name, path in paths.items():
+        print(f"  {name:<14} distance {hamming(original, image_dhash(path)):>2}")
+    print(f"  {'unrelated':<14} distance {hamming(original, image_dhash(other)):>2}")
+    print(f"  reuse threshold: <= {PHASH_REUSE_DISTANCE}")
+
+
+def index_scale(stored, queries, radius):
+    rnd = random.Random(7)
+    hashes = [rnd.getrandbits(64) for _ in range(stored)]
+
+    start = time.perf_counter()
+    index = MultiIndexHash(radius)
+    for item, value in enumerate(hashes):
+        index.add(value, item)
+    build = time.perf_counter() - start
+
+    def flip(value, bits):
+        for bit in rnd.sample(range(64), bits):
+            value ^= 1 << bit
+        return value
+
+    near = [flip(hashes[rnd.randrange(stored)], rnd.randint(1, radius)) for _ in range(queries)]
+    far = [rnd.getrandbits(64) for _ in range(queries)]
+
+    print(f"\nMultiIndexHash: {stored:,} hashes, radius {radius}, built in {build:.1f}s")
+    print(f"{'lookup':<12} {'p50 us':>8} {'p99 us':>8} {'found':>7}")
+    for name, batch in (("near-dup", near), ("miss", far)):
+        latencies = []
+        found = 0
+        for value in batch:
+            start = time.perf_counter()
+            found += bool(index.search(value))
+            latencies.append((time.perf_counter() - start) * 1e6)
+        print(f"{name:<12} {percentile(latencies, 50):>8.1f} {percentile(latencies, 99):>8.1f} "
+              f"{found:>7}")
+
+    scans = 5
+    start = time.perf_counter()
+    for value in near[:scans]:
+        [i for i, h in enumerate(hashes) if hamming(h, value) <= radius]
+    scan = (time.perf_counter() - start) / scans * 1e6
+    print(f"{'linear scan':<12} {scan:>8.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stored", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--radius", type=int, default=PHASH_REUSE_DISTANCE)
+    parser.add_argument("--image", default=None)
+    args = parser.parse_args()
+
+    hash_robustness(args.image)
+    index_scale(args.stored, args.queries, args.radius)
+
+
+if __name__ == "__main__":
+    main()
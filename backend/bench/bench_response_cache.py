@@ -0,0 +1,94 @@
+"""
+Polling cost of the cached read endpoints: recomputed vs cached body vs 304.
+
+Seeds one user with --tasks tasks (some completed) in a scratch SQLite
+file, then times --polls GETs per endpoint in three modes:
+  miss   the user's version is bumped before every poll (old behaviour)
+  hit    same version, body served from the LRU
+  304    client sends the ETag it was given
+Runs in process through TestClient, so numbers exclude network time.
+
+Usage (from backend/):
+    python -m bench.bench_response_cache [--tasks 500] [--polls 300]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/bench.db")
+os.environ.setdefault("PROOF_STORAGE_DIR", os.path.join(workdir, "blobs"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import migrations  # noqa: E402
+from app.main import app  # noqa: E402
+from app.response_cache import response_cache  # noqa: E402
+
+ENDPOINTS = ["/tasks", "/tasks?limit=50", "/stats/me", "/streak/calendar", "/leaderboard"]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def poll(client, url, headers, polls, user_id, mode):
+    etag = client.get(url, headers=headers).headers["etag"]
+    latencies = []
+    for _ in range(polls):
+        extra = {}
+        if mode == "miss":
+            response_cache.bump(user_id)
+        elif mode == "304":
+            extra["If-None-Match"] = etag
+        start = time.perf_counter()
+        response = client.get(url, headers={**headers, **extra})
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == (304 if mode == "304" else 200), response.status_code
+    return percentile(latencies, 50), len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--polls", type=int, default=300)
+    args = parser.parse_args()
+
+    migrations.upgrade()
+    with TestClient(app) as client:
+        client.post(
+            "/auth/register",
+            json={"email": "bench@example.com", "username": "bench", "password": "pw"},
+        )
+        token = client.post(
+            "/auth/login", data={"username": "bench@example.com", "password": "pw"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        user_id = client.get("/auth/me", headers=headers).json()["id"]
+
+        for start in range(0, args.tasks, 500):
+            items = [{"title": f"task {i}", "description": "x" * 80}
+                     for i in range(start, min(args.tasks, start + 500))]
+            client.post("/tasks/bulk", json={"items": items}, headers=headers)
+        ids = [t["id"] for t in client.get("/tasks", headers=headers).json()]
+        client.patch(
+            "/tasks/bulk",
+            json={"items": [{"id": i, "status": "completed"} for i in ids[: len(ids) // 3]]},
+            headers=headers,
+        )
+
+        print(f"{args.tasks} tasks, {args.polls} polls per mode, p50 latency")
+        print(f"{'endpoint':<20}{'miss ms':>10}{'hit ms':>10}{'304 ms':>10}{'body B':>10}")
+        for url in ENDPOINTS:
+            miss, size = poll(client, url, headers, args.polls, user_id, "miss")
+            hit, _ = poll(client, url, headers, args.polls, user_id, "hit")
+            not_modified, _ = poll(client, url, headers, args.polls, user_id, "304")
+            print(f"{url:<20}{miss:>10.2f}{hit:>10.2f}{not_modified:>10.2f}{size:>10}")
+
+        print(response_cache.stats()["endpoints"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Text proof verification: one call per proof vs micro-batched calls.
+
+Runs --proofs unique text proofs through ai_verify_proof (one model call
+each, --concurrency at a time) and then through TextBatcher, both against
+bench.fake_openai. Reports verdicts/s, model calls and token cost per proof.
+Uses a scratch SQLite file for the verdict cache unless DATABASE_URL is set.
+
+Usage (from backend/):
+    python -m bench.bench_text_batch [--proofs 400] [--latency-ms 400] [--batch 16]
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.fake_openai import FakeOpenAI
+
+# gpt-4o-mini list price, USD per 1M tokens
+INPUT_PRICE = 0.15
+OUTPUT_PRICE = 0.60
+
+
+def report(name, fake, elapsed, proofs, wrong):
+    usage = fake.stats()
+    cost = (usage["prompt_tokens"] * INPUT_PRICE + usage["completion_tokens"] * OUTPUT_PRICE) / 1e6
+    print(
+        f"{name:<10} {proofs / elapsed:>10.1f} {usage['calls']:>7} "
+        f"{(usage['prompt_tokens'] + usage['completion_tokens']) / proofs:>12.1f} "
+        f"{cost / proofs * 1e6:>14.2f} {wrong:>6}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--proofs", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--window-ms", type=int, default=250)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeOpenAI(args.latency_ms, args.drop_rate)
+    os.environ["OPENAI_BASE_URL"] = fake.serve()
+    os.environ["OPENAI_API_KEY"] = "fake"
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+    from app import migrations
+    from app.ai_verifier import ai_verify_proof
+    from app.text_batcher import TextBatcher
+
+    migrations.upgrade()
+
+    def make_proofs():
+        # Unique text so the verdict cache never answers; every 5th should be rejected
+        run = uuid.uuid4().hex[:8]
+        return [
+            (f"{'reject ' if i % 5 == 0 else ''}did it {run}-{i}", f"Task {i}", None)
+            for i in range(args.proofs)
+        ]
+
+    def count_wrong(proofs, verdicts):
+        return sum(
+            approved == text.startswith("reject")
+            for (text, _, _), (approved, _) in zip(proofs, verdicts)
+        )
+
+    print(f"proofs={args.proofs} latency={args.latency_ms:.0f}ms batch={args.batch} "
+          f"window={args.window_ms}ms drop={args.drop_rate}")
+    print(f"{'mode':<10} {'verdicts/s':>10} {'calls':>7} {'tokens/proof':>12} "
+          f"{'$/1M proofs':>14} {'wrong':>6}")
+
+    proofs = make_proofs()
+    fake.reset()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        verdicts = list(pool.map(
+            lambda p: ai_verify_proof(p[0], None, task_title=p[1], task_description=p[2]),
+            proofs,
+        ))
+    report("single", fake, time.perf_counter() - start, len(proofs), count_wrong(proofs, verdicts))
+
+    batcher = TextBatcher(max_items=args.batch, window_ms=args.window_ms)
+    proofs = make_proofs()
+    fake.reset()
+    start = time.perf_counter()
+    futures = [batcher.submit(*p) for p in proofs]
+    verdicts = [f.result() for f in futures]
+    report("batched", fake, time.perf_counter() - start, len(proofs), count_wrong(proofs, verdicts))
+    print(f"batcher: {batcher.stats()}")
+
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint.
+
+Answers POST /v1/chat/completions after --latency-ms with a verdict in the
+format ai_verifier expects ("DECISION||REASON", or one "N||DECISION||REASON"
+line per numbered proof for batched requests) and a usage block estimated at
+~4 characters per token. Proofs containing "reject" are rejected.
+--jitter-ms adds a uniform random 0..jitter to each call's latency.
+--drop-rate omits that fraction of batch lines to exercise the fallback path;
+--error-rate answers that fraction of calls with a 500. latency and
+error_rate can be changed on a running instance to simulate an outage.
+
+Usage (from backend/):
+    python -m bench.fake_openai --port 8200 --latency-ms 400
+    OPENAI_BASE_URL=http://127.0.0.1:8200/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_PROOF_BLOCK = re.compile(r"^#(\d+)\n(.*?)(?=^#\d+\n|\Z)", re.MULTILINE | re.DOTALL)
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _decision(text: str) -> str:
+    proof = text.rpartition("User text proof:")[2].lower()
+    return "REJECT" if "reject" in proof else "APPROVE"
+
+
+class FakeOpenAI:
+    def __init__(
+        self,
+        latency_ms: float = 400,
+        drop_rate: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        jitter_ms: float = 0.0,
+    ):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.drop_rate = drop_rate
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self.inflight = 0
+        self.max_inflight = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def reply(self, body: dict) -> dict:
+        messages = body.get("messages", [])
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = messages[-1]["content"] if messages else ""
+        if isinstance(user, list):
+            user = " ".join(part.get("text", "") for part in user if isinstance(part, dict))
+
+        if "N||DECISION||REASON" in system:
+            lines = []
+            for number, block in _PROOF_BLOCK.findall(user):
+                with self._lock:
+                    dropped = self._random.random() < self.drop_rate
+                if not dropped:
+                    lines.append(f"{number}||{_decision(block)}||Checked by the fake model.")
+            content = "\n".join(lines)
+        else:
+            content = f"{_decision(user)}||Checked by the fake model."
+
+        prompt = _tokens(system + user)
+        completion = _tokens(content)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt
+            self.completion_tokens += completion
+
+        return {
+            "id": f"chatcmpl-fake-{self.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "total_tokens": prompt + completion,
+            },
+        }
+
+    def fail_next(self) -> bool:
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            self.errors += failed
+            return failed
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "max_inflight": self.max_inflight,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.calls = self.prompt_tokens = self.completion_tokens = 0
+            self.errors = self.max_inflight = 0
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start in a daemon thread; returns the base URL (…/v1)."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+
+                with fake._lock:
+                    fake.inflight += 1
+                    fake.max_inflight = max(fake.max_inflight, fake.inflight)
+                with fake._lock:
+                    delay = fake.latency + fake._random.random() * fake.jitter
+                try:
+                    time.sleep(delay)
+                finally:
+                    with fake._lock:
+                        fake.inflight -= 1
+
+                if fake.fail_next():
+                    status = 500
+                    payload = json.dumps({"error": {"message": "fake outage", "type": "server_error"}})
+                else:
+                    status = 200
+                    payload = json.dumps(fake.reply(body))
+                payload = payload.encode()
+
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass    # client gave up (deadline)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}/v1"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    url = FakeOpenAI(
+        args.latency_ms, args.drop_rate, args.error_rate, jitter_ms=args.jitter_ms
+    ).serve(args.host, args.port)
+    print(f"Fake OpenAI listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,161 @@
+"""
+Local stand-in for an S3-compatible object store.
+
+Path-style PUT / GET / HEAD / DELETE on /<bucket>/<key> and ListObjectsV2
+(GET /<bucket>?list-type=2&prefix=...), objects kept in memory. Every request
+must carry a valid SigV4 signature for the configured access/secret key.
+
+Usage (from backend/):
+    python -m bench.fake_s3 --port 9000
+    PROOF_STORAGE=s3 PROOF_S3_ENDPOINT=http://127.0.0.1:9000 PROOF_S3_BUCKET=proofs \\
+        PROOF_S3_ACCESS_KEY=fake PROOF_S3_SECRET_KEY=fake uvicorn app.main:app
+"""
+import argparse
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.sax.saxutils import escape
+
+from app.storage import sigv4_authorization
+
+
+class FakeS3:
+    def __init__(self, access_key: str = "fake", secret_key: str = "fake", region: str = "us-east-1"):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.objects = {}           # (bucket, key) -> (bytes, modified)
+        self.requests = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _authorized(self, handler, url: str, body: bytes) -> bool:
+        auth = handler.headers.get("Authorization", "")
+        amz_date = handler.headers.get("x-amz-date", "")
+        payload = handler.headers.get("x-amz-content-sha256", "")
+        if not auth or not amz_date:
+            return False
+        if payload != "UNSIGNED-PAYLOAD" and body and hashlib.sha256(body).hexdigest() != payload:
+            return False
+        signed_names = auth.split("SignedHeaders=")[1].split(",")[0].split(";")
+        headers = {n: handler.headers[n] for n in signed_names if n != "host"}
+        now = datetime.strptime(amz_date, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        expected = sigv4_authorization(
+            handler.command, url, headers, payload,
+            self.access_key, self.secret_key, self.region, now,
+        )
+        return expected == auth
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status, body=b"", content_type="application/xml", head=False):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                url = f"http://{self.headers['Host']}{self.path}"
+                with fake._lock:
+                    fake.requests += 1
+
+                if not fake._authorized(self, url, body):
+                    with fake._lock:
+                        fake.rejected += 1
+                    return self._reply(403, b"<Error><Code>SignatureDoesNotMatch</Code></Error>")
+
+                parts = urlsplit(self.path)
+                bucket, _, key = unquote(parts.path).lstrip("/").partition("/")
+                query = parse_qs(parts.query)
+
+                if self.command == "GET" and not key and "list-type" in query:
+                    return self._list(bucket, query.get("prefix", [""])[0])
+
+                with fake._lock:
+                    if self.command == "PUT":
+                        fake.objects[(bucket, key)] = (body, time.time())
+                        return self._reply(200)
+                    if self.command == "DELETE":
+                        fake.objects.pop((bucket, key), None)
+                        return self._reply(204)
+                    stored = fake.objects.get((bucket, key))
+
+                if stored is None:
+                    return self._reply(404, head=self.command == "HEAD")
+                data, modified = stored
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("Last-Modified", formatdate(modified, usegmt=True))
+                self.end_headers()
+                if self.command == "GET":
+                    self.wfile.write(data)
+
+            def _list(self, bucket, prefix):
+                with fake._lock:
+                    items = sorted(
+                        (key, data, modified)
+                        for (b, key), (data, modified) in fake.objects.items()
+                        if b == bucket and key.startswith(prefix)
+                    )
+                contents = "".join(
+                    "<Contents>"
+                    f"<Key>{escape(key)}</Key>"
+                    f"<LastModified>{datetime.fromtimestamp(modified, timezone.utc):%Y-%m-%dT%H:%M:%S.000Z}</LastModified>"
+                    f"<Size>{len(data)}</Size>"
+                    "</Contents>"
+                    for key, data, modified in items
+                )
+                xml = (
+                    '<?xml version="1.0" encoding="UTF-8"?>'
+                    '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                    f"<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix>"
+                    f"<KeyCount>{len(items)}</KeyCount><IsTruncated>false</IsTruncated>"
+                    f"{contents}</ListBucketResult>"
+                )
+                self._reply(200, xml.encode())
+
+            do_GET = do_PUT = do_HEAD = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--access-key", default="fake")
+    parser.add_argument("--secret-key", default="fake")
+    args = parser.parse_args()
+
+    url = FakeS3(args.access_key, args.secret_key).serve(args.host, args.port)
+    print(f"Fake S3 listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,349 @@
+"""
+Load test: req/s and p50/p95/p99 per endpoint, saved as JSON so two runs
+(before/after a change) can be compared.
+
+Scenarios run one after another, each keeping --concurrency requests in
+flight until --requests are done, as random users from a pool of --active
+seeded users:
+  login              POST /auth/login (bcrypt-bound)
+  list_tasks         GET /tasks
+  update_task        PUT /tasks/{id}: completes a pending task (streak + points),
+                     renames one once the user has none left
+  upload_task_proof  POST /tasks/{id}/proof with a unique small JPEG; the
+                     verdict comes from the fake OpenAI server in the background
+  leaderboard        GET /leaderboard
+  dashboard          GET /dashboard (every widget in one call)
+
+--spawn makes a run self-contained: it seeds a scratch SQLite database with
+bench.seed_data, starts bench.fake_openai and uvicorn on it, and tears them
+down afterwards. Without it, point --base-url at a server whose database was
+seeded with bench.seed_data (same --users) and whose OPENAI_BASE_URL points
+at a fake or real model.
+
+Usage (from backend/):
+    python -m bench.load_test --spawn --out before.json
+    python -m bench.load_test --spawn --out after.json
+    python -m bench.load_test compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from io import BytesIO
+
+import httpx
+from PIL import Image
+
+from bench.fake_openai import FakeOpenAI
+from bench.seed_data import SEED_PASSWORD, seed_email
+
+SCENARIOS = ("login", "list_tasks", "update_task", "upload_task_proof", "leaderboard", "dashboard")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def proof_images(count: int, seed: int):
+    """Distinct small JPEGs, so duplicate-photo detection never short-circuits."""
+    rnd = random.Random(seed)
+    images = []
+    for _ in range(count):
+        img = Image.frombytes("RGB", (96, 96), rnd.randbytes(96 * 96 * 3))
+        out = BytesIO()
+        img.save(out, "JPEG", quality=70)
+        images.append(out.getvalue())
+    return images
+
+
+class Session:
+    """A logged-in seeded user and the task ids the scenarios act on."""
+
+    def __init__(self, index, token, pending, all_tasks):
+        self.index = index
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.pending = pending
+        self.tasks = all_tasks
+
+
+async def login(client, index):
+    response = await client.post(
+        "/auth/login", data={"username": seed_email(index), "password": SEED_PASSWORD}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def prepare_sessions(client, args, rnd):
+    indexes = rnd.sample(range(args.users), min(args.active, args.users))
+    sessions = []
+    for index in indexes:
+        token = await login(client, index)
+        headers = {"Authorization": f"Bearer {token}"}
+        tasks = (await client.get("/tasks?fields=id,status", headers=headers)).json()
+        pending = [t["id"] for t in tasks if t["status"] == "pending"]
+        sessions.append(Session(index, token, pending, [t["id"] for t in tasks]))
+    return sessions
+
+
+def request_factory(name, sessions, args, rnd, images):
+    """Returns a function producing (method, url, kwargs) for one request."""
+    if name == "login":
+        return lambda: ("POST", "/auth/login", {
+            "data": {"username": seed_email(rnd.randrange(args.users)), "password": SEED_PASSWORD}
+        })
+
+    if name == "list_tasks":
+        def make():
+            return "GET", "/tasks", {"headers": rnd.choice(sessions).headers}
+        return make
+
+    if name == "update_task":
+        def make():
+            session = rnd.choice(sessions)
+            if session.pending:
+                task_id = session.pending.pop()
+                body = {"status": "completed"}
+            else:
+                task_id = rnd.choice(session.tasks)
+                body = {"title": f"Renamed {rnd.randrange(10**6)}"}
+            return "PUT", f"/tasks/{task_id}", {"headers": session.headers, "json": body}
+        return make
+
+    if name == "upload_task_proof":
+        pool = iter(images)
+
+        def make():
+            session = rnd.choice(sessions)
+            image = next(pool)
+            return "POST", f"/tasks/{rnd.choice(session.tasks)}/proof", {
+                "headers": session.headers,
+                "files": {"file": ("proof.jpg", image, "image/jpeg")},
+            }
+        return make
+
+    if name == "leaderboard":
+        return lambda: ("GET", "/leaderboard", {"headers": rnd.choice(sessions).headers})
+
+    if name == "dashboard":
+        return lambda: ("GET", "/dashboard", {"headers": rnd.choice(sessions).headers})
+
+    raise ValueError(name)
+
+
+async def run_scenario(client, make_request, total, concurrency) -> dict:
+    latencies = []
+    statuses = Counter()
+    sent = 0
+
+    async def worker():
+        nonlocal sent
+        while sent < total:
+            sent += 1
+            method, url, kwargs = make_request()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    errors = sum(n for status, n in statuses.items() if not status.startswith(("2", "3")))
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2),
+        "statuses": dict(statuses),
+    }
+
+
+def git_revision() -> dict:
+    def git(*cmd):
+        return subprocess.run(
+            ["git", *cmd], capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    try:
+        return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain"))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+async def drive(base_url, args) -> dict:
+    rnd = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        sessions = await prepare_sessions(client, args, rnd)
+        images = proof_images(args.requests, args.seed)
+
+        results = {}
+        print(f"{'scenario':<20}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        for name in args.scenarios:
+            make_request = request_factory(name, sessions, args, rnd, images)
+            requests = min(args.requests, args.login_requests) if name == "login" else args.requests
+            r = await run_scenario(client, make_request, requests, args.concurrency)
+            results[name] = r
+            print(f"{name:<20}{r['rps']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['errors']:>8}")
+        return results
+
+
+def spawn_and_drive(args) -> dict:
+    """Scratch DB + fake model + uvicorn for the duration of one run."""
+    workdir = tempfile.mkdtemp(prefix="tasksure-load-")
+    fake = FakeOpenAI(args.ai_latency_ms, error_rate=args.ai_error_rate, jitter_ms=args.ai_jitter_ms)
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{workdir}/load.db",
+        "PROOF_STORAGE_DIR": os.path.join(workdir, "proofs"),
+        "OPENAI_BASE_URL": fake.serve(),
+        "OPENAI_API_KEY": "fake",
+    }
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    subprocess.run(
+        [sys.executable, "-m", "bench.seed_data", "--users", str(args.users),
+         "--tasks", str(args.tasks), "--days", str(args.days), "--seed", str(args.seed)],
+        cwd=backend, env=env, check=True,
+    )
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=backend, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline or server.poll() is not None:
+                raise RuntimeError("API server did not start")
+            time.sleep(0.2)
+
+        results = asyncio.run(drive(base_url, args))
+        results["_fake_openai"] = fake.stats()
+        return results
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        fake.stop()
+
+
+def run(args) -> int:
+    started = datetime.now(timezone.utc)
+    if args.spawn:
+        results = spawn_and_drive(args)
+        fake_stats = results.pop("_fake_openai")
+    else:
+        results = asyncio.run(drive(args.base_url, args))
+        fake_stats = None
+
+    report = {
+        "meta": {
+            "started_at": started.isoformat(),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "target": "spawned" if args.spawn else args.base_url,
+            "args": {k: v for k, v in vars(args).items() if k not in ("func", "out")},
+            "fake_openai": fake_stats,
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+    return 1 if any(r["errors"] for r in results.values()) and args.fail_on_errors else 0
+
+
+def compare(args) -> int:
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    def change(old, new):
+        return f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+
+    print(f"before {before['meta']['git']['commit']}  after {after['meta']['git']['commit']}")
+    print(f"{'scenario':<20}{'metric':<8}{'before':>10}{'after':>10}{'change':>9}")
+    for name, old in before["results"].items():
+        new = after["results"].get(name)
+        if new is None:
+            continue
+        for metric in ("rps", "p50_ms", "p95_ms", "p99_ms", "errors"):
+            print(f"{name:<20}{metric:<8}{old[metric]:>10}{new[metric]:>10}{change(old[metric], new[metric]):>9}")
+            name = ""
+    return 0
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.load_test")
+    sub = parser.add_subparsers(dest="command")
+
+    cmp = sub.add_parser("compare", help="diff two result files")
+    cmp.add_argument("before")
+    cmp.add_argument("after")
+    cmp.set_defaults(func=compare)
+
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="seed and start a scratch server")
+    parser.add_argument("--out", default="load-results.json")
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000, help="per scenario")
+    parser.add_argument("--login-requests", type=int, default=200, help="cap for the login scenario")
+    parser.add_argument("--active", type=int, default=50, help="users the scenarios act as")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--fail-on-errors", action="store_true")
+    # --spawn only
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--ai-latency-ms", type=float, default=400)
+    parser.add_argument("--ai-jitter-ms", type=float, default=200)
+    parser.add_argument("--ai-error-rate", type=float, default=0.0)
+    parser.set_defaults(func=run)
+
+    args = parser.parse_args(argv)
+    unknown = set(getattr(args, "scenarios", ())) - set(SCENARIOS)
+    if args.func is run and unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
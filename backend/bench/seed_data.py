@@ -0,0 +1,205 @@
+"""
+Synthetic data for load tests: --users users with --tasks tasks each and
+--days of completion history, written straight into DATABASE_URL (the
+SQLite file or Postgres the app uses) with multi-row INSERTs. The same
+--seed always produces the same data.
+
+Users are load<i>@example.com with password "loadtest"; they all share one
+bcrypt hash, since hashing per user would take longer than the rest of the
+seeding. Points, streaks and streak_logs agree with the completed tasks, as
+if every completion had gone through update_user_streak_and_points.
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:///./load.db python -m bench.seed_data --users 1000 --tasks 50
+    python -m bench.seed_data --users 1000 --reset     # replace earlier load users
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+from sqlalchemy import delete, func, insert, select
+
+from app import migrations, models
+from app.auth_utils import get_password_hash
+from app.database import SessionLocal
+from app.streaks import POINTS_PER_TASK
+
+SEED_PASSWORD = "loadtest"
+EMAIL_PATTERN = "load%@example.com"
+BATCH_USERS = 500
+PRIORITIES = ("low", "medium", "high")
+
+
+def seed_email(i: int) -> str:
+    return f"load{i}@example.com"
+
+
+def completion_days(rnd: random.Random, budget: int, days: int, today: date):
+    """Completions per day over the last `days` days, at most `budget` in total."""
+    activity = rnd.uniform(0.2, 0.9)        # share of days this user shows up
+    counts = {}
+    day = today - timedelta(days=days - 1)
+    while day <= today and budget > 0:
+        if rnd.random() < activity:
+            n = min(budget, rnd.randint(1, 3))
+            counts[day] = n
+            budget -= n
+        day += timedelta(days=1)
+    return counts
+
+
+def streaks(active_days):
+    """(current, longest) streak as update_user_streak_and_points leaves them."""
+    current = longest = 0
+    previous = None
+    for day in sorted(active_days):
+        current = current + 1 if previous == day - timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest
+
+
+def user_rows(rnd, i, password_hash, tasks_per_user, days, today):
+    counts = completion_days(rnd, int(tasks_per_user * 0.7), days, today)
+    current, longest = streaks(counts)
+    completed = sum(counts.values())
+    user = {
+        "email": seed_email(i),
+        "username": f"load{i}",
+        "hashed_password": password_hash,
+        "is_active": True,
+        "total_points": completed * POINTS_PER_TASK,
+        "current_streak": current,
+        "longest_streak": longest,
+        "last_active_date": max(counts) if counts else None,
+    }
+
+    tasks = []
+    for day, n in sorted(counts.items()):
+        for _ in range(n):
+            done_at = datetime.combine(day, dtime(rnd.randrange(7, 23), rnd.randrange(60)))
+            with_proof = rnd.random() < 0.3
+            tasks.append({
+                "title": f"Task {len(tasks)}",
+                "description": "Seeded for load tests",
+                "priority": rnd.choice(PRIORITIES),
+                "status": "completed",
+                "created_at": done_at - timedelta(hours=rnd.randrange(1, 72)),
+                "updated_at": done_at,
+                "completed_at": done_at,
+                "proof_type": "text" if with_proof else None,
+                "proof_text": "Finished it and wrote up what I did in detail." if with_proof else None,
+                "proof_status": "approved" if with_proof else "none",
+                "proof_submitted_at": done_at if with_proof else None,
+            })
+    now = datetime.combine(today, dtime(0))
+    while len(tasks) < tasks_per_user:
+        created = now - timedelta(minutes=rnd.randrange(days * 24 * 60))
+        tasks.append({
+            "title": f"Task {len(tasks)}",
+            "description": "Seeded for load tests",
+            "priority": rnd.choice(PRIORITIES),
+            "status": "pending",
+            "due_date": created + timedelta(days=rnd.randrange(1, 14)),
+            "created_at": created,
+            "updated_at": created,
+            "proof_status": "none",
+        })
+
+    logs = [
+        {"date": day, "completed_count": n, "points": n * POINTS_PER_TASK}
+        for day, n in counts.items()
+    ]
+    return user, tasks, logs
+
+
+def reset():
+    db = SessionLocal()
+    try:
+        users = select(models.User.id).where(models.User.email.like(EMAIL_PATTERN))
+        db.execute(delete(models.Task).where(models.Task.owner_id.in_(users)))
+        db.execute(delete(models.StreakLog).where(models.StreakLog.user_id.in_(users)))
+        removed = db.execute(delete(models.User).where(models.User.email.like(EMAIL_PATTERN))).rowcount
+        db.commit()
+    finally:
+        db.close()
+    return removed
+
+
+def seed(users: int, tasks_per_user: int, days: int, seed: int = 1) -> dict:
+    rnd = random.Random(seed)
+    today = datetime.utcnow().date()
+    password_hash = get_password_hash(SEED_PASSWORD)
+    totals = {"users": 0, "tasks": 0, "streak_logs": 0}
+
+    db = SessionLocal()
+    try:
+        for start in range(0, users, BATCH_USERS):
+            batch = [
+                user_rows(rnd, i, password_hash, tasks_per_user, days, today)
+                for i in range(start, min(users, start + BATCH_USERS))
+            ]
+            ids = db.scalars(
+                insert(models.User).returning(models.User.id, sort_by_parameter_order=True),
+                [user for user, _, _ in batch],
+            ).all()
+
+            tasks = [
+                {**task, "owner_id": user_id}
+                for user_id, (_, user_tasks, _) in zip(ids, batch)
+                for task in user_tasks
+            ]
+            logs = [
+                {**log, "user_id": user_id}
+                for user_id, (_, _, user_logs) in zip(ids, batch)
+                for log in user_logs
+            ]
+            if tasks:
+                db.execute(insert(models.Task), tasks)
+            if logs:
+                db.execute(insert(models.StreakLog), logs)
+            db.commit()
+
+            totals["users"] += len(ids)
+            totals["tasks"] += len(tasks)
+            totals["streak_logs"] += len(logs)
+    finally:
+        db.close()
+    return totals
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.seed_data")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=50, help="tasks per user")
+    parser.add_argument("--days", type=int, default=60, help="days of completion history")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reset", action="store_true", help="delete earlier load users first")
+    args = parser.parse_args(argv)
+
+    migrations.upgrade()
+    if args.reset:
+        print(f"Removed {reset()} load users.")
+
+    db = SessionLocal()
+    existing = db.scalar(
+        select(func.count()).select_from(models.User).where(models.User.email.like(EMAIL_PATTERN))
+    )
+    db.close()
+    if existing:
+        print(f"{existing} load users already exist; rerun with --reset to replace them.")
+        return 1
+
+    start = time.perf_counter()
+    totals = seed(args.users, args.tasks, args.days, args.seed)
+    print(
+        f"Seeded {totals['users']} users, {totals['tasks']} tasks and "
+        f"{totals['streak_logs']} streak logs in {time.perf_counter() - start:.1f}s."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,161 @@
+"""
+Blob storage backends and refcount/GC under concurrency.
+
+1. Backend round trip: store, exists, open, local_copy, keys, delete.
+2. --threads workers repeatedly attach and detach the same few contents
+   (acquire_blob + store / release_proof + after-commit GC), like tasks
+   uploading and deleting identical photos. At the end every key with a
+   positive refcount must still have its blob and every other key must be
+   gone, along with its proof_blobs row.
+
+--backend s3 runs against bench.fake_s3, which checks every SigV4
+signature. Exits 1 on any failed check. Uses a scratch SQLite file and
+storage directory.
+
+Usage (from backend/):
+    python -m bench.stress_blob_storage [--backend local|s3] [--threads 16] [--rounds 50]
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/stress.db")
+os.environ.setdefault("PROOF_STORAGE_DIR", os.path.join(workdir, "blobs"))
+
+from app import migrations, models  # noqa: E402
+from app import proof_blobs  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.proof_blobs import acquire_blob, collect, release_proof  # noqa: E402
+from app.storage import LocalBlobStorage, S3BlobStorage  # noqa: E402
+from bench.fake_s3 import FakeS3  # noqa: E402
+
+
+def stage(blob_storage, data: bytes) -> str:
+    path = blob_storage.staging_path()
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def round_trip(blob_storage, checks):
+    data = os.urandom(300_000)
+    key = hashlib.sha256(data).hexdigest()
+
+    blob_storage.store(key, stage(blob_storage, data))
+    checks.append(("round trip: exists after store", blob_storage.exists(key)))
+    with blob_storage.open(key) as f:
+        checks.append(("round trip: open returns the content", f.read() == data))
+    with blob_storage.local_copy(key) as path:
+        with open(path, "rb") as f:
+            checks.append(("round trip: local_copy has the content", f.read() == data))
+    checks.append(("round trip: listed by keys()", key in {k for k, _ in blob_storage.keys()}))
+    blob_storage.delete(key)
+    checks.append(("round trip: gone after delete", not blob_storage.exists(key)))
+
+
+def churn(blob_storage, contents, rounds, seed):
+    """One worker: attach a random content, sometimes detach one it holds."""
+    rnd = random.Random(seed)
+    held = []
+    for _ in range(rounds):
+        data = rnd.choice(contents)
+        key = hashlib.sha256(data).hexdigest()
+
+        db = SessionLocal()
+        try:
+            refs = acquire_blob(db, key, len(data))
+            if refs == 1 or not blob_storage.exists(key):
+                blob_storage.store(key, stage(blob_storage, data))
+            db.commit()
+            held.append(key)
+        finally:
+            db.close()
+
+        if held and rnd.random() < 0.6:
+            db = SessionLocal()
+            try:
+                release_proof(db, held.pop(rnd.randrange(len(held))))
+                db.commit()
+            finally:
+                db.close()
+    return held
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["local", "s3"], default="local")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--contents", type=int, default=200)
+    args = parser.parse_args()
+
+    migrations.upgrade()
+
+    fake = None
+    if args.backend == "s3":
+        fake = FakeS3()
+        blob_storage = S3BlobStorage(
+            endpoint=fake.serve(), bucket="proofs", access_key="fake", secret_key="fake"
+        )
+    else:
+        blob_storage = LocalBlobStorage(os.environ["PROOF_STORAGE_DIR"])
+
+    # Route the after-commit GC at the storage under test
+    proof_blobs.storage = blob_storage
+
+    checks = []
+    round_trip(blob_storage, checks)
+
+    contents = [os.urandom(50_000) for _ in range(args.contents)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        held = list(pool.map(
+            lambda seed: churn(blob_storage, contents, args.rounds, seed),
+            range(args.threads),
+        ))
+    proof_blobs._gc_executor.submit(lambda: None).result()   # drain pending GC
+    elapsed = time.perf_counter() - start
+
+    expected = {}
+    for keys in held:
+        for key in keys:
+            expected[key] = expected.get(key, 0) + 1
+
+    db = SessionLocal()
+    rows = {blob.key: blob.refcount for blob in db.query(models.ProofBlob)}
+    db.close()
+
+    all_keys = {hashlib.sha256(c).hexdigest() for c in contents}
+    live = {key for key in all_keys if expected.get(key, 0) > 0}
+    wrong_counts = [key for key in all_keys if rows.get(key, 0) != expected.get(key, 0)]
+    missing = [key for key in live if not blob_storage.exists(key)]
+    leaked = [key for key in all_keys - live if key in rows or blob_storage.exists(key)]
+    checks.append((f"refcounts match held references ({len(wrong_counts)} wrong)", not wrong_counts))
+    checks.append((f"{len(live)} referenced blobs present ({len(missing)} missing)", not missing))
+    checks.append((
+        f"{len(all_keys - live)} unreferenced blobs collected ({len(leaked)} leaked)", not leaked
+    ))
+    checks.append(("no GC left to do", collect(list(all_keys), blob_storage) == 0))
+
+    ops = args.threads * args.rounds
+    print(f"{args.backend}: {ops} attaches by {args.threads} threads in {elapsed:.2f}s")
+    if fake:
+        checks.append((f"s3: {fake.requests} signed requests, {fake.rejected} rejected",
+                       fake.rejected == 0))
+        fake.stop()
+
+    failed = 0
+    for name, passed in checks:
+        print(f"{'OK  ' if passed else 'FAIL'} {name}")
+        failed += not passed
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Event hub fan-out, in process and through the broker.
+
+1. local: --streams subscribers spread over --users user channels, all also
+   on the leaderboard channel; --events events published from several
+   threads. Every stream must receive exactly its channel's events.
+2. broker: the same through the app.events broker (run in a thread) with
+   two BrokerHubs standing in for two workers; events are published on
+   either hub and must reach streams on both.
+3. slow consumer: a stream that never reads is capped at its queue size and
+   told to resync instead of growing a backlog.
+
+Events are published in one burst, so latency includes queueing behind it.
+Exits 1 on any failed check.
+
+Usage (from backend/):
+    python -m bench.stress_events [--streams 500] [--users 100] [--events 5000]
+"""
+import argparse
+import asyncio
+import random
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+
+from app.events import LEADERBOARD_CHANNEL, RESYNC, BrokerHub, LocalHub, run_broker, user_channel
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def publish_all(hubs, plan, threads=4):
+    def worker(part):
+        for channel, seq in part:
+            random.choice(hubs).publish(channel, {"type": "test", "seq": seq, "sent": time.perf_counter()})
+
+    parts = [plan[i::threads] for i in range(threads)]
+    pool = [threading.Thread(target=worker, args=(part,)) for part in parts]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+
+async def fan_out(name, hubs, args, checks):
+    rnd = random.Random(1)
+    subs = []
+    for i in range(args.streams):
+        user_id = i % args.users
+        hub = hubs[i % len(hubs)]
+        subs.append((user_id, hub.subscribe([user_channel(user_id), LEADERBOARD_CHANNEL])))
+    await asyncio.sleep(0.3)    # let broker connections settle
+
+    plan = [
+        (LEADERBOARD_CHANNEL if rnd.random() < 0.1 else user_channel(rnd.randrange(args.users)), seq)
+        for seq in range(args.events)
+    ]
+    per_channel = Counter(channel for channel, _ in plan)
+    expected = {
+        id(sub): per_channel[user_channel(user_id)] + per_channel[LEADERBOARD_CHANNEL]
+        for user_id, sub in subs
+    }
+
+    start = time.perf_counter()
+    await asyncio.to_thread(publish_all, hubs, plan)
+
+    latencies = []
+    received = Counter()
+    resyncs = 0
+    deadline = time.perf_counter() + 10
+    while time.perf_counter() < deadline and any(received[id(s)] < expected[id(s)] for _, s in subs):
+        for _, sub in subs:
+            while not sub.queue.empty():
+                payload = sub.queue.get_nowait()
+                if payload is RESYNC or payload.get("type") == "resync":
+                    resyncs += 1
+                    continue
+                received[id(sub)] += 1
+                latencies.append((time.perf_counter() - payload["sent"]) * 1000)
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - start
+
+    short = sum(1 for _, s in subs if received[id(s)] != expected[id(s)])
+    total = sum(expected.values())
+    print(
+        f"{name}: {args.events} events → {total} deliveries to {args.streams} streams "
+        f"in {elapsed:.2f}s, latency p50 {percentile(latencies, 50):.2f} ms "
+        f"p99 {percentile(latencies, 99):.2f} ms"
+    )
+    checks.append((f"{name}: every stream got exactly its events ({short} off)", short == 0))
+    checks.append((f"{name}: no resyncs at this load ({resyncs})", resyncs == 0))
+    for hub in hubs:
+        for _, sub in subs:
+            hub.unsubscribe(sub)
+
+
+async def slow_consumer(checks):
+    hub = LocalHub(queue_size=10)
+    sub = hub.subscribe([user_channel(1)])
+    for seq in range(1000):
+        hub.publish(user_channel(1), {"type": "test", "seq": seq})
+    await asyncio.sleep(0.1)
+    backlog = [sub.queue.get_nowait() for _ in range(sub.queue.qsize())]
+    resyncs = sum(1 for p in backlog if p is RESYNC)
+    checks.append((f"slow consumer: backlog capped at {len(backlog)} with a resync", len(backlog) <= 10 and resyncs >= 1))
+
+
+async def main(args) -> int:
+    checks = []
+
+    await fan_out("local", [LocalHub(queue_size=args.events)], args, checks)
+
+    port = free_port()
+    broker_loop = asyncio.new_event_loop()
+    threading.Thread(
+        target=lambda: broker_loop.run_until_complete(run_broker("127.0.0.1", port)), daemon=True
+    ).start()
+    hubs = [BrokerHub(f"tcp://127.0.0.1:{port}", queue_size=args.events) for _ in range(2)]
+    await fan_out("broker", hubs, args, checks)
+    for hub in hubs:
+        checks.append((f"broker: nothing dropped ({hub.dropped})", hub.dropped == 0))
+        hub.close()
+
+    await slow_consumer(checks)
+
+    failed = 0
+    for name, passed in checks:
+        print(f"{'OK  ' if passed else 'FAIL'} {name}")
+        failed += not passed
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=500)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--events", type=int, default=5000)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,111 @@
+"""
+The shared model client under a degraded upstream.
+
+Runs ModelClient against bench.fake_openai through four phases and checks
+each one. Exits 1 if any check fails.
+  healthy  - calls succeed and in-flight calls never exceed --max-inflight
+  outage   - 500s open the breaker, after which calls fast-fail
+  slow     - a hung upstream is cut off at the per-call deadline
+  recovery - after the reset window one trial call closes the breaker
+
+Usage (from backend/):
+    python -m bench.stress_openai_client [--calls 64] [--max-inflight 8]
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.fake_openai import FakeOpenAI
+from app.openai_client import CircuitBreaker, ModelClient, ModelUnavailable
+
+
+def call(client):
+    start = time.perf_counter()
+    try:
+        client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "User text proof: done"}],
+            max_tokens=10,
+        )
+        ok = True
+    except ModelUnavailable:
+        ok = False
+    return ok, time.perf_counter() - start
+
+
+def burst(client, calls, threads):
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(lambda _: call(client), range(calls)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=64)
+    parser.add_argument("--max-inflight", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    fake = FakeOpenAI(latency_ms=50)
+    breaker = CircuitBreaker(failures=3, reset_after=1.0)
+    client = ModelClient(
+        api_key="fake",
+        base_url=fake.serve(),
+        timeout=args.timeout,
+        max_retries=2,
+        max_inflight=args.max_inflight,
+        breaker=breaker,
+    )
+    checks = []
+
+    # healthy
+    results = burst(client, args.calls, 32)
+    checks.append(("healthy: all calls ok", all(ok for ok, _ in results)))
+    checks.append((
+        f"healthy: upstream in-flight {fake.max_inflight} <= {args.max_inflight}",
+        fake.max_inflight <= args.max_inflight,
+    ))
+
+    # outage
+    fake.reset()
+    fake.error_rate = 1.0
+    results = burst(client, args.calls, 8)
+    fast = [elapsed for ok, elapsed in results[-args.calls // 2:]]
+    checks.append(("outage: every call raised ModelUnavailable", not any(ok for ok, _ in results)))
+    checks.append((f"outage: breaker {breaker.state}", breaker.state == "open"))
+    checks.append((
+        f"outage: upstream saw {fake.errors} of {args.calls} calls",
+        fake.errors < args.calls,
+    ))
+    checks.append((f"outage: late calls fast-fail (max {max(fast) * 1000:.1f} ms)", max(fast) < 0.05))
+
+    # slow
+    time.sleep(breaker.reset_after)
+    fake.reset()
+    fake.error_rate = 0.0
+    fake.latency = args.timeout * 5
+    ok, elapsed = call(client)
+    checks.append((
+        f"slow: cut off after {elapsed:.2f}s (deadline {args.timeout}s)",
+        not ok and elapsed < args.timeout * 1.5,
+    ))
+
+    # recovery
+    fake.latency = 0.05
+    time.sleep(breaker.reset_after)
+    checks.append((f"recovery: breaker {breaker.state} before trial", breaker.state == "half-open"))
+    ok, _ = call(client)
+    checks.append((f"recovery: trial call ok, breaker {breaker.state}", ok and breaker.state == "closed"))
+
+    client.close()
+    fake.stop()
+
+    failed = 0
+    for name, passed in checks:
+        print(f"{'OK  ' if passed else 'FAIL'} {name}")
+        failed += not passed
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
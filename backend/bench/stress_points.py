@@ -0,0 +1,89 @@
+"""
+Concurrent completions for one user must add up exactly.
+
+Fires --completions awards from --threads threads, each in its own session,
+then checks total_points and the day's streak_logs row. Exits 1 on a
+mismatch. Uses a scratch SQLite file unless DATABASE_URL is set.
+
+Usage (from backend/):
+    python -m bench.stress_points [--completions 500] [--threads 32]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/stress.db"
+
+from app import migrations, models  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.streaks import POINTS_PER_TASK, update_user_streak_and_points  # noqa: E402
+
+
+def complete_once(user_id: int, when: datetime):
+    db = SessionLocal()
+    try:
+        user = db.get(models.User, user_id)
+        update_user_streak_and_points(db, user, when)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--completions", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    migrations.upgrade()
+
+    db = SessionLocal()
+    user = models.User(
+        email=f"stress-{time.time_ns()}@example.com",
+        username=f"stress-{time.time_ns()}",
+        hashed_password="x",
+        total_points=0,
+        current_streak=0,
+        longest_streak=0,
+    )
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    now = datetime.utcnow()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(lambda _: complete_once(user_id, now), range(args.completions)))
+    elapsed = time.perf_counter() - start
+
+    db = SessionLocal()
+    user = db.get(models.User, user_id)
+    log = db.get(models.StreakLog, (user_id, now.date()))
+    db.close()
+
+    expected = args.completions * POINTS_PER_TASK
+    checks = {
+        "total_points": (user.total_points, expected),
+        "current_streak": (user.current_streak, 1),
+        "streak_log.completed_count": (log.completed_count, args.completions),
+        "streak_log.points": (log.points, expected),
+    }
+
+    print(f"{args.completions} completions / {args.threads} threads in {elapsed:.2f}s "
+          f"({args.completions / elapsed:.0f}/s)")
+    ok = True
+    for name, (got, want) in checks.items():
+        status = "OK  " if got == want else "FAIL"
+        ok &= got == want
+        print(f"{status} {name}: {got} (expected {want})")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+import asyncio
+import io
+import os
+import random
+import socket
+import tempfile
+import time
+import threading
+import uuid
+
+import pytest
+
+# Before any app module reads its config. TEST_DATABASE_URL runs the suite
+# against another database (e.g. a throwaway Postgres); never a real one.
+_workdir = tempfile.mkdtemp(prefix="tasksure-tests-")
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or f"sqlite:///{_workdir}/test.db"
+os.environ["PROOF_STORAGE_DIR"] = os.path.join(_workdir, "proofs")
+os.environ["MIGRATE_ON_STARTUP"] = "1"
+os.environ["WARM_UP_ON_STARTUP"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from app import main  # noqa: E402
+from app.database import SQLALCHEMY_DATABASE_URL  # noqa: E402
+from app.events import BrokerHub, run_broker  # noqa: E402
+from app.proof_queue import ProofQueue  # noqa: E402
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "sqlite_only: relies on SQLite internals (locks, query plans)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+        return
+    skip = pytest.mark.skip(reason="needs the suite to run on SQLite")
+    for item in items:
+        if "sqlite_only" in item.keywords:
+            item.add_marker(skip)
+
+
+class FakeVerifier:
+    """Approves proofs mentioning "done"; can hold every call until released."""
+
+    def __init__(self, hold: bool = False):
+        self.calls = []
+        self.gate = threading.Event()
+        if not hold:
+            self.gate.set()
+
+    def __call__(self, proof_text, image_path, **kwargs):
+        self.calls.append(proof_text)
+        self.gate.wait(timeout=10)
+        if proof_text and "done" in proof_text:
+            return True, "Looks complete."
+        return False, "Not enough evidence."
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as c:
+        yield c
+
+
+@pytest.fixture
+def fake_verifier():
+    """A FakeVerifier that answers straight away; clear its gate to hold calls."""
+    return FakeVerifier()
+
+
+@pytest.fixture
+def make_queue(monkeypatch):
+    """Swap the app's proof queue for one around a fake verifier."""
+    queues = []
+
+    def make(verifier, max_pending=10):
+        queue = ProofQueue(verifier=verifier, workers=2, max_pending=max_pending, batcher=None)
+        monkeypatch.setattr(main, "proof_queue", queue)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.shutdown(wait=True)
+
+
+@pytest.fixture
+def auth(client):
+    """Headers for a freshly registered user."""
+    name = uuid.uuid4().hex[:12]
+    client.post(
+        "/auth/register",
+        json={"email": f"{name}@example.com", "username": name, "password": "pw123456"},
+    )
+    token = client.post(
+        "/auth/login", data={"username": f"{name}@example.com", "password": "pw123456"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def new_task(client, auth):
+    """new_task(title=...) → id of a task created by the `auth` user."""
+
+    def create(title: str = "Water the plants") -> int:
+        return client.post("/tasks", json={"title": title}, headers=auth).json()["id"]
+
+    return create
+
+
+@pytest.fixture
+def png_bytes():
+    """png_bytes(seed) → a 64×64 noise PNG; different seeds give unrelated photos."""
+
+    def make(seed: int) -> bytes:
+        rng = random.Random(seed)
+        image = Image.new("L", (64, 64))
+        image.putdata([rng.randrange(256) for _ in range(64 * 64)])
+        out = io.BytesIO()
+        image.convert("RGB").save(out, "PNG")
+        return out.getvalue()
+
+    return make
+
+
+@pytest.fixture
+def broker_url():
+    """An events broker on a free local port, running for the test."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    ready = threading.Event()
+    running = {}
+
+    async def serve():
+        running["loop"], running["stop"] = asyncio.get_running_loop(), asyncio.Event()
+        broker = asyncio.create_task(run_broker("127.0.0.1", port))
+        ready.set()
+        await running["stop"].wait()
+        broker.cancel()     # asyncio.run then winds down the per-worker handlers
+
+    thread = threading.Thread(target=asyncio.run, args=(serve(),), daemon=True)
+    thread.start()
+    ready.wait(timeout=5)
+    yield f"tcp://127.0.0.1:{port}"
+    running["loop"].call_soon_threadsafe(running["stop"].set)
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def worker_hubs(broker_url):
+    """worker_hubs(n) → n connected BrokerHubs, each standing in for a worker process."""
+    hubs = []
+
+    def make(count: int):
+        made = [BrokerHub(broker_url) for _ in range(count)]
+        for hub in made:
+            hub.start()
+        deadline = time.monotonic() + 5
+        while not all(hub.stats()["broker_connected"] for hub in made):
+            assert time.monotonic() < deadline, "broker not reachable"
+            time.sleep(0.01)
+        hubs.extend(made)
+        return made
+
+    yield make
+    for hub in hubs:
+        hub.close()
+
+
+@pytest.fixture
+def eventually():
+    """eventually(check) polls check() until it's truthy; relayed updates land asynchronously."""
+
+    def wait(check, timeout: float = 5):
+        deadline = time.monotonic() + timeout
+        while not check():
+            assert time.monotonic() < deadline, "condition not met in time"
+            time.sleep(0.01)
+
+    return wait
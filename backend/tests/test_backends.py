@@ -0,0 +1,89 @@
+"""
+Dialect-specific SQL (upserts, UPDATE … RETURNING, migrations) on every
+supported backend. Postgres runs when TEST_POSTGRES_URL points at a
+throwaway database, e.g. postgresql+psycopg2://postgres@localhost/tasksure_test,
+and is skipped otherwise; its tables are dropped before and after each test.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import MetaData, select
+from sqlalchemy.orm import Session
+
+from app import migrations, models
+from app.database import make_engine
+from app.proof_blobs import acquire_blob, release_proof
+from app.streaks import update_user_streak_and_points
+
+
+def _drop_everything(engine):
+    metadata = MetaData()
+    metadata.reflect(engine)
+    metadata.drop_all(engine)
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def backend_engine(request, tmp_path):
+    if request.param == "sqlite":
+        engine = make_engine(f"sqlite:///{tmp_path}/backend.db")
+    else:
+        url = os.getenv("TEST_POSTGRES_URL")
+        if not url:
+            pytest.skip("TEST_POSTGRES_URL not set")
+        try:
+            engine = make_engine(url)
+            engine.connect().close()
+        except Exception as e:
+            pytest.skip(f"Postgres unavailable: {e}")
+        _drop_everything(engine)
+
+    migrations.upgrade(engine)
+    yield engine
+    if request.param != "sqlite":
+        _drop_everything(engine)
+    engine.dispose()
+
+
+def _new_user(db: Session) -> models.User:
+    name = uuid.uuid4().hex[:12]
+    user = models.User(email=f"{name}@example.com", username=name, hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_migrations_leave_nothing_pending(backend_engine):
+    assert migrations.pending(backend_engine) == []
+    assert migrations.upgrade(backend_engine) == []
+
+
+def test_blob_refcount_upsert(backend_engine):
+    key = uuid.uuid4().hex * 2
+    with Session(backend_engine) as db:
+        assert acquire_blob(db, key, 10) == 1
+        assert acquire_blob(db, key, 10) == 2
+        release_proof(db, key)
+        db.commit()
+        assert db.get(models.ProofBlob, key).refcount == 1
+
+
+def test_points_update_and_streak_log_upsert(backend_engine):
+    today = datetime.utcnow()
+    with Session(backend_engine) as db:
+        user = _new_user(db)
+        update_user_streak_and_points(db, user, today - timedelta(days=1))
+        update_user_streak_and_points(db, user, today)
+        update_user_streak_and_points(db, user, today, completions=2)
+        db.commit()
+
+        row = db.get(models.User, user.id)
+        db.refresh(row)
+        assert (row.total_points, row.current_streak, row.longest_streak) == (40, 2, 2)
+        logs = db.execute(
+            select(models.StreakLog.date, models.StreakLog.completed_count)
+            .where(models.StreakLog.user_id == user.id)
+            .order_by(models.StreakLog.date)
+        ).all()
+        assert [count for _, count in logs] == [1, 3]
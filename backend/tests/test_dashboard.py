@@ -0,0 +1,18 @@
+def test_dashboard_calendar_matches_streak_calendar(client, auth):
+    ids = [client.post("/tasks", json={"title": f"t{i}"}, headers=auth).json()["id"] for i in range(3)]
+    for task_id in ids[:2]:
+        client.put(f"/tasks/{task_id}", json={"status": "completed"}, headers=auth)
+    # The completion still counts in the streak rollup after the task is gone
+    client.delete(f"/tasks/{ids[0]}", headers=auth)
+
+    dashboard = client.get("/dashboard?fields=stats,calendar", headers=auth).json()
+
+    assert dashboard["calendar"] == client.get("/streak/calendar", headers=auth).json()
+    assert list(dashboard["calendar"].values()) == [2]
+    assert dashboard["stats"]["tasks_by_status"] == {"completed": 1, "pending": 1}
+    assert set(dashboard) == {"stats", "calendar"}
+
+
+def test_dashboard_rejects_unknown_widgets(client, auth):
+    response = client.get("/dashboard?fields=stats,weather", headers=auth)
+    assert response.status_code == 400
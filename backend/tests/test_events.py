@@ -0,0 +1,35 @@
+from app.database import SessionLocal
+from app.events import redeem_stream_ticket
+
+
+def ticket_for(client, auth) -> str:
+    response = client.post("/events/ticket", headers=auth)
+    assert response.status_code == 200
+    return response.json()["ticket"]
+
+
+def test_ticket_is_single_use(client, auth):
+    user_id = client.get("/auth/me", headers=auth).json()["id"]
+    ticket = ticket_for(client, auth)
+
+    with SessionLocal() as db:
+        assert redeem_stream_ticket(db, ticket) == user_id
+        assert redeem_stream_ticket(db, ticket) is None
+    assert client.get(f"/events?ticket={ticket}").status_code == 401
+
+
+def test_stream_refuses_access_tokens_in_the_url(client, auth):
+    token = auth["Authorization"].removeprefix("Bearer ")
+
+    assert client.get(f"/events?token={token}").status_code == 401
+    assert client.get("/events?ticket=made-up").status_code == 401
+
+
+def test_expired_ticket_is_refused(client, auth, monkeypatch):
+    from app import events
+
+    monkeypatch.setattr(events, "EVENTS_TICKET_TTL_S", -1)
+    ticket = ticket_for(client, auth)
+
+    with SessionLocal() as db:
+        assert redeem_stream_ticket(db, ticket) is None
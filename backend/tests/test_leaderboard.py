@@ -0,0 +1,77 @@
+import threading
+import time
+from datetime import datetime
+
+from app import leaderboard as leaderboard_module
+from app.events import LEADERBOARD_SYNC_CHANNEL, RESYNC
+from app.leaderboard import Leaderboard, leaderboard
+
+
+def complete_task(client, auth):
+    task_id = client.post("/tasks", json={"title": "Run 5k"}, headers=auth).json()["id"]
+    client.put(f"/tasks/{task_id}", json={"status": "completed"}, headers=auth)
+
+
+def my_points(board, client, auth):
+    user_id = client.get("/auth/me", headers=auth).json()["id"]
+    return board.rank(user_id)["points"]
+
+
+def test_other_workers_awards_are_applied_incrementally(
+    client, auth, worker_hubs, eventually, monkeypatch
+):
+    this_hub, other_hub = worker_hubs(2)
+    monkeypatch.setattr(leaderboard_module, "event_hub", this_hub)
+    other_worker = Leaderboard()
+    other_worker.rebuild()
+    other_hub.listen(LEADERBOARD_SYNC_CHANNEL, other_worker.on_remote)
+    rebuilds = []
+    monkeypatch.setattr(other_worker, "_load", lambda db: rebuilds.append(db))
+
+    complete_task(client, auth)
+    user_id = client.get("/auth/me", headers=auth).json()["id"]
+
+    eventually(lambda: other_worker.rank(user_id)["points"] == 10)
+    assert other_worker.rank(user_id, "daily")["points"] == 10
+    assert rebuilds == []
+    assert my_points(leaderboard, client, auth) == 10     # not applied twice here
+
+
+def test_lost_broker_connection_rebuilds(client, auth, eventually):
+    board = Leaderboard()
+    board.rebuild()
+    complete_task(client, auth)       # applied to `leaderboard` only
+    user_id = client.get("/auth/me", headers=auth).json()["id"]
+
+    board.on_remote(RESYNC)
+
+    eventually(lambda: board.rank(user_id)["points"] == 10)
+
+
+def test_reads_and_awards_are_not_blocked_by_a_rebuild(client, auth):
+    board = Leaderboard()
+    board.rebuild()
+    user_id = client.get("/auth/me", headers=auth).json()["id"]
+    loading, release = threading.Event(), threading.Event()
+    load = board._load
+
+    def slow_load(db):
+        loading.set()
+        release.wait(timeout=10)
+        return load(db)
+
+    board._load = slow_load
+    rebuild = threading.Thread(target=board.rebuild)
+    rebuild.start()
+    assert loading.wait(timeout=5)
+
+    # Both would wait on the lock if the rebuild held it while loading
+    start = time.monotonic()
+    board.apply_award(user_id, "someone", 1, 10, datetime.utcnow().date())
+    board.page("all", 5)
+    assert time.monotonic() - start < 1
+
+    release.set()
+    rebuild.join(timeout=10)
+    # Not in the DB the rebuild read, so it only survives through the replay
+    assert board.rank(user_id)["points"] == 10
@@ -0,0 +1,61 @@
+from sqlalchemy import update
+
+from app import models
+from app.database import SessionLocal
+
+
+def upload(client, auth, task_id, data):
+    response = client.post(
+        f"/tasks/{task_id}/proof",
+        files={"file": ("p.png", data, "image/png")},
+        headers=auth,
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_reused_photo_is_rejected(client, auth, make_queue, fake_verifier, new_task, png_bytes):
+    make_queue(fake_verifier)
+    upload(client, auth, new_task(), png_bytes(1))
+
+    body = upload(client, auth, new_task(), png_bytes(1))
+
+    assert body["proof_status"] == "rejected"
+    assert "already used" in body["proof_feedback"]
+
+
+def test_replaced_proof_photo_is_not_a_duplicate(client, auth, make_queue, fake_verifier, new_task, png_bytes):
+    make_queue(fake_verifier)
+    first = new_task()
+    upload(client, auth, first, png_bytes(2))
+    upload(client, auth, first, png_bytes(3))     # replaces the first photo
+
+    body = upload(client, auth, new_task(), png_bytes(2))
+
+    assert body["proof_status"] == "pending"
+
+
+def test_deleted_task_photo_is_not_a_duplicate(client, auth, make_queue, fake_verifier, new_task, png_bytes):
+    make_queue(fake_verifier)
+    first = new_task()
+    upload(client, auth, first, png_bytes(4))
+    assert client.delete(f"/tasks/{first}", headers=auth).status_code == 204
+
+    body = upload(client, auth, new_task(), png_bytes(4))
+
+    assert body["proof_status"] == "pending"
+
+
+def test_stale_cached_hash_is_checked_against_db(client, auth, make_queue, fake_verifier, new_task, png_bytes):
+    make_queue(fake_verifier)
+    first = new_task()
+    upload(client, auth, first, png_bytes(5))
+
+    # Another worker clears the proof; this worker's cache still has it
+    with SessionLocal() as db:
+        db.execute(update(models.Task).where(models.Task.id == first).values(proof_phash=None))
+        db.commit()
+
+    body = upload(client, auth, new_task(), png_bytes(5))
+
+    assert body["proof_status"] == "pending"
@@ -0,0 +1,27 @@
+from app import principal_cache as principal_cache_module
+from app.events import RESYNC, USER_CHANGED_CHANNEL
+from app.principal_cache import PrincipalCache, UserSnapshot
+
+
+def test_award_on_another_worker_drops_the_snapshot(
+    client, auth, new_task, worker_hubs, eventually, monkeypatch
+):
+    this_hub, other_hub = worker_hubs(2)
+    monkeypatch.setattr(principal_cache_module, "event_hub", this_hub)
+    other_worker = PrincipalCache()
+    other_hub.listen(USER_CHANGED_CHANNEL, other_worker.on_remote)
+    me = client.get("/auth/me", headers=auth).json()
+    other_worker.users.put(me["id"], UserSnapshot(**me), 30)
+
+    client.put(f"/tasks/{new_task()}", json={"status": "completed"}, headers=auth)
+
+    eventually(lambda: other_worker.get_user(me["id"]) is None)
+
+
+def test_lost_broker_connection_drops_every_snapshot():
+    cache = PrincipalCache()
+    cache.users.put(1, UserSnapshot(id=1), 30)
+
+    cache.on_remote(RESYNC)
+
+    assert cache.get_user(1) is None
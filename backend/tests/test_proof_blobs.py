@@ -0,0 +1,111 @@
+import hashlib
+import os
+import sqlite3
+
+import pytest
+
+from app import main
+from app.database import SQLALCHEMY_DATABASE_URL
+
+
+def database_is_write_locked() -> bool:
+    conn = sqlite3.connect(SQLALCHEMY_DATABASE_URL.removeprefix("sqlite:///"), timeout=0)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.rollback()
+        return False
+    except sqlite3.OperationalError:
+        return True
+    finally:
+        conn.close()
+
+
+@pytest.mark.sqlite_only
+def test_blob_is_stored_outside_the_write_transaction(
+    client, auth, make_queue, fake_verifier, new_task, png_bytes, monkeypatch
+):
+    make_queue(fake_verifier)
+    locked_during_store = []
+    store = main.storage.store
+
+    def spy(key, staged_path):
+        locked_during_store.append(database_is_write_locked())
+        store(key, staged_path)
+
+    monkeypatch.setattr(main.storage, "store", spy)
+    task_id = new_task()
+
+    response = client.post(
+        f"/tasks/{task_id}/proof",
+        files={"file": ("p.png", png_bytes(101), "image/png")},
+        headers=auth,
+    )
+
+    assert response.status_code == 200
+    assert locked_during_store == [False]
+    assert main.storage.exists(response.json()["proof_url"])
+
+
+def test_blob_removed_before_acquire_is_stored_again(
+    client, auth, make_queue, fake_verifier, new_task, png_bytes, monkeypatch
+):
+    make_queue(fake_verifier)
+    store = main.storage.store
+
+    def store_then_collected(key, staged_path):
+        store(key, staged_path)
+        monkeypatch.setattr(main.storage, "store", store)
+        main.storage.delete(key)        # a GC of the key's old row got there first
+
+    monkeypatch.setattr(main.storage, "store", store_then_collected)
+    task_id = new_task()
+
+    response = client.post(
+        f"/tasks/{task_id}/proof",
+        files={"file": ("p.png", png_bytes(102), "image/png")},
+        headers=auth,
+    )
+
+    assert response.status_code == 200
+    assert main.storage.exists(response.json()["proof_url"])
+
+
+def test_blob_of_a_failed_upload_is_removed(
+    client, auth, make_queue, fake_verifier, new_task, png_bytes, eventually, monkeypatch
+):
+    make_queue(fake_verifier)
+    data = png_bytes(103)
+    key = hashlib.sha256(data).hexdigest()
+
+    def failing_acquire(db, key, size):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(main, "acquire_blob", failing_acquire)
+    task_id = new_task()
+
+    with pytest.raises(RuntimeError):
+        client.post(
+            f"/tasks/{task_id}/proof",
+            files={"file": ("p.png", data, "image/png")},
+            headers=auth,
+        )
+
+    eventually(lambda: not main.storage.exists(key))
+
+
+def test_staged_file_is_copied_without_hard_links(monkeypatch):
+    staged = main.storage.staging_path()
+    with open(staged, "wb") as f:
+        f.write(b"proof")
+
+    def no_links(src, dst):
+        raise OSError("hard links not supported")
+
+    monkeypatch.setattr(os, "link", no_links)
+    kept = main.storage.keep_staged(staged)
+    try:
+        with open(kept, "rb") as f:
+            assert f.read() == b"proof"
+    finally:
+        os.remove(staged)
+        os.remove(kept)
@@ -0,0 +1,105 @@
+import time
+
+
+def submit_proof(client, auth, task_id, text):
+    return client.post(f"/tasks/{task_id}/proof", data={"proof_text": text}, headers=auth)
+
+
+def wait_for_verdict(client, auth, task_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = client.get(f"/tasks/{task_id}/proof/status", headers=auth).json()
+        if body["proof_status"] != "pending":
+            return body
+        time.sleep(0.02)
+    raise AssertionError("proof still pending")
+
+
+def test_pending_proof_is_approved(client, auth, make_queue, fake_verifier, new_task):
+    make_queue(fake_verifier)
+    task_id = new_task()
+
+    response = submit_proof(client, auth, task_id, "done, see photo")
+    assert response.status_code == 200
+    assert response.json()["proof_status"] == "pending"
+
+    verdict = wait_for_verdict(client, auth, task_id)
+    assert verdict["proof_status"] == "approved"
+    assert verdict["status"] == "completed"
+    assert client.get("/stats/me", headers=auth).json()["total_points"] == 10
+
+
+def test_pending_proof_is_rejected(client, auth, make_queue, fake_verifier, new_task):
+    make_queue(fake_verifier)
+    task_id = new_task()
+
+    submit_proof(client, auth, task_id, "trust me")
+
+    verdict = wait_for_verdict(client, auth, task_id)
+    assert verdict["proof_status"] == "rejected"
+    assert verdict["proof_feedback"] == "Not enough evidence."
+    assert verdict["status"] == "pending"
+    assert client.get("/stats/me", headers=auth).json()["total_points"] == 0
+
+
+def test_full_queue_returns_503(client, auth, make_queue, fake_verifier, new_task):
+    fake_verifier.gate.clear()
+    queue = make_queue(fake_verifier, max_pending=1)
+    first, second = new_task(), new_task()
+
+    assert submit_proof(client, auth, first, "done").status_code == 200
+    response = submit_proof(client, auth, second, "done")
+    assert response.status_code == 503
+    assert queue.pending() == 1
+
+    fake_verifier.gate.set()
+    assert wait_for_verdict(client, auth, first)["proof_status"] == "approved"
+    assert queue.pending() == 0
+    assert submit_proof(client, auth, second, "done").status_code == 200
+
+
+def test_verdict_lands_once_for_duplicate_jobs(client, auth, make_queue, fake_verifier, new_task):
+    queue = make_queue(fake_verifier)
+    task_id = new_task()
+    submit_proof(client, auth, task_id, "done")
+    wait_for_verdict(client, auth, task_id)
+
+    # A second job for an already-decided proof finds nothing to claim
+    assert queue.reserve()
+    queue.submit(task_id)
+    time.sleep(0.2)
+    assert len(fake_verifier.calls) == 1
+    assert client.get("/stats/me", headers=auth).json()["total_points"] == 10
+
+
+def test_proof_status_endpoint(client, auth, make_queue, fake_verifier, new_task):
+    make_queue(fake_verifier)
+    task_id = new_task()
+
+    body = client.get(f"/tasks/{task_id}/proof/status", headers=auth).json()
+    assert body == {
+        "task_id": task_id,
+        "status": "pending",
+        "proof_status": "none",
+        "proof_feedback": None,
+        "proof_submitted_at": None,
+    }
+
+    assert client.get("/tasks/999999/proof/status", headers=auth).status_code == 404
+    assert client.get(f"/tasks/{task_id}/proof/status").status_code == 401
+
+
+def test_missing_api_key_rejects_instead_of_hanging(client, auth, make_queue, new_task, monkeypatch):
+    from app import openai_client
+    from app.ai_verifier import ai_verify_proof
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(openai_client, "_client", None)
+    make_queue(ai_verify_proof)
+    task_id = new_task()
+
+    submit_proof(client, auth, task_id, "done")
+
+    verdict = wait_for_verdict(client, auth, task_id)
+    assert verdict["proof_status"] == "rejected"
+    assert verdict["proof_feedback"] == "AI key missing. Proof rejected."
@@ -0,0 +1,14 @@
+import pytest
+
+from app import migrations
+
+
+@pytest.mark.sqlite_only
+def test_hot_task_queries_use_indexes():
+    migrations.upgrade()
+
+    plans = migrations.check_query_plans()
+
+    assert {name for name, _, _ in plans} == set(migrations.hot_task_queries())
+    scans = {name: plan for name, plan, ok in plans if not ok}
+    assert scans == {}
@@ -0,0 +1,37 @@
+from app import response_cache as response_cache_module
+from app.events import DATA_CHANGED_CHANNEL, RESYNC
+from app.response_cache import ResponseCache
+
+
+def test_write_on_another_worker_changes_the_version(
+    client, auth, new_task, worker_hubs, eventually, monkeypatch
+):
+    this_hub, other_hub = worker_hubs(2)
+    monkeypatch.setattr(response_cache_module, "event_hub", this_hub)
+    other_worker = ResponseCache()
+    other_hub.listen(DATA_CHANGED_CHANNEL, other_worker.on_remote)
+    user_id = client.get("/auth/me", headers=auth).json()["id"]
+    before = other_worker.version(user_id)
+
+    new_task()
+
+    eventually(lambda: other_worker.version(user_id) != before)
+
+
+def test_lost_broker_connection_drops_every_version():
+    cache = ResponseCache()
+    before = cache.version(1)
+
+    cache.on_remote(RESYNC)
+
+    assert cache.version(1) != before
+
+
+def test_own_write_is_seen_by_the_next_poll(client, auth, new_task):
+    first = client.get("/tasks", headers=auth)
+
+    new_task()
+    again = client.get("/tasks", headers={**auth, "If-None-Match": first.headers["etag"]})
+
+    assert again.status_code == 200
+    assert len(again.json()) == len(first.json()) + 1
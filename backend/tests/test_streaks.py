@@ -0,0 +1,41 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app import migrations, models
+from app.database import SessionLocal
+from app.streaks import POINTS_PER_TASK, update_user_streak_and_points
+
+COMPLETIONS = 300
+
+
+def complete_once(user_id: int, when: datetime):
+    db = SessionLocal()
+    try:
+        user = db.get(models.User, user_id)
+        update_user_streak_and_points(db, user, when)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_concurrent_completions_add_up_exactly():
+    migrations.upgrade()
+    name = uuid.uuid4().hex[:12]
+    with SessionLocal() as db:
+        user = models.User(email=f"{name}@example.com", username=name, hashed_password="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    now = datetime.utcnow()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda _: complete_once(user_id, now), range(COMPLETIONS)))
+
+    with SessionLocal() as db:
+        user = db.get(models.User, user_id)
+        log = db.get(models.StreakLog, (user_id, now.date()))
+        assert user.total_points == COMPLETIONS * POINTS_PER_TASK
+        assert (user.current_streak, user.longest_streak) == (1, 1)
+        assert log.completed_count == COMPLETIONS
+        assert log.points == COMPLETIONS * POINTS_PER_TASK
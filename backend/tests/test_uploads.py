@@ -0,0 +1,57 @@
+from app.uploads import PROOF_MAX_BYTES
+
+
+def multipart(payload: bytes, boundary: str = "tasksureboundary") -> bytes:
+    return (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="p.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+
+
+def test_declared_oversized_upload_is_refused(client, auth, new_task):
+    task_id = new_task()
+    body = multipart(b"\0" * (PROOF_MAX_BYTES + 128 * 1024))
+
+    response = client.post(
+        f"/tasks/{task_id}/proof",
+        content=body,
+        headers={**auth, "Content-Type": "multipart/form-data; boundary=tasksureboundary"},
+    )
+
+    assert response.status_code == 413
+    status = client.get(f"/tasks/{task_id}/proof/status", headers=auth).json()
+    assert status["proof_status"] == "none"
+
+
+def test_streamed_oversized_upload_is_cut_off(client, auth, new_task):
+    task_id = new_task()
+    body = multipart(b"\0" * (PROOF_MAX_BYTES + 128 * 1024))
+
+    def chunks():       # no Content-Length: sent chunked
+        for i in range(0, len(body), 256 * 1024):
+            yield body[i:i + 256 * 1024]
+
+    response = client.post(
+        f"/tasks/{task_id}/proof",
+        content=chunks(),
+        headers={**auth, "Content-Type": "multipart/form-data; boundary=tasksureboundary"},
+    )
+
+    assert response.status_code == 413
+    status = client.get(f"/tasks/{task_id}/proof/status", headers=auth).json()
+    assert status["proof_status"] == "none"
+
+
+def test_upload_within_limit_is_accepted(client, auth, make_queue, fake_verifier, new_task, png_bytes):
+    make_queue(fake_verifier)
+    task_id = new_task()
+
+    response = client.post(
+        f"/tasks/{task_id}/proof",
+        files={"file": ("p.png", png_bytes(201), "image/png")},
+        headers=auth,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["proof_status"] == "pending"